@@ -3,17 +3,45 @@ This package provides functionality for managing Kanban tasks within a Python ap
 
 Modules:
 - module.__main__: Contains 'startup', a function for starting up the application and the primary kanban-board interface.
+- module.benchmark: Contains the benchmark suite measuring deserialization, storage engines and board rendering
+        on synthetic boards, with JSON results for comparison across commits.
+- module.boardGUI: Contains the 'Board'-class, which keeps the cards drawn on the board in sync with the database
+        by only updating the cards that changed.
 - module.boardUtil: Contains utility functions for creating UI elements with predefined functionality
+- module.cache: Contains the 'ItemCache'-class, a bounded least-recently-used cache of items
+        with a time-to-live per entry and hit/miss counters.
 - module.db: Contains the 'Wrapper'-class, which provides functionality to control data interchange
         between this application and a database
         also contains functions to deserialize multiple items (defined in module.persistence)
         and read credentials from the resources/credentials.txt file.
+- module.dispatcher: Contains the 'Dispatcher'-class, which runs database calls on background threads
+        and delivers their results on the Tk thread.
+- module.editor: Contains the 'EditDialog'- and 'CreateDialog'-classes, item dialogs that are built once,
+        filled from the selected item and hidden instead of destroyed.
 - module.enums: Defines enumeration classes for task types and statuses.
+- module.hierarchy: Contains the 'Hierarchy'-class, an incrementally maintained index of the epic/task/subtask
+        tree with roll-up totals and cycle and dangling-parent detection.
+- module.history: Contains the change history as an append-only log of events per field, with compaction
+        into snapshots and replay of an item at any point in time.
 - module.itemGUI: Contains functions for creating UI elements to interact with information stored in the database
 - module.itemUtil: Contains utility functions for creating UI elements with consistent styling
         within a ttkbootstrap grid layout.
+- module.localStore: Contains the 'LocalStore'-class, a local SQLite replica of the collection
+        the board is read from and written to.
+- module.memoryStore: Contains the 'MemoryStore'-class, an in-memory storage engine with indexed lookups
+        by key and status for tests and benchmarks.
+- module.metrics: Contains the board metrics: item counts and estimated and spent time by status, type and parent,
+        computed server-side by an aggregation pipeline or in Python.
 - module.persistence: Provides classes and functions for persisting Kanban tasks
         to and from a MongoDB database.
+- module.repository: Contains the 'Repository'-class, the storage interface implemented by the MongoDB,
+        SQLite and in-memory engines.
+- module.search: Contains the 'TextIndex'-class, a ranked inverted index over keys and descriptions kept in sync
+        with the cache, used where the MongoDB text index is not available.
+- module.sync: Contains the 'SyncEngine'-class, which pushes local changes to MongoDB
+        and applies remote changes to the local replica in the background.
+- module.watcher: Contains the 'ChangeWatcher'-class, which reports changes made by other users
+        through change streams, or by polling on standalone servers.
 
 This package leverages the following external libraries:
 
@@ -7,11 +7,12 @@ interaction, and displaying Kanban board items.
 The GUI design utilizes the ttkbootstrap library for a modern and visually appealing appearance.
 
 - 'startup': starts up the kanban graphical user interface using preconfigured parameters.
+- 'shutdown': releases shared resources and closes the main window.
 """
 
 import ttkbootstrap as tb
 
-from . import boardUtil
+from . import boardGUI, boardUtil, db, dispatcher, editor, hierarchy, itemGUI, localStore
 from .itemGUI import icon
 
 
@@ -24,6 +25,9 @@ def startup() -> None:
     root.title("KanbanGUI.py")
     root.iconbitmap(icon())
 
+    # Release the synchronisation, the background workers and the local replica when the window is closed
+    root.protocol("WM_DELETE_WINDOW", lambda: shutdown(root))
+
     # Set the minimum size of the window
     root.minsize(800, 600)
 
@@ -37,9 +41,19 @@ def startup() -> None:
     tb.Style().configure("KanbanGUI.TButton", font=("", 20))
     tb.Style().configure("KanbanGUI.TLabel", font=("", 20))
 
-    # Create a reference Frame at the top of the window
+    # Create a reference Frame at the top of the window, growing with the window so the columns can scroll
     refFrame = tb.Frame(root)
-    refFrame.grid(row=0, column=0)
+    refFrame.grid(row=0, column=0, sticky="nsew")
+    root.rowconfigure(0, weight=1)
+
+    # Read and write the local replica, so the board shows up instantly and works offline
+    store = localStore.LocalStore()
+    db.setWrapper(store)
+
+    # Draw the cards of the board into the reference Frame below the column labels,
+    # starting from the local state and kept in sync with MongoDB in the background
+    boardGUI.getBoard(refFrame).sync(store)
+    itemGUI.refresh(refFrame)
 
     # Create a container Frame for items
     container = tb.Frame(root)
@@ -56,6 +70,18 @@ def startup() -> None:
     boardUtil.listButton(refFrame, container, 0, 3)
     boardUtil.creationButton(refFrame, container, 0, 4)
 
+    # Move or delete the cards selected with Ctrl+click at once
+    boardUtil.selectionBar(refFrame, 1, 0)
+
+    # Show when database calls are running in the background
+    boardUtil.loadingLabel(refFrame, 1, 2)
+
+    # Search keys and descriptions while typing
+    boardUtil.searchBar(refFrame, 1, 3)
+
+    # Show the epic/task/subtask tree with the time summed over every branch
+    boardUtil.treeButton(refFrame, 1, 4)
+
     # Create labels for the different stages of the kanban board
     tb.Label(refFrame, style="KanbanGUI.TLabel", text="Draft").grid(
         row=2, column=0
@@ -73,9 +99,27 @@ def startup() -> None:
         row=2, column=4
     )  # discardedLabel
 
+    # Show the estimated and spent time per column, type and epic below the board
+    boardUtil.metricsPanel(refFrame, 4)
+
     # Start the main event loop for the window to handle user interactions
     root.mainloop()
 
 
+def shutdown(root: tb.Window) -> None:
+    """
+    Stops synchronising the database and the background workers, detaches the hierarchy index,
+    closes the local replica and destroys the item dialogs and the main window.
+
+    :param root: The main application window.
+    """
+    boardGUI.closeBoard()
+    dispatcher.closeDispatcher()
+    hierarchy.closeHierarchy()
+    db.closeWrapper()
+    editor.closeDialogs()
+    root.destroy()
+
+
 if __name__ == "__main__":
     startup()
@@ -0,0 +1,348 @@
+"""
+This file measures the hot paths of the application on synthetic boards, so regressions show up across commits.
+
+Boards of any size are generated with varied description and history sizes and loaded into an in-memory or local
+SQLite engine, so no database server is needed. Board rendering needs a display; on a headless machine run the suite
+under Xvfb (`xvfb-run python -m module.benchmark`), otherwise the rendering benchmarks are reported as skipped.
+Results are written as JSON and can be compared with the results of an earlier run.
+
+- `generateItems`: A function generating a reproducible synthetic board.
+- `measure`: A function timing a call several times.
+- `runBenchmarks`: A function running all benchmarks for the given board sizes and engine.
+- `compare`: A function computing the speed ratio of two benchmark runs.
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+
+from . import db, enums, search
+from .localStore import LocalStore
+from .memoryStore import MemoryStore
+from .persistence import deserialize, item
+from .watcher import ChangeEvent
+
+ENGINES = {
+    "memory": MemoryStore,
+    "sqlite": lambda: LocalStore(":memory:"),
+}
+"""
+Storage engines the benchmarks can run against, by name.
+"""
+
+SIZES = [1000, 10000, 100000]
+"""
+Default board sizes.
+"""
+
+VOCABULARY = 5000
+"""
+Number of distinct words in generated descriptions.
+"""
+
+
+def generateItems(
+    count: int, descriptionSize: int = 200, historySize: int = 5, seed: int = 0
+) -> list[item]:
+    """
+    Generates a reproducible synthetic board.
+
+    :param count: The number of items.
+    :param descriptionSize: The average length of a description; lengths vary between 0 and twice the average.
+    :param historySize: The average number of history entries; counts vary between 0 and twice the average.
+    :param seed: The seed of the random generator.
+
+    :return: A list of items with every type and status, subtasks pointing to earlier epics,
+             and descriptions made of words from a vocabulary of `VOCABULARY` words.
+    """
+    generator = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    vocabulary = [
+        "".join(generator.choice(letters) for _ in range(generator.randint(3, 10)))
+        for _ in range(VOCABULARY)
+    ]
+    types = [t.value for t in enums.Tasktype]
+    statuses = [s.value for s in enums.Taskstatus]
+    epics = []
+    items = []
+    for index in range(count):
+        key = f"KG-{index}"
+        type = generator.choice(types)
+        parent = generator.choice(epics) if type != "Epic" and epics else None
+        if type == "Epic":
+            epics.append(key)
+        status = generator.choice(statuses)
+        history = [
+            {"date": f"2024-01-{day % 28 + 1:02d}-12-00", "field": "status", "value": status}
+            for day in range(generator.randint(0, 2 * historySize))
+        ]
+        items.append(
+            item(
+                key,
+                type,
+                "2024-01-01-12-00",
+                str(generator.randint(1, 40)),
+                str(generator.randint(0, 40)),
+                status,
+                describe(generator, vocabulary, generator.randint(0, 2 * descriptionSize)),
+                parent,
+                history,
+            )
+        )
+    return items
+
+
+def describe(generator: random.Random, vocabulary: list[str], size: int) -> str:
+    """
+    :param generator: The random generator.
+    :param vocabulary: The words to choose from.
+    :param size: The maximum length of the description.
+
+    :return: A description of random words, some used more often than others.
+    """
+    words = []
+    length = 0
+    while True:
+        word = vocabulary[int(generator.paretovariate(1.2)) % len(vocabulary)]
+        length += len(word) + 1
+        if length > size + 1:
+            return " ".join(words)
+        words.append(word)
+
+
+def measure(call, repeat: int = 5) -> dict[str, float]:
+    """
+    Times a call several times.
+
+    :param call: The callable to time.
+    :param repeat: The number of timed runs.
+
+    :return: The minimum, median and mean duration in seconds and the number of runs.
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        durations.append(time.perf_counter() - start)
+    return {
+        "min": min(durations),
+        "median": statistics.median(durations),
+        "mean": statistics.fmean(durations),
+        "repeat": repeat,
+    }
+
+
+def runBenchmarks(
+    sizes: list[int], engine: str = "memory", repeat: int = 5, render: bool = True
+) -> list[dict]:
+    """
+    Runs all benchmarks for every board size.
+
+    :param sizes: The board sizes.
+    :param engine: The name of the storage engine in `ENGINES`.
+    :param repeat: The number of timed runs per benchmark.
+    :param render: Whether to benchmark board rendering, which needs a display.
+
+    :return: One result per benchmark and size, with its name, size and timings,
+             or the reason it was skipped.
+    """
+    results = []
+
+    def record(name, size, call):
+        results.append({"name": name, "size": size, **measure(call, repeat)})
+
+    for size in sizes:
+        items = generateItems(size)
+        documents = [current.insertDict() for current in items]
+        record("persistence.deserialize", size, lambda: [deserialize(d) for d in documents])
+        record("db.deserializeMultiple", size, lambda: db.deserializeMultiple(documents))
+        record("item.insertDict", size, lambda: [i.insertDict() for i in items])
+        record("item.updateDict", size, lambda: [i.updateDict() for i in items])
+
+        def load():
+            fresh = ENGINES[engine]()
+            fresh.insertItems(items)
+            fresh.close()
+
+        record(f"{engine}.insertItems", size, load)
+        repository = ENGINES[engine]()
+        repository.insertItems(items)
+        record(
+            f"{engine}.readStatus",
+            size,
+            lambda: repository.readStatus(enums.Taskstatus.active),
+        )
+        record(f"{engine}.readBoard", size, repository.readBoard)
+        record(f"{engine}.readPage", size, lambda: repository.readPage("KG-5", 50, "KG-5"))
+        def index():
+            fresh = search.TextIndex(repository)
+            fresh.search("KG")
+            fresh.close()
+
+        record("search.TextIndex", size, index)
+        common = next(i.description.split()[0] for i in items if i.description)
+        queries = ["KG-5", common, "a", f"{common} b"]
+        repository.search("KG")
+        record(
+            f"{engine}.search",
+            size,
+            lambda: [repository.search(text) for text in queries],
+        )
+        record(
+            f"{engine}.readItem",
+            size,
+            lambda: [repository.readItem(f"KG-{i}") for i in range(0, size, max(1, size // 100))],
+        )
+        if render:
+            results.extend(renderBenchmarks(repository, size, repeat))
+        repository.close()
+    return results
+
+
+def renderBenchmarks(repository, size: int, repeat: int) -> list[dict]:
+    """
+    Times rendering the board and opening the item editor in a real Tk window.
+
+    :param repository: The engine holding the board.
+    :param size: The board size.
+    :param repeat: The number of timed runs per benchmark.
+
+    :return: The results, or a single skipped result if no display is available.
+    """
+    import tkinter as tk
+
+    import ttkbootstrap as tb
+
+    from . import boardGUI, editor
+
+    try:
+        root = tb.Window()
+    except tk.TclError as error:
+        return [{"name": "board", "size": size, "skipped": str(error)}]
+    root.geometry("1200x800")
+    frame = tb.Frame(root)
+    frame.pack(fill="both", expand=True)
+    board = boardGUI.Board(frame, firstRow=0)
+    root.update()
+
+    columns = repository.readBoard()
+    moved = columns[enums.Taskstatus.open][0] if columns[enums.Taskstatus.open] else None
+
+    def render():
+        board.render(columns)
+        root.update_idletasks()
+
+    def refresh():
+        board.render(repository.readBoard())
+        root.update_idletasks()
+
+    def apply():
+        if moved is not None:
+            board.apply(ChangeEvent("update", moved.key, moved))
+        root.update_idletasks()
+
+    def move():
+        if moved is not None:
+            board.restore(board.move([moved.key], enums.Taskstatus.active))
+        root.update_idletasks()
+
+    results = [
+        {"name": "board.render", "size": size, **measure(render, repeat)},
+        {"name": "board.refresh", "size": size, **measure(refresh, repeat)},
+        {"name": "board.apply", "size": size, **measure(apply, repeat)},
+        {"name": "board.move", "size": size, **measure(move, repeat)},
+    ]
+
+    # Opening an item: building a new editor every time, as before, against reusing the pooled one
+    opened = repository.readItem(moved.key) if moved is not None else None
+    if opened is not None:
+        def build():
+            dialog = editor.EditDialog(frame)
+            dialog.open(opened)
+            root.update_idletasks()
+            dialog.close()
+
+        def reopen():
+            dialog = editor.getDialog(frame, editor.EditDialog)
+            dialog.open(opened)
+            root.update_idletasks()
+            dialog.hide()
+
+        results += [
+            {"name": "editor.build", "size": size, **measure(build, repeat)},
+            {"name": "editor.open", "size": size, **measure(reopen, repeat)},
+        ]
+        editor.closeDialogs()
+    root.destroy()
+    return results
+
+
+def compare(baseline: list[dict], current: list[dict]) -> list[dict]:
+    """
+    Computes how much faster or slower each benchmark became.
+
+    :param baseline: The results of the earlier run.
+    :param current: The results of the current run.
+
+    :return: One entry per benchmark present in both runs with the median ratio current / baseline,
+             so values above 1 are regressions.
+    """
+    before = {(r["name"], r["size"]): r for r in baseline if "median" in r}
+    return [
+        {
+            "name": r["name"],
+            "size": r["size"],
+            "ratio": r["median"] / before[(r["name"], r["size"])]["median"],
+        }
+        for r in current
+        if "median" in r and (r["name"], r["size"]) in before
+    ]
+
+
+def revision() -> str | None:
+    """
+    :return: The current git commit, or None outside a git checkout.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="python -m module.benchmark", description="KanbanGUI.py benchmarks"
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="board sizes")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="memory")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument("--no-render", action="store_true", help="skip board rendering")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="compare with the JSON results of an earlier run")
+    args = parser.parse_args()
+
+    results = runBenchmarks(args.sizes, args.engine, args.repeat, not args.no_render)
+    report = {
+        "commit": revision(),
+        "python": platform.python_version(),
+        "engine": args.engine,
+        "results": results,
+    }
+    for result in results:
+        timing = f"{result['median'] * 1000:10.2f} ms" if "median" in result else "skipped"
+        print(f"{result['name']:<24} {result['size']:>7} {timing}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)["results"]
+        for entry in compare(baseline, results):
+            print(f"{entry['name']:<24} {entry['size']:>7} {entry['ratio']:8.2f}x")
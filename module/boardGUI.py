@@ -0,0 +1,758 @@
+"""
+This file keeps the cards drawn on the Kanban board in sync with the columns read from the database.
+
+Cards are selected with Ctrl+click, so bulk actions can be applied to many cards at once.
+Cards are moved by dragging them onto another column (a selected card drags the whole selection along);
+moves dropped in quick succession are collected by a `MoveQueue` and written together, one bulk write per status.
+Edits, new items and moves are shown right away (`Board.place`, `Board.add`, `Board.move`) while they are
+written in the background, and rolled back (`Board.restore`) if the write fails.
+
+Every column is virtualized: only the cards in the visible viewport plus a small overscan have widgets,
+and those widgets are recycled while scrolling. On refresh, only the slots whose card actually changed
+are reconfigured, so memory and render time stay flat however long a column grows.
+
+- `Board`: A class owning one virtual column per task status.
+- `VirtualColumn`: A scrollable column that draws a window of its cards with a pool of recycled buttons.
+- `CardSlot`: A recycled button drawing one card of a virtual column.
+- `MoveQueue`: A class collecting dropped moves until they are written, keeping only the latest move per card.
+- `pruneSelection`: A function dropping selected keys that are no longer on the board.
+- `applyEvent`: A function computing the columns after a single inserted, updated or deleted card.
+- `placeCards`: A function computing the columns after cards changed, remembering where they were.
+- `addCards`: A function computing the columns after new cards were added.
+- `restoreCards`: A function putting placed cards back where they were.
+- `visibleRange`: A function computing which cards of a column are inside the viewport.
+- `diffSlots`: A function comparing the drawn cards with the target cards by position.
+- `columnAt`: A function finding the column under a screen position.
+- `getBoard`: Returns the process-wide `Board`, creating it for the given widget on first use.
+- `setBoard`: Replaces the process-wide `Board`, e.g. with a test double.
+- `closeBoard`: Stops the process-wide `Board` from synchronising the database and forgets it.
+"""
+
+import logging
+import math
+import threading
+
+import ttkbootstrap as tb
+
+from . import db, dispatcher, enums, history, itemGUI, sync
+from .persistence import card
+
+logger = logging.getLogger(__name__)
+
+
+class Board:
+    def __init__(self, root: tb.Frame, firstRow: int = 3, delay: int = 400) -> None:
+        """
+        Initializes an empty board with one virtual column per task status.
+
+        :param root: The frame the columns are gridded into.
+        :param firstRow: The grid row of the columns.
+        :param delay: The time in milliseconds after the last dropped card before the dropped moves are written.
+        """
+        self.root = root
+        self.columns = {status: [] for status in enums.Taskstatus}
+        self.selected = set()
+        self.selectionListeners = []
+        self.views = {}
+        for column, status in enumerate(enums.Taskstatus):
+            view = VirtualColumn(
+                root,
+                self.open,
+                onSelect=self.toggle,
+                isSelected=self.selected.__contains__,
+                onDrop=self.drop,
+            )
+            view.grid(row=firstRow, column=column, sticky="nsew", padx=5)
+            self.views[status] = view
+        root.rowconfigure(firstRow, weight=1)
+        self.engine = None
+        self.moves = MoveQueue()
+        self.delay = delay
+        self.flushing = None
+
+    def render(self, columns: dict[enums.Taskstatus, list[card]]) -> None:
+        """
+        Brings the columns in line with the given cards, touching only visible cards that changed.
+
+        :param columns: A mapping of every task status to its cards, in display order.
+        """
+        self.columns = {status: list(columns.get(status, [])) for status in enums.Taskstatus}
+        remaining = pruneSelection(self.selected, self.columns)
+        for status, view in self.views.items():
+            view.setCards(self.columns[status])
+        if remaining != self.selected:
+            self.select(remaining)
+
+    def apply(self, event) -> None:
+        """
+        Applies a single inserted, updated or deleted card to the board.
+        An updated card keeps its position unless its status changed, then it is appended to its new column.
+
+        :param event: The watcher.ChangeEvent to apply.
+        """
+        self.render(applyEvent(self.columns, event))
+
+    def place(self, cards: list[card]) -> dict:
+        """
+        Shows changed cards right away, before the change is written.
+        A card whose status changed is appended to its new column, other cards keep their position.
+
+        :param cards: The changed cards; cards not on the board are ignored.
+
+        :return: Where the cards were, to pass to `restore` if the write fails.
+        """
+        columns, previous = placeCards(self.columns, cards)
+        self.render(columns)
+        return previous
+
+    def add(self, cards: list[card]) -> dict:
+        """
+        Shows new cards right away at the end of their column, before they are written.
+
+        :param cards: The new cards; cards already on the board are ignored.
+
+        :return: The added cards, to pass to `restore` if the write fails.
+        """
+        columns, previous = addCards(self.columns, cards)
+        self.render(columns)
+        return previous
+
+    def move(self, keys: list[str], status: enums.Taskstatus) -> dict:
+        """
+        Shows cards in another column right away, before the move is written.
+
+        :param keys: The keys of the moved cards.
+        :param status: The new task status.
+
+        :return: Where the cards were, to pass to `restore` if the write fails.
+        """
+        wanted = set(keys)
+        return self.place(
+            [
+                card(current.key, current.type, status)
+                for column in self.columns.values()
+                for current in column
+                if current.key in wanted
+            ]
+        )
+
+    def restore(self, previous: dict, keys: list[str] = None) -> None:
+        """
+        Rolls placed cards back to where they were. Cards that changed again since, e.g. because
+        someone else's change arrived, are left as they are.
+
+        :param previous: The result of `place`, `add` or `move`.
+        :param keys: The keys to roll back, or None for all placed cards.
+        """
+        if keys is not None:
+            previous = {key: previous[key] for key in keys if key in previous}
+        self.render(restoreCards(self.columns, previous))
+
+    def drop(self, current: card, x: int) -> None:
+        """
+        Moves a dragged card, or the whole selection if the card is selected, to the column it was dropped on.
+        The cards move right away; the move is written once no card was dropped for a short while.
+
+        :param current: The dragged card.
+        :param x: The horizontal screen position it was dropped at.
+        """
+        status = columnAt(
+            {
+                status: (view.winfo_rootx(), view.winfo_rootx() + view.winfo_width())
+                for status, view in self.views.items()
+            },
+            x,
+        )
+        if status is None or status == current.status:
+            return
+        keys = [current.key]
+        if current.key in self.selected:
+            keys = self.selection()
+            self.select(set())
+        self.moves.add(self.move(keys, status), status)
+        if self.flushing is not None:
+            self.root.after_cancel(self.flushing)
+        self.flushing = self.root.after(self.delay, self.flush)
+
+    def flush(self) -> None:
+        """
+        Writes the dropped moves, one bulk write per target status; moves that fail are rolled back.
+        """
+        self.flushing = None
+        groups, previous = self.moves.take()
+        for status, keys in groups.items():
+            itemGUI.saveMoves(self.root, keys, status, previous)
+
+    def toggle(self, current: card) -> None:
+        """
+        Adds the given card to the selection, or removes it if it is selected.
+
+        :param current: The card to toggle.
+        """
+        self.select(self.selected ^ {current.key})
+
+    def select(self, keys: set[str]) -> None:
+        """
+        Replaces the selection, redraws the selection marks and informs the selection listeners.
+
+        :param keys: The keys of the selected cards.
+        """
+        self.selected.clear()
+        self.selected.update(keys)
+        for view in self.views.values():
+            view.redraw()
+        for listener in self.selectionListeners:
+            listener(self.selection())
+
+    def selection(self) -> list[str]:
+        """
+        :return: The keys of the selected cards, sorted.
+        """
+        return sorted(self.selected)
+
+    def addSelectionListener(self, listener) -> None:
+        """
+        Registers a callable that is called with the selected keys whenever the selection changes.
+
+        :param listener: A callable taking a list of keys.
+        """
+        self.selectionListeners.append(listener)
+
+    def sync(self, store) -> None:
+        """
+        Starts synchronising the given local replica with MongoDB; the board follows the replica.
+        Remote changes are applied on the Tk thread, local changes that lost against a remote
+        change and unexpected synchronisation errors are reported with a notice.
+
+        :param store: The localStore.LocalStore the board is read from.
+        """
+        events = dispatcher.getDispatcher(self.root)
+
+        def conflicted(key):
+            events.post(
+                lambda: itemGUI.notify(
+                    "Conflict", f"{key} was changed by someone else, your change was replaced"
+                )
+            )
+
+        def failed(error):
+            events.post(
+                lambda: itemGUI.notify(
+                    "Sync error", f"{error}, retrying in the background"
+                )
+            )
+
+        self.engine = sync.SyncEngine(
+            store,
+            onEvent=lambda event: events.post(lambda: self.apply(event)),
+            onConflict=conflicted,
+            onError=failed,
+        )
+        self.engine.start()
+
+    def close(self) -> None:
+        """
+        Writes the dropped moves that are still waiting and stops synchronising the database.
+        A failed write is logged, since the window is closing, and does not keep synchronisation running.
+        """
+        if self.flushing is not None:
+            self.root.after_cancel(self.flushing)
+            self.flushing = None
+        try:
+            for status, keys in self.moves.take()[0].items():
+                history.updateStatus(db.getWrapper(), keys, status)
+        except Exception:
+            logger.exception("Writing the dropped moves failed while closing the board")
+        finally:
+            if self.engine is not None:
+                self.engine.stop()
+                self.engine = None
+
+    def open(self, current: card, widget) -> None:
+        """
+        Opens the editor for the given card.
+
+        :param current: The card to open.
+        :param widget: The button drawing the card.
+        """
+        itemGUI.editItem(self.root, current, widget)
+
+
+class CardSlot:
+    """
+    This class holds a recycled button drawing one card of a virtual column.
+    """
+
+    def __init__(self, button: tb.Button, window: int) -> None:
+        """
+        :param button: The button drawing the card.
+        :param window: The canvas item id embedding the button.
+        """
+        self.button = button
+        self.window = window
+        self.card = None
+        self.drawn = None
+        self.dragging = False
+
+
+class MoveQueue:
+    """
+    This class collects the moves of cards dropped in quick succession, so they can be written together.
+    A card moved several times is written once, with its last status; a card moved back to where it started
+    is not written at all.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty queue.
+        """
+        self.statuses = {}
+        self.previous = {}
+
+    def __len__(self) -> int:
+        """
+        :return: The number of cards waiting to be written.
+        """
+        return len(self.statuses)
+
+    def add(self, previous: dict, status: enums.Taskstatus) -> None:
+        """
+        Adds moves to the queue.
+
+        :param previous: Where the moved cards were, see `Board.move`.
+        :param status: The new task status.
+        """
+        for key, (placed, *before) in previous.items():
+            if key in self.previous:
+                before = self.previous[key][1:]
+            if before[2].status == status:
+                self.statuses.pop(key, None)
+                self.previous.pop(key, None)
+            else:
+                self.statuses[key] = status
+                self.previous[key] = (placed, *before)
+
+    def take(self) -> tuple[dict, dict]:
+        """
+        Empties the queue.
+
+        :return: A mapping of every task status to the keys of the cards moved there,
+                 and where those cards were before their first move, to roll back failed writes.
+        """
+        groups = {}
+        for key, status in self.statuses.items():
+            groups.setdefault(status, []).append(key)
+        previous = self.previous
+        self.statuses, self.previous = {}, {}
+        return groups, previous
+
+
+class VirtualColumn(tb.Frame):
+    def __init__(
+        self,
+        root,
+        onOpen,
+        rowHeight: int = 64,
+        overscan: int = 3,
+        width: int = 180,
+        onSelect=None,
+        isSelected=None,
+        onDrop=None,
+    ) -> None:
+        """
+        Initializes an empty virtual column.
+
+        :param root: The parent widget.
+        :param onOpen: Called with the card and its button when a card is clicked.
+        :param rowHeight: The height of a card in pixels.
+        :param overscan: The number of cards drawn above and below the viewport.
+        :param width: The width of the column in pixels.
+        :param onSelect: Called with the card when a card is Ctrl+clicked.
+        :param isSelected: Returns whether the card with the given key is selected.
+        :param onDrop: Called with the card and the horizontal screen position when a card is dragged and dropped.
+        """
+        super().__init__(root)
+        self.onOpen = onOpen
+        self.onSelect = onSelect or (lambda current: None)
+        self.onDrop = onDrop or (lambda current, x: None)
+        self.isSelected = isSelected or (lambda key: False)
+        self.rowHeight = rowHeight
+        self.overscan = overscan
+        self.width = width
+        self.cards = []
+        self.assigned = {}
+        self.pool = []
+
+        self.canvas = tb.Canvas(
+            self, width=width, highlightthickness=0, yscrollincrement=rowHeight
+        )
+        self.scrollbar = tb.Scrollbar(
+            self, orient="vertical", command=self.canvas.yview
+        )
+        self.canvas.configure(yscrollcommand=self.scrolled)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self.canvas.bind("<Configure>", lambda event: self.redraw())
+        self.bindWheel(self.canvas)
+
+    def setCards(self, cards: list[card]) -> None:
+        """
+        Replaces the cards of the column and redraws the visible window.
+
+        :param cards: The cards of the column, in display order.
+        """
+        self.cards = cards
+        self.canvas.configure(
+            scrollregion=(0, 0, self.width, len(cards) * self.rowHeight)
+        )
+        self.redraw()
+
+    def scrolled(self, first: str, last: str) -> None:
+        """
+        Updates the scrollbar and redraws the visible window after the canvas moved.
+        """
+        self.scrollbar.set(first, last)
+        self.redraw()
+
+    def redraw(self) -> None:
+        """
+        Draws the cards inside the viewport plus overscan, recycling the buttons of cards that scrolled out.
+        """
+        first, last = visibleRange(
+            self.canvas.canvasy(0),
+            self.canvas.winfo_height(),
+            self.rowHeight,
+            len(self.cards),
+            self.overscan,
+        )
+        target = {
+            index: describe(self.cards[index], self.isSelected(self.cards[index].key))
+            for index in range(first, last)
+        }
+        current = {index: slot.drawn for index, slot in self.assigned.items()}
+        entering, changed, leaving = diffSlots(current, target)
+
+        for index in leaving:
+            slot = self.assigned.pop(index)
+            self.canvas.itemconfigure(slot.window, state="hidden")
+            self.pool.append(slot)
+
+        for index in entering:
+            slot = self.pool.pop() if self.pool else self.createSlot()
+            self.assigned[index] = slot
+            self.canvas.coords(slot.window, 0, index * self.rowHeight)
+            self.canvas.itemconfigure(slot.window, state="normal")
+            self.fill(slot, index)
+
+        for index in changed:
+            self.fill(self.assigned[index], index)
+
+    def createSlot(self) -> CardSlot:
+        """
+        Creates a new button embedded in the canvas.
+
+        :return: The new slot.
+        """
+        button = tb.Button(self.canvas)
+        window = self.canvas.create_window(
+            0,
+            0,
+            window=button,
+            anchor="nw",
+            width=self.width,
+            height=self.rowHeight - 4,
+        )
+        slot = CardSlot(button, window)
+        button.configure(command=lambda: self.onOpen(slot.card, slot.button))
+        button.bind("<Control-Button-1>", lambda event: self.selected(slot))
+        button.bind("<B1-Motion>", lambda event: self.dragged(slot))
+        button.bind("<ButtonRelease-1>", lambda event: self.dropped(slot, event))
+        self.bindWheel(button)
+        return slot
+
+    def fill(self, slot: CardSlot, index: int) -> None:
+        """
+        Shows the card at the given index on a slot.
+
+        :param slot: The slot to fill.
+        :param index: The index of the card in the column.
+        """
+        slot.card = self.cards[index]
+        slot.drawn = describe(slot.card, self.isSelected(slot.card.key))
+        text, style = slot.drawn
+        slot.button.configure(text=text, style=style)
+
+    def selected(self, slot: CardSlot) -> str:
+        """
+        Toggles the selection of the card on a slot instead of opening it.
+
+        :param slot: The Ctrl+clicked slot.
+
+        :return: "break", so the button does not open the card.
+        """
+        self.onSelect(slot.card)
+        return "break"
+
+    def dragged(self, slot: CardSlot) -> None:
+        """
+        Shows that the card on a slot is being dragged.
+
+        :param slot: The slot the pointer was pressed on.
+        """
+        if not slot.dragging:
+            slot.dragging = True
+            slot.button.configure(cursor="fleur")
+
+    def dropped(self, slot: CardSlot, event) -> None:
+        """
+        Reports where a dragged card was dropped. The button only opens the card if the pointer
+        is released on it, so a drop onto another column does not open it.
+
+        :param slot: The slot the pointer was pressed on.
+        :param event: The release event.
+        """
+        if slot.dragging:
+            slot.dragging = False
+            slot.button.configure(cursor="")
+            if slot.card is not None:
+                self.onDrop(slot.card, event.x_root)
+
+    def bindWheel(self, widget) -> None:
+        """
+        Scrolls the column with the mouse wheel while the pointer is over the given widget.
+
+        :param widget: The widget receiving wheel events.
+        """
+        widget.bind("<MouseWheel>", self.wheel)
+        widget.bind("<Button-4>", lambda event: self.canvas.yview_scroll(-1, "units"))
+        widget.bind("<Button-5>", lambda event: self.canvas.yview_scroll(1, "units"))
+
+    def wheel(self, event) -> None:
+        """
+        Scrolls the column by one card per wheel step.
+        """
+        self.canvas.yview_scroll(-1 if event.delta > 0 else 1, "units")
+
+
+def describe(current: card, selected: bool = False) -> tuple[str, str]:
+    """
+    :param current: The card to draw.
+    :param selected: Whether the card is selected.
+
+    :return: The (text, style) tuple a card is drawn with; selected cards are marked with a check mark.
+    """
+    text = f"\u2714 {current.key}" if selected else current.key
+    return text, itemGUI.bootstyleFromType(current.type)
+
+
+def pruneSelection(selected: set[str], columns: dict[enums.Taskstatus, list[card]]) -> set[str]:
+    """
+    :param selected: The keys of the selected cards.
+    :param columns: A mapping of every task status to its cards.
+
+    :return: The selected keys that are still on the board.
+    """
+    if not selected:
+        return set()
+    return {current.key for column in columns.values() for current in column} & selected
+
+
+def applyEvent(columns: dict[enums.Taskstatus, list[card]], event) -> dict:
+    """
+    Computes the columns after a single change.
+
+    :param columns: A mapping of every task status to its cards, in display order.
+    :param event: The watcher.ChangeEvent to apply.
+
+    :return: A new mapping of every task status to its cards.
+    """
+    result = {}
+    for status in enums.Taskstatus:
+        result[status] = []
+        for current in columns.get(status, []):
+            if current.key != event.key:
+                result[status].append(current)
+            elif event.card is not None and event.card.status == status:
+                result[status].append(event.card)  # updated in place
+    if event.card is not None and all(
+        c is not event.card for column in result.values() for c in column
+    ):
+        for status in enums.Taskstatus:
+            if event.card.status == status:
+                result[status].append(event.card)
+    return result
+
+
+def placeCards(columns: dict[enums.Taskstatus, list[card]], cards: list[card]) -> tuple[dict, dict]:
+    """
+    Computes the columns after cards changed.
+
+    :param columns: A mapping of every task status to its cards, in display order.
+    :param cards: The changed cards; a card whose status changed is appended to its new column.
+
+    :return: A new mapping of every task status to its cards, and a mapping of the key of every placed card
+             to the placed card, the status and index it had and the card it replaced.
+    """
+    changed = {current.key: current for current in cards}
+    result = {status: [] for status in enums.Taskstatus}
+    previous = {}
+    moved = []
+    for status in enums.Taskstatus:
+        for index, current in enumerate(columns.get(status, [])):
+            placed = changed.get(current.key)
+            if placed is None:
+                result[status].append(current)
+                continue
+            previous[current.key] = (placed, status, index, current)
+            if placed.status == status:
+                result[status].append(placed)
+            else:
+                moved.append(placed)
+    for placed in moved:
+        if placed.status in result:
+            result[placed.status].append(placed)
+    return result, previous
+
+
+def addCards(columns: dict[enums.Taskstatus, list[card]], cards: list[card]) -> tuple[dict, dict]:
+    """
+    Computes the columns after new cards were appended to their column.
+
+    :param columns: A mapping of every task status to its cards, in display order.
+    :param cards: The new cards; cards whose key is already on the board are skipped.
+
+    :return: A new mapping of every task status to its cards, and a mapping of the key of every added card
+             to the added card without a previous place, see `placeCards`.
+    """
+    present = {current.key for column in columns.values() for current in column}
+    result = {status: list(columns.get(status, [])) for status in enums.Taskstatus}
+    previous = {}
+    for current in cards:
+        if current.key in present or current.status not in result:
+            continue
+        result[current.status].append(current)
+        previous[current.key] = (current, None, None, None)
+    return result, previous
+
+
+def restoreCards(columns: dict[enums.Taskstatus, list[card]], previous: dict) -> dict:
+    """
+    Computes the columns after placed cards were put back where they were.
+
+    :param columns: A mapping of every task status to its cards, in display order.
+    :param previous: The placed cards, see `placeCards`. Only cards still showing as placed are put back;
+                     added cards, see `addCards`, are removed.
+
+    :return: A new mapping of every task status to its cards.
+    """
+    showing = {
+        current.key
+        for column in columns.values()
+        for current in column
+        if current.key in previous and current is previous[current.key][0]
+    }
+    result = {
+        status: [current for current in columns.get(status, []) if current.key not in showing]
+        for status in enums.Taskstatus
+    }
+    placed = [(key, entry) for key, entry in previous.items() if entry[3] is not None]
+    for key, (_, status, index, original) in sorted(placed, key=lambda entry: entry[1][2]):
+        if key in showing:
+            result[status].insert(min(index, len(result[status])), original)
+    return result
+
+
+def visibleRange(
+    top: float, height: int, rowHeight: int, total: int, overscan: int
+) -> tuple[int, int]:
+    """
+    Computes which cards are inside the viewport, extended by the overscan on both sides.
+
+    :param top: The canvas coordinate at the top of the viewport.
+    :param height: The height of the viewport in pixels.
+    :param rowHeight: The height of a card in pixels.
+    :param total: The number of cards in the column.
+    :param overscan: The number of extra cards above and below the viewport.
+
+    :return: The index of the first card to draw and the index after the last one.
+    """
+    first = max(0, int(top // rowHeight) - overscan)
+    last = min(total, math.ceil((top + height) / rowHeight) + overscan)
+    return first, max(first, last)
+
+
+def diffSlots(current: dict, target: dict) -> tuple[list, list, list]:
+    """
+    Compares the drawn cards with the target cards by position.
+
+    :param current: The drawn mapping of card index to (key, style).
+    :param target: The desired mapping of card index to (key, style).
+
+    :return: The indices that need a slot, the indices whose slot needs new content,
+             and the indices whose slot can be recycled, in that order.
+    """
+    entering = [index for index in target if index not in current]
+    leaving = [index for index in current if index not in target]
+    changed = [
+        index
+        for index, drawn in target.items()
+        if index in current and current[index] != drawn
+    ]
+    return entering, changed, leaving
+
+
+def columnAt(bounds: dict, x: int):
+    """
+    :param bounds: A mapping of every task status to the left and right screen position of its column.
+    :param x: A horizontal screen position.
+
+    :return: The task status of the column at the position, or None if it is between or beside the columns.
+    """
+    for status, (left, right) in bounds.items():
+        if left <= x < right:
+            return status
+    return None
+
+
+_shared = None
+_sharedLock = threading.Lock()
+
+
+def getBoard(widget) -> Board:
+    """
+    Returns the process-wide Board, creating it on the given widget on first use.
+
+    :param widget: The frame holding the board columns.
+
+    :return: The shared Board.
+    """
+    global _shared
+    with _sharedLock:
+        if _shared is None:
+            _shared = Board(widget)
+        return _shared
+
+
+def setBoard(board) -> None:
+    """
+    Replaces the process-wide Board.
+
+    :param board: The Board (or a compatible test double) to share, None to reset.
+    """
+    global _shared
+    with _sharedLock:
+        _shared = board
+
+
+def closeBoard() -> None:
+    """
+    Stops the process-wide Board from synchronising the database if one was created and resets it.
+    """
+    global _shared
+    with _sharedLock:
+        if _shared is not None:
+            _shared.close()
+            _shared = None
@@ -7,21 +7,34 @@ provides clear documentation on its purpose, parameters, and return values.
 The buttons created include:
 
 - `listButton`: Creates a button to display a list of all Kanban board items.
+- `treeButton`: Creates a button to display the epic/task/subtask tree.
 - `fileButton`: Creates a button to open a file located within the project root directory.
 - `websiteButton`: Creates a button to open a specified URL in the user's default web browser.
 - `creationButton`: Creates a button to initiate the process of creating a new Kanban board item.
 - `refreshButton`: Creates a button to refresh the entire Kanban board display.
+- `loadingLabel`: Creates a label indicating that database calls are running in the background.
+- `selectionBar`: Creates the controls to move or delete all selected cards at once.
+- `searchBar`: Creates a search entry listing the best matching items while typing.
+- `metricsPanel`: Creates the labels showing the estimated and spent time per column, type and epic.
 
 Additionally, helper functions `openFromProjectRoot` and `openURL` are defined to handle file opening and URL launching,
 respectively. These functions raise `FileNotFoundError` if the specified file is not found.
 """
 
 import os
+import threading
+import tkinter as tk
 import webbrowser
 
 import ttkbootstrap as tb
 
-from . import itemGUI
+from . import boardGUI, db, dispatcher, enums, hierarchy, itemGUI, itemUtil, metrics
+from .persistence import toText
+
+EPICS = 5
+"""
+The number of epics with the largest estimates shown by `metricsPanel`.
+"""
 
 
 def listButton(root: tb.Frame, container: tb.Frame, r: int, c: int) -> tb.Button:
@@ -45,6 +58,26 @@ def listButton(root: tb.Frame, container: tb.Frame, r: int, c: int) -> tb.Button
     return button
 
 
+def treeButton(root: tb.Frame, r: int, c: int) -> tb.Button:
+    """
+    Creates a button to show the epic/task/subtask tree.
+
+    :param root: The ttkbootstrap root window.
+    :param r: The row number for the button.
+    :param c: The column number for the button.
+
+    :return: ttkbootstrap.Button to show the tree of all items.
+    """
+    button = tb.Button(
+        root,
+        text="Hierarchy",
+        command=lambda: itemGUI.treeItems(root),
+        style="KanbanGUI.TButton",
+    )
+    button.grid(row=r, column=c, ipady=15, ipadx=15, pady=5, padx=5)
+    return button
+
+
 def fileButton(
     root: tb.Frame, r: int, c: int, labelText: str, fileName: str
 ) -> tb.Button:
@@ -157,3 +190,211 @@ def refreshButton(root: tb.Window, r: int, c: int) -> tb.Button:
     )
     Button.grid(row=r, column=c, ipady=15, ipadx=15, pady=5, padx=5)
     return Button
+
+
+def loadingLabel(root: tb.Frame, r: int, c: int) -> tb.Label:
+    """
+    Creates a label that shows "Loading..." while database calls are running in the background.
+
+    :param root: The parent widget.
+    :param r: The row number for the label.
+    :param c: The column number for the label.
+
+    :return: The loading label.
+    """
+    label = tb.Label(root, text="", style="KanbanGUI.TLabel")
+    label.grid(row=r, column=c)
+    dispatcher.getDispatcher(root).addBusyListener(
+        lambda busy: label.configure(text="Loading..." if busy else "")
+    )
+    return label
+
+
+def selectionBar(root: tb.Frame, r: int, c: int) -> tb.Frame:
+    """
+    Creates the controls to move or delete the cards selected with Ctrl+click.
+    The controls are disabled while no card is selected.
+
+    :param root: The frame holding the board.
+    :param r: The row number for the controls.
+    :param c: The first column number for the controls; they span two columns.
+
+    :return: The frame holding the controls.
+    """
+    bar = tb.Frame(root)
+    bar.grid(row=r, column=c, columnspan=2)
+    board = boardGUI.getBoard(root)
+
+    label = tb.Label(bar, text="0 selected")
+    label.grid(row=0, column=0, padx=5)
+    status = tb.Combobox(bar, values=itemUtil.taskstates(), state="readonly", width=10)
+    status.current(0)
+    status.grid(row=0, column=1, padx=5)
+    move = tb.Button(
+        bar,
+        text="Move",
+        command=lambda: itemGUI.moveItems(
+            root, board.selection(), enums.Taskstatus(status.get())
+        ),
+        style="info-outline",
+    )
+    move.grid(row=0, column=2, padx=5)
+    delete = tb.Button(
+        bar,
+        text="Delete",
+        command=lambda: itemGUI.deleteItems(root, board.selection()),
+        style="danger-outline",
+    )
+    delete.grid(row=0, column=3, padx=5)
+    clear = tb.Button(
+        bar, text="Clear", command=lambda: board.select(set()), style="secondary-outline"
+    )
+    clear.grid(row=0, column=4, padx=5)
+
+    def changed(keys):
+        label.configure(text=f"{len(keys)} selected")
+        for button in (move, delete, clear):
+            button.configure(state="normal" if keys else "disabled")
+
+    changed([])
+    board.addSelectionListener(changed)
+    return bar
+
+
+def searchBar(root: tb.Frame, r: int, c: int, delay: int = 150, limit: int = 10) -> tb.Frame:
+    """
+    Creates a search entry for keys and descriptions. The best matching items are listed in a drop-down
+    over the board while typing, selecting one opens it in the editor.
+
+    :param root: The frame holding the board.
+    :param r: The row number for the search entry.
+    :param c: The column number for the search entry.
+    :param delay: The number of milliseconds typing has to pause before searching.
+    :param limit: The maximum number of listed items.
+
+    :return: The frame holding the entry.
+    """
+    bar = tb.Frame(root)
+    bar.grid(row=r, column=c)
+    entry = tb.Entry(bar, width=30)
+    entry.grid(row=0, column=0)
+    results = tk.Listbox(root, height=limit)
+    cards = []
+    pending = {"after": None}
+
+    def show(found):
+        cards[:] = found
+        results.delete(0, tk.END)
+        for current in found:
+            results.insert(tk.END, f"{current.key}  ({toText(current.status)})")
+        if found:
+            results.place(in_=entry, x=0, rely=1, relwidth=1)
+            results.lift()
+        else:
+            results.place_forget()
+
+    def run():
+        pending["after"] = None
+        text = entry.get()
+        dispatcher.getDispatcher(root).submit(
+            lambda: db.getWrapper().search(text, limit),
+            onSuccess=show,
+            onError=itemGUI.showError,
+            tag="search",
+        )
+
+    # Search once typing pauses, a newer search supersedes one that is still running
+    def typed(event):
+        if pending["after"] is not None:
+            entry.after_cancel(pending["after"])
+        pending["after"] = entry.after(delay, run)
+
+    def opened(event):
+        if results.curselection():
+            itemGUI.editItem(root, cards[results.curselection()[0]], None)
+
+    entry.bind("<KeyRelease>", typed)
+    entry.bind("<Escape>", lambda event: (entry.delete(0, tk.END), show([])))
+    results.bind("<<ListboxSelect>>", opened)
+    return bar
+
+
+def metricsPanel(root: tb.Frame, r: int, delay: int = 1000) -> tb.Frame:
+    """
+    Creates the dashboard showing the number of items and their estimated and spent time below every column,
+    and the totals per type and of the largest epics, summed over everything below them, below the board.
+    The totals are computed in the background once and again a short while after the items changed,
+    once for a burst of writes, without showing the loading indicator.
+
+    :param root: The frame holding the board.
+    :param r: The row number for the column totals; the type and epic totals go in the row below.
+    :param delay: The number of milliseconds between the first change and the refresh.
+
+    :return: The frame holding the type and epic totals.
+    """
+    columns = {}
+    for column, status in enumerate(enums.Taskstatus):
+        columns[status.value] = tb.Label(root, text="", justify="center")
+        columns[status.value].grid(row=r, column=column, pady=5)
+    panel = tb.Frame(root)
+    panel.grid(row=r + 1, column=0, columnspan=len(columns), pady=5)
+    types = tb.Label(panel, text="")
+    types.grid(row=0, column=0, padx=5)
+    epics = tb.Label(panel, text="")
+    epics.grid(row=1, column=0, padx=5)
+    events = dispatcher.getDispatcher(root)
+    changed = threading.Event()
+    state = {"repository": None}
+
+    def read():
+        repository = db.getWrapper()
+        if repository is not state["repository"]:
+            state["repository"] = repository
+            repository.cache.addInvalidationListener(invalidated)
+        index = hierarchy.getHierarchy()
+        largest = sorted(
+            ((key, index.rollup(key)) for key in index.ofType(enums.Tasktype.epic)),
+            key=lambda entry: entry[1]["estimate"],
+            reverse=True,
+        )
+        return repository.readMetrics(), largest[:EPICS]
+
+    def show(result):
+        totals, largest = result
+        for value, label in columns.items():
+            label.configure(text=metrics.describe(totals["status"].get(value)))
+        types.configure(
+            text="   ".join(
+                f"{t.value}: {metrics.describe(totals['type'].get(t.value), ', ')}"
+                for t in enums.Tasktype
+            )
+        )
+        epics.configure(
+            text="   ".join(f"{key}: {metrics.describe(rollup, ', ')}" for key, rollup in largest)
+        )
+
+    def unavailable(error):
+        for label in columns.values():
+            label.configure(text="")
+        types.configure(text=f"Metrics unavailable: {error}")
+
+    # Called on any thread for every written or pulled item, only the first change until the refresh schedules it
+    def invalidated(key):
+        if not changed.is_set():
+            changed.set()
+            events.post(lambda: panel.after(delay, update))
+
+    def update():
+        if not panel.winfo_exists():
+            return
+        changed.clear()
+        events.submit(
+            read,
+            onSuccess=show,
+            onError=unavailable,
+            tag="metrics",
+            quiet=True,
+        )
+
+    update()
+    return panel
@@ -0,0 +1,123 @@
+"""
+This file provides a bounded, expiring cache for items read from the database.
+
+- `ItemCache`: A thread-safe least-recently-used cache keyed by item key, with a time-to-live per entry,
+               hit/miss counters for diagnostics and listeners notified of every invalidation.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from .persistence import item
+
+
+class ItemCache:
+    def __init__(self, maxsize: int = 256, ttl: float = 30.0, clock=time.monotonic) -> None:
+        """
+        Initializes an empty cache.
+
+        :param maxsize: The maximum number of items kept; the least recently used item is evicted first.
+        :param ttl: The number of seconds an item stays valid after it was stored.
+        :param clock: A callable returning the current time in seconds, replaceable for tests.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.listeners = []
+        self.generation = 0
+
+    def get(self, key: str) -> item | None:
+        """
+        Returns a cached item and marks it as recently used.
+
+        :param key: The key of the item.
+
+        :return: The cached item, or None if it is missing or expired.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] <= self.clock():
+                del self.entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, current: item, generation: int = None) -> None:
+        """
+        Stores an item, evicting the least recently used one if the cache is full.
+
+        :param current: The item to store.
+        :param generation: The `generation` read before the item was read from the database; the item is not
+                           stored if anything was invalidated since, as it may predate a concurrent write.
+        """
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+            self.entries[current.key] = (self.clock() + self.ttl, current)
+            self.entries.move_to_end(current.key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        """
+        Removes an item, e.g. after it was written.
+
+        :param key: The key of the item.
+        """
+        with self.lock:
+            self.entries.pop(key, None)
+            self.generation += 1
+        for listener in list(self.listeners):
+            listener(key)
+
+    def clear(self) -> None:
+        """
+        Removes all items.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.generation += 1
+        for listener in list(self.listeners):
+            listener(None)
+
+    def addInvalidationListener(self, listener) -> None:
+        """
+        Registers a callable that is called whenever items are invalidated, so derived indexes can follow every write.
+
+        :param listener: A callable taking the invalidated key, or None if all items were removed.
+        """
+        self.listeners.append(listener)
+
+    def removeInvalidationListener(self, listener) -> None:
+        """
+        Unregisters a callable registered with `addInvalidationListener`.
+
+        :param listener: The callable.
+        """
+        self.listeners.remove(listener)
+
+    def stats(self) -> dict[str, int]:
+        """
+        :return: The number of hits, misses, evictions and expirations so far and the current size.
+        """
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": len(self.entries),
+            }
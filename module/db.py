@@ -3,22 +3,117 @@ This file provides a wrapper class for interacting with a MongoDB database
 to manage Kanban task items.
 
 - `Wrapper`: A class that encapsulates MongoDB connection and data access logic
-            for Kanban items.
+            for Kanban items, the MongoDB engine of `repository.Repository`.
 - `deserializeMultiple`: A function that deserializes a list of MongoDB documents
                          into a list of Kanban item objects.
+- `deserializeCards`: A function that deserializes a list of projected MongoDB documents
+                      into a list of cards.
+- `bucketByStatus`: A function that groups items into a status-keyed mapping.
+- `timestamp`: A function returning the time stored with every write.
+- `planIndex`: A function that extracts the index used by an explained query plan.
+- `reportDuplicates`: A function printing the keys stored in more than one document.
+- `getWrapper`: Returns the process-wide `Wrapper`, creating it on first use.
+- `setWrapper`: Replaces the process-wide `Wrapper`, e.g. with a test double.
+- `closeWrapper`: Closes and forgets the process-wide `Wrapper`.
 """
 
+import datetime
+import itertools
+import re
+
+from pymongo import ASCENDING, TEXT, DeleteOne, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
 from pymongo.mongo_client import MongoClient
-from ttkbootstrap.dialogs import Messagebox
 import os.path
+import threading
+
+from . import enums, history, metrics, search
+from .cache import ItemCache
+from .persistence import (
+    SCHEMA_VERSION,
+    card,
+    item,
+    node,
+    deserialize,
+    deserializeCard,
+    deserializeNode,
+    upgrade,
+)
+from .repository import Repository
+
+INDEXES = {
+    "key_unique": {"keys": [("key", ASCENDING)], "unique": True},
+    "status": {"keys": [("status", ASCENDING)]},
+    "parent": {"keys": [("parent", ASCENDING)]},
+    "updatedAt": {"keys": [("updatedAt", ASCENDING)]},
+    "text": {
+        "keys": [("key", TEXT), ("description", TEXT)],
+        "options": {"weights": {"key": search.KEY_WEIGHT, "description": 1}},
+    },
+}
+"""
+Indexes maintained on every collection, by index name.
+"""
 
-from . import enums
-from .persistence import item, deserialize
+CARD_PROJECTION = {"_id": 0, "key": 1, "type": 1, "status": 1}
+"""
+Projection limiting documents to the fields needed to draw a card,
+skipping the description and history payloads.
+"""
 
+HISTORY_INDEXES = {
+    "id_unique": {"keys": [("id", ASCENDING)], "unique": True},
+    "key_date": {"keys": [("key", ASCENDING), ("date", ASCENDING)]},
+}
+"""
+Indexes maintained on the history collection, by index name.
+"""
+
+HISTORY_BATCH = 1000
+"""
+The number of folded events deleted, or of keys whose events are read, per round trip.
+"""
+
+NODE_PROJECTION = {"_id": 0, "key": 1, "type": 1, "parent": 1, "estimate": 1, "time_spent": 1}
+"""
+Projection limiting documents to the fields needed to place an item in the epic/task/subtask tree.
+"""
 
-class Wrapper:
+SETUP_VERSION = 1
+"""
+Version of the indexes and the revision backfill applied by `Wrapper.ensureSetup`;
+raise it when either changes, so the next connection applies them again.
+"""
+
+DUPLICATE_KEY = 11000
+"""
+Server error code of a write rejected by the unique index on key.
+"""
+
+CHANGE_PIPELINE = [
+    {"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}},
+    {
+        "$project": {
+            "operationType": 1,
+            "documentKey": 1,
+            "fullDocument.key": 1,
+            "fullDocument.type": 1,
+            "fullDocument.status": 1,
+        }
+    },
+]
+"""
+Change stream pipeline limiting events to document changes, projected to the card fields.
+"""
+
+
+class Wrapper(Repository):
     def __init__(
-        self, uri: str = None, dbcontext: str = None, collection: str = None
+        self,
+        uri: str = None,
+        dbcontext: str = None,
+        collection: str = None,
+        cache: ItemCache = None,
     ) -> None:
         """
         Initializes the Wrapper class with the given MongoDB URI, database context, and collection.
@@ -26,7 +121,9 @@ class Wrapper:
         :param uri: The MongoDB URI. Default is "mongodb://localhost:27017".
         :param dbcontext: The database context. Default is "kanban".
         :param collection: The collection. Default is "showcase".
+        :param cache: The cache for items read by key. Default is a new ItemCache.
         """
+        self.cache = ItemCache() if cache is None else cache
         if uri is None and dbcontext is None and collection is None:
             credentials = readCredentials("resources/credentials.txt")
             self.uri = credentials["uri"]
@@ -47,6 +144,92 @@ class Wrapper:
         )
         db = self.client[self.dbcontext]
         self.connection = db[self.collection]
+        self.events = db.get_collection(f"{self.collection}_history")
+        self.meta = db.get_collection(f"{self.collection}_meta")
+        try:
+            self.ensureSetup()
+        except Exception:
+            self.client.close()  # do not leak monitor threads if the server is unreachable
+            raise
+
+    def ensureSetup(self, force: bool = False) -> None:
+        """
+        Creates the indexes and gives old documents a revision, unless a marker document shows this was done
+        for the current SETUP_VERSION already, so connecting costs one lookup instead of a write over the collection.
+        Duplicate keys do not stop the setup; the unique index on key is created by `--migrate`
+        once they are resolved.
+
+        :param force: True to apply them regardless of the marker, e.g. when migrating.
+        """
+        if not force and self.meta.find_one({"_id": "setup", "version": {"$gte": SETUP_VERSION}}) is not None:
+            return
+        self.ensureIndexes()
+        self.ensureRevisions()
+        self.meta.update_one({"_id": "setup"}, {"$max": {"version": SETUP_VERSION}}, upsert=True)
+
+    def ensureIndexes(self) -> list[str]:
+        """
+        Creates the indexes on key, status, parent and updatedAt, the text index and the indexes
+        of the history collection if they do not exist yet.
+        Creating an existing index is a no-op on the server, so this is safe to call repeatedly.
+        A unique index is skipped while the collection holds duplicates, see `readDuplicateKeys`.
+
+        :return: The names of the unique indexes skipped because of duplicates.
+        """
+        skipped = []
+        for collection, indexes in ((self.connection, INDEXES), (self.events, HISTORY_INDEXES)):
+            for name, spec in indexes.items():
+                try:
+                    collection.create_index(
+                        spec["keys"],
+                        name=name,
+                        unique=spec.get("unique", False),
+                        **spec.get("options", {}),
+                    )
+                except OperationFailure as error:
+                    if error.code != DUPLICATE_KEY:
+                        raise
+                    skipped.append(name)
+        return skipped
+
+    def readDuplicateKeys(self) -> dict[str, int]:
+        """
+        :return: A mapping of every key stored in more than one document to its number of documents.
+        """
+        result = self.connection.aggregate(
+            [
+                {"$group": {"_id": "$key", "count": {"$sum": 1}}},
+                {"$match": {"count": {"$gt": 1}}},
+            ]
+        )
+        return {group["_id"]: group["count"] for group in result}
+
+    def ensureRevisions(self) -> None:
+        """
+        Gives documents written before revisions existed revision 1,
+        so revision 0 unambiguously means "never written to MongoDB" for local replicas.
+        """
+        self.connection.update_many(
+            {"revision": {"$exists": False}}, {"$set": {"revision": 1}}
+        )
+
+    def explainQueries(self) -> dict[str, str]:
+        """
+        Explains the queries issued by this class and reports the index each one uses.
+
+        :return: A mapping of query description to index name, or the plan stage (e.g. COLLSCAN) if no index is used.
+        """
+        queries = {
+            "key": {"key": ""},
+            "status": {"status": enums.Taskstatus.open.value},
+            "board": {"status": {"$in": [s.value for s in enums.Taskstatus]}},
+            "parent": {"parent": ""},
+        }
+        report = {}
+        for name, criteria in queries.items():
+            plan = self.connection.find(criteria).explain()
+            report[name] = planIndex(plan["queryPlanner"]["winningPlan"])
+        return report
 
     def readAll(self) -> list[item]:
         """
@@ -69,38 +252,473 @@ class Wrapper:
         result = self.connection.find(criteria)
         return deserializeMultiple(result)
 
-    def updateItem(self, current: item) -> bool:
+    def readItem(self, key: str) -> item | None:
+        """
+        Reads a single document from the MongoDB collection by its key,
+        answering from the cache if the item was read recently.
+        The item is a copy of the cached one, so callers may edit it and pass it to `updateItem`.
+
+        :param key: The key of the item.
+
+        :return: The deserialized item, or None if the key does not exist.
+        """
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached.copy()
+        generation = self.cache.generation
+        doc = self.connection.find_one({"key": key})
+        if doc is None:
+            return None
+        current = deserialize(doc)
+        self.cache.put(current, generation)
+        return current.copy()
+
+    def readCards(self, type: enums.Taskstatus = None) -> list[card]:
+        """
+        Reads the card representation of all documents, optionally limited to the given status.
+
+        :param type: The task status, or None to read all cards.
+
+        :return: A list of deserialized cards.
+        """
+        criteria = {} if type is None else {"status": type.value}
+        result = self.connection.find(criteria, CARD_PROJECTION)
+        return deserializeCards(result)
+
+    def readBoard(self) -> dict[enums.Taskstatus, list[card]]:
+        """
+        Reads the cards of all board columns with a single projected query.
+
+        :return: A mapping of every task status to its deserialized cards.
         """
-        Updates the given item in the MongoDB collection if its key exists.
+        criteria = {"status": {"$in": [status.value for status in enums.Taskstatus]}}
+        result = self.connection.find(criteria, CARD_PROJECTION)
+        return bucketByStatus(deserializeCards(result))
+
+    def readPage(self, after: str = None, limit: int = 50, prefix: str = "") -> list[card]:
+        """
+        Reads one page of cards ordered by key, continuing after the given key (keyset pagination).
+        Both the continuation and the prefix filter are answered from the unique index on key,
+        so the cost of a page does not depend on its position in the collection.
+
+        :param after: The last key of the previous page, or None for the first page.
+        :param limit: The maximum number of cards on the page.
+        :param prefix: Only read keys starting with this text; empty to read all keys.
+
+        :return: A list of deserialized cards, shorter than limit on the last page.
+        """
+        criteria = {}
+        if after is not None:
+            criteria["$gt"] = after
+        if prefix:
+            criteria["$regex"] = "^" + re.escape(prefix)
+        result = (
+            self.connection.find({"key": criteria} if criteria else {}, CARD_PROJECTION)
+            .sort("key", ASCENDING)
+            .limit(limit)
+        )
+        return deserializeCards(result)
+
+    def readKeys(self) -> set[str]:
+        """
+        Reads the keys of all documents; the query is covered by the unique index on key.
+
+        :return: A set of all keys.
+        """
+        return {doc["key"] for doc in self.connection.find({}, {"_id": 0, "key": 1})}
+
+    def readKeyIds(self) -> dict:
+        """
+        Reads the document ids of all documents, used to resolve delete events to keys.
+
+        :return: A mapping of document id to key.
+        """
+        return {doc["_id"]: doc["key"] for doc in self.connection.find({}, {"key": 1})}
+
+    def readMetrics(self) -> dict[str, dict]:
+        """
+        Computes the metrics on the server with a single aggregation, so no documents are transferred.
+
+        :return: The metrics, see `metrics.summarize`.
+        """
+        return metrics.fromFacets(next(self.connection.aggregate(metrics.PIPELINE), {}))
+
+    def readNodes(self, keys: set[str] = None) -> list[node]:
+        """
+        Reads the tree view of items, projected to the fields the hierarchy needs.
+
+        :param keys: The keys to read, or None to read all items. Missing keys are skipped.
+
+        :return: The nodes of the items.
+        """
+        criteria = {} if keys is None else {"key": {"$in": list(keys)}}
+        result = self.connection.find(criteria, NODE_PROJECTION)
+        return [deserializeNode(doc) for doc in result]
+
+    def search(self, text: str, limit: int = 50) -> list[card]:
+        """
+        Finds the items whose key or description contain words of the text, using the text index on the server.
+        MongoDB matches whole words (with stemming) and ranks by its text score.
+
+        :param text: The search text.
+        :param limit: The maximum number of results.
+
+        :return: The cards of the best matching items, best first.
+        """
+        if not search.tokenize(text):
+            return []
+        score = {"$meta": "textScore"}
+        result = (
+            self.connection.find({"$text": {"$search": text}}, {**CARD_PROJECTION, "score": score})
+            .sort([("score", score)])
+            .limit(limit)
+        )
+        return deserializeCards(result)
+
+    def readChangedSince(self, since: datetime.datetime) -> list[card]:
+        """
+        Reads the cards of all documents written after the given time.
+
+        :param since: The time of the last read.
+
+        :return: A list of deserialized cards.
+        """
+        criteria = {"updatedAt": {"$gt": since}}
+        result = self.connection.find(criteria, CARD_PROJECTION)
+        return deserializeCards(result)
+
+    def readRevision(self, key: str) -> tuple[item, int] | None:
+        """
+        Reads a single document by its key together with its revision, bypassing the cache.
+
+        :param key: The key of the item.
+
+        :return: The deserialized item and its revision, or None if the key does not exist.
+        """
+        doc = self.connection.find_one({"key": key})
+        return None if doc is None else (deserialize(doc), doc.get("revision", 0))
+
+    def readChangedItems(self, since: datetime.datetime = None) -> list[tuple[item, int]]:
+        """
+        Reads all documents written after the given time together with their revisions.
+
+        :param since: The time of the last read, or None to read all documents.
+
+        :return: A list of deserialized items and their revisions.
+        """
+        criteria = {} if since is None else {"updatedAt": {"$gt": since}}
+        return [
+            (deserialize(doc), doc.get("revision", 0))
+            for doc in self.connection.find(criteria)
+        ]
+
+    def watchChanges(self):
+        """
+        Opens a change stream on the collection, projected to the card fields.
+        Change streams are only available on replica sets and sharded clusters.
+
+        :return: The pymongo change stream.
+
+        :raises pymongo.errors.OperationFailure: If the server does not support change streams.
+        """
+        return self.connection.watch(
+            CHANGE_PIPELINE,
+            full_document="updateLookup",
+            max_await_time_ms=500,
+        )
+
+    def updateItem(self, current: item) -> bool | None:
+        """
+        Updates the changed attributes of the given item in the MongoDB collection if its key exists.
+        Nothing is sent if no attribute changed; if the item knows its revision, the update is a compare-and-set.
 
         :param current: The item to update.
-        :return: True if the item was updated, False otherwise.
-        """
-        # check if key exists in db
-        # if true update
-        if self.keyExists(current.key):
-            criteria = {"key": current.key}
-            update = {"$set": current.updateDict()}
-            self.connection.update_one(criteria, update)
+        :return: True if the item was updated or nothing changed, False if the key does not exist,
+                 None if someone else wrote the item since it was read.
+        """
+        changes = current.changedDict()
+        if not changes:
             return True
-        else:
-            return False
+        criteria = {"key": current.key}
+        if current.revision is not None:
+            criteria["revision"] = current.revision
+        update = {
+            "$set": {**changes, "updatedAt": timestamp()},
+            "$inc": {"revision": 1},
+        }
+        try:
+            result = self.connection.update_one(criteria, update)
+        finally:
+            self.cache.invalidate(current.key)
+        if result.matched_count > 0:
+            return True
+        if current.revision is not None and self.keyExists(current.key):
+            return None
+        return False
+
+    def updateRevision(self, current: item, revision: int) -> int | None:
+        """
+        Updates the given item only if its stored revision still matches (compare-and-set).
+
+        :param current: The item to update.
+        :param revision: The revision the changes are based on; 0 for documents written before revisions existed.
+
+        :return: The new revision, or None if the item was changed or deleted by someone else.
+        """
+        criteria = {"key": current.key, "revision": revision}
+        if revision == 0:
+            criteria["revision"] = {"$in": [0, None]}
+        update = {
+            "$set": {**current.updateDict(), "updatedAt": timestamp()},
+            "$inc": {"revision": 1},
+        }
+        try:
+            result = self.connection.update_one(criteria, update)
+        finally:
+            self.cache.invalidate(current.key)
+        return revision + 1 if result.matched_count > 0 else None
 
     def insertItem(self, current: item) -> bool:
         """
         Inserts the given item into the MongoDB collection if its key does not exist.
+        The unique index on key rejects duplicates, so no separate existence check is needed.
 
         :param current: The item to insert.
         :return: True if the item was inserted, False otherwise.
         """
-        # check if key exists in db
-        if not self.keyExists(current.key):
-            self.connection.insert_one(current.insertDict())
-            Messagebox.ok("Item inserted", "Success")
-            return True
-        else:
-            Messagebox.ok("Item not inserted", "Unsuccessful")
+        try:
+            self.connection.insert_one(
+                {**current.insertDict(), "updatedAt": timestamp(), "revision": 1}
+            )
+        except DuplicateKeyError:
             return False
+        finally:
+            self.cache.invalidate(current.key)
+        return True
+
+    def insertItems(self, items: list[item]) -> dict[str, bool]:
+        """
+        Inserts many items in one unordered batch; items whose key already exists are skipped.
+
+        :param items: The items to insert.
+        :return: A mapping of every key to True if its item was inserted, False otherwise.
+        """
+        now = timestamp()
+        results = {current.key: True for current in items}
+        if not items:
+            return results
+        requests = [
+            InsertOne({**current.insertDict(), "updatedAt": now, "revision": 1})
+            for current in items
+        ]
+        try:
+            self.connection.bulk_write(requests, ordered=False)
+        except BulkWriteError as error:
+            for failure in error.details["writeErrors"]:
+                if failure["code"] != DUPLICATE_KEY:
+                    raise
+                results[items[failure["index"]].key] = False
+        finally:
+            for current in items:
+                self.cache.invalidate(current.key)
+        return results
+
+    def updateStatus(self, keys: list[str], status: enums.Taskstatus) -> dict[str, bool]:
+        """
+        Moves many items to the given status in one batch.
+
+        :param keys: The keys of the items to move.
+        :param status: The new task status.
+        :return: A mapping of every key to True if its item was moved, False if it does not exist.
+        """
+        update = {
+            "$set": {"status": status.value, "updatedAt": timestamp()},
+            "$inc": {"revision": 1},
+        }
+        return self.bulkByKey(keys, lambda key: UpdateOne({"key": key}, update), remains=True)
+
+    def deleteItems(self, keys: list[str]) -> dict[str, bool]:
+        """
+        Deletes many items in one batch.
+
+        :param keys: The keys of the items to delete.
+        :return: A mapping of every key to True if its item was deleted, False if it does not exist.
+        """
+        return self.bulkByKey(keys, lambda key: DeleteOne({"key": key}), remains=False)
+
+    def deleteRevision(self, key: str, revision: int) -> bool | None:
+        """
+        Deletes an item only if its stored revision still matches (compare-and-set).
+
+        :param key: The key of the item.
+        :param revision: The revision the deletion is based on.
+
+        :return: True if the item was deleted, False if it was already gone,
+                 None if it was changed by someone else.
+        """
+        try:
+            deleted = self.connection.delete_one({"key": key, "revision": revision}).deleted_count
+        finally:
+            self.cache.invalidate(key)
+        if deleted > 0:
+            return True
+        return None if self.keyExists(key) else False
+
+    def bulkByKey(self, keys: list[str], request, remains: bool) -> dict[str, bool]:
+        """
+        Runs one write request per existing key in a single unordered batch.
+        Bulk results only carry totals, so the existing keys are looked up first to report per key.
+        If the write matched fewer documents, because a key was deleted or renamed in between,
+        the keys are looked up again and only those the write can have matched are reported as written.
+
+        :param keys: The keys of the items to write.
+        :param request: A callable creating the write request for a key.
+        :param remains: True if written documents still exist afterwards (updates), False if the write removes them.
+
+        :return: A mapping of every key to True if it existed and was written, False otherwise.
+        """
+        found = self.readExisting(keys)
+        written = found
+        requests = [request(key) for key in keys if key in found]
+        try:
+            if requests:
+                result = self.connection.bulk_write(requests, ordered=False)
+                count = result.matched_count if remains else result.deleted_count
+                if count < len(requests):
+                    after = self.readExisting(found)
+                    written = found & after if remains else found - after
+        finally:
+            for key in found:
+                self.cache.invalidate(key)
+        return {key: key in written for key in keys}
+
+    def readExisting(self, keys) -> set[str]:
+        """
+        :param keys: The keys to look up.
+
+        :return: The keys that exist, in one round trip.
+        """
+        return {
+            document["key"]
+            for document in self.connection.find(
+                {"key": {"$in": list(keys)}}, {"_id": 0, "key": 1}
+            )
+        }
+
+    def appendHistory(self, events: list[dict]) -> None:
+        """
+        Appends events to the history collection in one unordered batch; events whose id is already stored are skipped,
+        so pushing the same events again is harmless.
+
+        :param events: The events, see `history`.
+        """
+        if not events:
+            return
+        try:
+            self.events.insert_many([dict(current) for current in events], ordered=False)
+        except BulkWriteError as error:
+            if any(failure["code"] != DUPLICATE_KEY for failure in error.details["writeErrors"]):
+                raise
+
+    def readEvents(self, key: str) -> list[dict]:
+        """
+        :param key: The key of the item.
+
+        :return: The logged events of the item, by date.
+        """
+        result = self.events.find({"key": key}, {"_id": 0}).sort("date", ASCENDING)
+        return [{**current, "date": history.toUTC(current["date"])} for current in result]
+
+    def readEventsOf(self, keys: list[str]) -> list[dict]:
+        """
+        :param keys: The keys of the items.
+
+        :return: The logged events of all the given items, in one round trip per HISTORY_BATCH keys.
+        """
+        keys = list(keys)
+        events = []
+        for start in range(0, len(keys), HISTORY_BATCH):
+            result = self.events.find({"key": {"$in": keys[start : start + HISTORY_BATCH]}}, {"_id": 0})
+            events += [{**current, "date": history.toUTC(current["date"])} for current in result]
+        return events
+
+    def compactHistory(self, before: datetime.datetime) -> int:
+        """
+        Folds the logged events older than the given time into one snapshot per item, streaming item by item.
+        The snapshots are written before the folded events are deleted, so an interrupted run loses nothing.
+
+        :param before: Events older than this time are folded.
+
+        :return: The number of folded events.
+        """
+        old = self.events.find({"date": {"$lt": before}}, {"_id": 0}).sort(
+            [("key", ASCENDING), ("date", ASCENDING)]
+        )
+        count = 0
+        snapshots, folded = [], []
+        for _, events in itertools.groupby(old, key=lambda current: current["key"]):
+            events = [{**current, "date": history.toUTC(current["date"])} for current in events]
+            new, ids = history.compact(events, before)
+            snapshots += new
+            folded += ids
+            if len(folded) >= HISTORY_BATCH:
+                count += self.replaceEvents(snapshots, folded)
+                snapshots, folded = [], []
+        return count + self.replaceEvents(snapshots, folded)
+
+    def replaceEvents(self, snapshots: list[dict], folded: list[str]) -> int:
+        """
+        :param snapshots: The new snapshot events.
+        :param folded: The ids of the events they replace.
+
+        :return: The number of deleted events.
+        """
+        self.appendHistory(snapshots)
+        if not folded:
+            return 0
+        return self.events.delete_many({"id": {"$in": folded}}).deleted_count
+
+    def countOutdated(self) -> int:
+        """
+        :return: The number of documents written in an older schema version.
+        """
+        return self.connection.count_documents({"schema": {"$ne": SCHEMA_VERSION}})
+
+    def migrateSchema(self, batchSize: int = 500, onBatch=None) -> int:
+        """
+        Rewrites documents of older schema versions into the current version, one batch at a time.
+        Each rewrite only applies if the document was not written in the meantime; run again to pick those up.
+        The revision is kept, since the contents do not change, so local replicas see no conflict.
+
+        :param batchSize: The number of documents read and written per round trip.
+        :param onBatch: Called with the number of documents migrated so far after every batch.
+
+        :return: The number of migrated documents.
+        """
+        migrated = 0
+        last = None
+        while True:
+            criteria = {"schema": {"$ne": SCHEMA_VERSION}}
+            if last is not None:
+                criteria["_id"] = {"$gt": last}
+            batch = list(
+                self.connection.find(criteria).sort("_id", ASCENDING).limit(batchSize)
+            )
+            if not batch:
+                return migrated
+            last = batch[-1]["_id"]
+            now = timestamp()
+            requests = [
+                UpdateOne(
+                    {"_id": doc["_id"], "revision": doc.get("revision")},
+                    {"$set": {**upgrade(doc), "updatedAt": now}},
+                )
+                for doc in batch
+            ]
+            migrated += self.connection.bulk_write(requests, ordered=False).modified_count
+            self.cache.clear()
+            if onBatch is not None:
+                onBatch(migrated)
 
     def keyExists(self, key: str) -> bool:
         """
@@ -113,6 +731,55 @@ class Wrapper:
         count = self.connection.count_documents(criteria, limit=1)
         return count > 0
 
+    def close(self) -> None:
+        """
+        Closes the underlying MongoClient including its connection pool and monitor threads.
+        """
+        self.client.close()
+
+
+_shared = None
+_sharedLock = threading.Lock()
+
+
+def getWrapper() -> Wrapper:
+    """
+    Returns the process-wide Wrapper, creating it from the credentials file on first use.
+
+    All GUI entry points share this instance, so the MongoClient, its connection pool
+    and its monitor threads are only set up once per session.
+
+    :return: The shared Wrapper.
+    """
+    global _shared
+    with _sharedLock:
+        if _shared is None:
+            _shared = Wrapper()
+        return _shared
+
+
+def setWrapper(wrapper) -> None:
+    """
+    Replaces the process-wide Wrapper without closing the previous one.
+
+    :param wrapper: The Wrapper (or a compatible test double) to share, None to reset.
+    """
+    global _shared
+    with _sharedLock:
+        _shared = wrapper
+
+
+def closeWrapper() -> None:
+    """
+    Closes the process-wide Wrapper if one was created and resets it,
+    so the next call to getWrapper creates a fresh instance.
+    """
+    global _shared
+    with _sharedLock:
+        if _shared is not None:
+            _shared.close()
+            _shared = None
+
 
 def deserializeMultiple(documents: dict) -> list[item]:
     """
@@ -127,6 +794,57 @@ def deserializeMultiple(documents: dict) -> list[item]:
     return items
 
 
+def deserializeCards(documents: dict) -> list[card]:
+    """
+    Deserializes projected MongoDB documents into cards.
+
+    :param documents: The MongoDB documents to deserialize.
+    :return: List of cards.
+    """
+    return [deserializeCard(doc) for doc in documents]
+
+
+def bucketByStatus(items: list) -> dict[enums.Taskstatus, list]:
+    """
+    Groups items or cards by their status, keeping the order in which they were read.
+
+    :param items: The items or cards to group.
+    :return: A mapping of every task status to its items; items with an unknown status are skipped.
+    """
+    buckets = {status: [] for status in enums.Taskstatus}
+    for current in items:
+        if current.status in buckets:
+            buckets[current.status].append(current)
+    return buckets
+
+
+def timestamp() -> datetime.datetime:
+    """
+    :return: The current UTC time, stored as updatedAt on every write.
+    """
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def planIndex(plan: dict) -> str:
+    """
+    Walks an explained winning plan down to its input stage.
+
+    :param plan: The "winningPlan" section of an explain result.
+    :return: The name of the index scanned, or the name of the innermost stage if no index is used.
+    """
+    while True:
+        if "indexName" in plan:
+            return plan["indexName"]
+        if "inputStage" in plan:
+            plan = plan["inputStage"]
+        elif plan.get("inputStages"):
+            plan = plan["inputStages"][0]
+        elif "queryPlan" in plan:
+            plan = plan["queryPlan"]
+        else:
+            return plan.get("stage", "UNKNOWN")
+
+
 def readCredentials(filename):
     """
     Reads pymongo credentials from a text file.
@@ -147,3 +865,68 @@ def readCredentials(filename):
             return credentials
     except FileNotFoundError:
         raise FileNotFoundError(f"Credentials file not found: {filename}")
+
+
+def reportDuplicates(wrapper: Wrapper) -> None:
+    """
+    Prints the keys stored in more than one document, which keep the unique index on key from being created.
+
+    :param wrapper: The Wrapper to check.
+    """
+    duplicates = wrapper.readDuplicateKeys()
+    if duplicates:
+        print(f"{len(duplicates)} keys are stored more than once, the unique index on key is missing:")
+        for key, count in sorted(duplicates.items()):
+            print(f"  {key}: {count} documents")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m module.db", description="KanbanGUI.py database diagnostics"
+    )
+    parser.add_argument(
+        "--explain", action="store_true", help="report the index used by each query"
+    )
+    parser.add_argument(
+        "--migrate",
+        action="store_true",
+        help=f"rewrite documents of older schema versions into version {SCHEMA_VERSION}",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=500, help="documents per batch when migrating"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="only count the documents to migrate"
+    )
+    parser.add_argument(
+        "--compact-history",
+        type=int,
+        metavar="DAYS",
+        help="fold history events older than this many days into one snapshot per item",
+    )
+    args = parser.parse_args()
+
+    if args.explain:
+        wrapper = Wrapper()
+        for query, index in wrapper.explainQueries().items():
+            print(f"{query}: {index}")
+        reportDuplicates(wrapper)
+        wrapper.close()
+    elif args.migrate:
+        wrapper = Wrapper()
+        print(f"{wrapper.countOutdated()} documents in an older schema version")
+        if not args.dry_run:
+            wrapper.ensureSetup(force=True)
+            wrapper.migrateSchema(args.batch_size, lambda count: print(f"migrated {count}"))
+            print(f"done, {wrapper.countOutdated()} documents left")
+        reportDuplicates(wrapper)
+        wrapper.close()
+    elif args.compact_history is not None:
+        wrapper = Wrapper()
+        before = timestamp() - datetime.timedelta(days=args.compact_history)
+        print(f"folded {wrapper.compactHistory(before)} events")
+        wrapper.close()
+    else:
+        parser.print_help()
@@ -0,0 +1,186 @@
+"""
+This file provides a background executor for database calls, so the Tk main loop never blocks on the network.
+
+Calls are run on a small thread pool; their results are put on a queue that is drained on the Tk thread
+by polling with `after()`, so callbacks may safely touch widgets.
+
+- `Dispatcher`: A class running calls in the background and delivering their results on the Tk thread.
+- `getDispatcher`: Returns the process-wide `Dispatcher`, creating it for the given widget's window on first use.
+- `setDispatcher`: Replaces the process-wide `Dispatcher`, e.g. with a test double.
+- `closeDispatcher`: Shuts down and forgets the process-wide `Dispatcher`.
+"""
+
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class Dispatcher:
+    def __init__(self, widget, workers: int = 2, interval: int = 50) -> None:
+        """
+        Initializes the Dispatcher and starts polling for results.
+
+        :param widget: Any Tk widget; its `after` method is used to poll on the Tk thread.
+        :param workers: The number of background threads.
+        :param interval: The polling interval in milliseconds.
+        """
+        self.widget = widget
+        self.interval = interval
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="KanbanGUI"
+        )
+        self.results = queue.Queue()
+        self.generations = {}
+        self.futures = {}
+        self.pending = 0
+        self.listeners = []
+        self.closed = False
+        self.widget.after(self.interval, self.poll)
+
+    def submit(
+        self, call, onSuccess=None, onError=None, tag: str = None, quiet: bool = False
+    ) -> Future:
+        """
+        Runs a call in the background and delivers its outcome on the Tk thread.
+
+        Submitting a call with the same tag as a pending one supersedes it:
+        the older call is cancelled if it has not started yet, and its result is discarded otherwise.
+
+        :param call: A callable without arguments, run on a worker thread.
+        :param onSuccess: Called on the Tk thread with the call's return value.
+        :param onError: Called on the Tk thread with the raised exception.
+        :param tag: Optional name grouping calls of which only the latest counts.
+        :param quiet: True for periodic background refreshes that should not mark the application as busy.
+
+        :return: The future of the background call.
+        """
+        generation = None
+        if tag is not None:
+            generation = self.generations.get(tag, 0) + 1
+            self.generations[tag] = generation
+            previous, counted = self.futures.get(tag, (None, False))
+            if previous is not None and previous.cancel() and counted:
+                self._finished()
+
+        def run():
+            try:
+                self.results.put((not quiet, tag, generation, onSuccess, call()))
+            except Exception as error:
+                self.results.put((not quiet, tag, generation, onError, error))
+
+        if not quiet:
+            self._started()
+        future = self.executor.submit(run)
+        if tag is not None:
+            self.futures[tag] = (future, not quiet)
+        return future
+
+    def post(self, call) -> None:
+        """
+        Schedules a call on the Tk thread; safe to use from any thread.
+
+        :param call: A callable without arguments.
+        """
+        self.results.put((False, None, None, lambda _: call(), None))
+
+    def poll(self) -> None:
+        """
+        Delivers all queued results on the Tk thread and schedules the next poll.
+        A callback that raises is reported through the widget's `report_callback_exception`,
+        like an exception in any other Tk callback, and does not stop later deliveries.
+        """
+        while True:
+            try:
+                counted, tag, generation, callback, value = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if counted:
+                self._finished()
+            if tag is not None:
+                if self.generations.get(tag) != generation:
+                    continue  # superseded by a newer call with the same tag
+                self.futures.pop(tag, None)
+            if callback is not None:
+                try:
+                    callback(value)
+                except Exception as error:
+                    self.widget.report_callback_exception(type(error), error, error.__traceback__)
+        if not self.closed:
+            self.widget.after(self.interval, self.poll)
+
+    def busy(self) -> bool:
+        """
+        :return: True while at least one submitted call that is not quiet has not been delivered.
+        """
+        return self.pending > 0
+
+    def addBusyListener(self, listener) -> None:
+        """
+        Registers a callable that is called with True when the first call starts
+        and with False when the last pending call has been delivered.
+
+        :param listener: A callable taking one boolean.
+        """
+        self.listeners.append(listener)
+
+    def shutdown(self) -> None:
+        """
+        Stops polling and cancels all calls that have not started yet.
+        """
+        self.closed = True
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _started(self) -> None:
+        self.pending += 1
+        if self.pending == 1:
+            self._notify(True)
+
+    def _finished(self) -> None:
+        self.pending -= 1
+        if self.pending == 0:
+            self._notify(False)
+
+    def _notify(self, busy: bool) -> None:
+        for listener in self.listeners:
+            listener(busy)
+
+
+_shared = None
+_sharedLock = threading.Lock()
+
+
+def getDispatcher(widget) -> Dispatcher:
+    """
+    Returns the process-wide Dispatcher, creating it for the window of the given widget on first use.
+
+    :param widget: Any widget of the main window.
+
+    :return: The shared Dispatcher.
+    """
+    global _shared
+    with _sharedLock:
+        if _shared is None:
+            _shared = Dispatcher(widget.winfo_toplevel())
+        return _shared
+
+
+def setDispatcher(dispatcher) -> None:
+    """
+    Replaces the process-wide Dispatcher without shutting down the previous one.
+
+    :param dispatcher: The Dispatcher (or a compatible test double) to share, None to reset.
+    """
+    global _shared
+    with _sharedLock:
+        _shared = dispatcher
+
+
+def closeDispatcher() -> None:
+    """
+    Shuts down the process-wide Dispatcher if one was created and resets it.
+    """
+    global _shared
+    with _sharedLock:
+        if _shared is not None:
+            _shared.shutdown()
+            _shared = None
@@ -0,0 +1,265 @@
+"""
+This file provides the dialogs for editing and creating Kanban board items.
+
+Each dialog is built once, on first use, and reused afterwards: opening it fills the existing widgets
+with the selected item, and closing it only hides the window. Opening an item therefore costs no widget
+construction, and a review session over many items leaves no windows behind.
+
+- `Dialog`: A class owning a hidden, reusable top level window.
+- `EditDialog`: A dialog showing the details of a loaded item and writing the changes the user makes.
+- `CreateDialog`: A dialog asking for the details of a new item and inserting it.
+- `getDialog`: Returns the shared dialog of the given kind, building it on first use.
+- `closeDialogs`: Destroys the shared dialogs and forgets them.
+"""
+
+import datetime
+import threading
+
+import ttkbootstrap as tb
+from ttkbootstrap.dialogs import Messagebox
+
+from . import boardGUI, db, dispatcher, enums, history, itemGUI, itemUtil
+from .persistence import item, toText
+
+
+class Dialog:
+    def __init__(self, root, geometry: str) -> None:
+        """
+        Builds the window of the dialog, hidden until it is opened.
+
+        :param root: Any widget of the main application window.
+        :param geometry: The size of the window, e.g. "350x500".
+        """
+        self.root = root
+        self.window = tb.Toplevel(root.winfo_toplevel())
+        self.window.withdraw()
+        self.window.iconbitmap(itemGUI.icon())
+        self.window.geometry(geometry)
+        self.window.protocol("WM_DELETE_WINDOW", self.hide)
+        self.centered = False
+
+    def show(self, title: str) -> None:
+        """
+        Shows the window in front of the main window; it is centered the first time only,
+        afterwards it opens where the user left it.
+
+        :param title: The title of the window.
+        """
+        self.window.title(title)
+        self.window.deiconify()
+        if not self.centered:
+            self.window.position_center()
+            self.centered = True
+        self.window.lift()
+        self.window.focus_set()
+
+    def hide(self) -> None:
+        """
+        Hides the window, keeping its widgets for the next time it is opened.
+        """
+        self.window.withdraw()
+
+    def exists(self) -> bool:
+        """
+        :return: True if the window was not destroyed, e.g. together with the main window.
+        """
+        return bool(self.window.winfo_exists())
+
+    def close(self) -> None:
+        """
+        Destroys the window and its widgets.
+        """
+        if self.exists():
+            self.window.destroy()
+
+
+class EditDialog(Dialog):
+    def __init__(self, root) -> None:
+        """
+        Builds the widgets showing the details of an item.
+
+        :param root: Any widget of the main application window.
+        """
+        super().__init__(root, "350x500")
+        self.current = None
+        self.keyLabel = itemUtil.labelPair(self.window, 0, labelText="Key", fillText="")
+        self.typeLabel = itemUtil.comboPair(
+            self.window, 1, labelText="Type", options=itemUtil.tasktypes()
+        )
+        self.creationLabel = itemUtil.labelPair(self.window, 2, labelText="Creation", fillText="")
+        self.estimateLabel = itemUtil.labelPair(self.window, 3, labelText="Estimate", fillText="")
+        self.spentLabel = itemUtil.entryPair(self.window, 4, labelText="Time Spent")
+        self.statusLabel = itemUtil.comboPair(
+            self.window, 5, labelText="Status", options=itemUtil.taskstates()
+        )
+        self.parentLabel = itemUtil.entryPair(self.window, 6, labelText="Parent")
+        self.descLabel = itemUtil.entryText(self.window, 7, labelText="Description")
+
+        tb.Button(
+            self.window, text="Cancel", command=self.hide, style="warning-outline"
+        ).grid(row=8, column=0)
+        tb.Button(
+            self.window, text="Confirm", command=self.confirm, style="success-outline"
+        ).grid(row=8, column=1)
+
+    def open(self, current: item) -> None:
+        """
+        Fills the widgets with the details of an item and shows the dialog.
+
+        :param current: The item to be edited.
+        """
+        self.current = current
+        itemUtil.setValue(self.keyLabel, current.key)
+        itemUtil.setValue(self.typeLabel, toText(current.type))
+        itemUtil.setValue(self.creationLabel, current.creation)
+        itemUtil.setValue(self.estimateLabel, current.estimate)
+        itemUtil.setValue(self.spentLabel, current.time_spent)
+        itemUtil.setValue(self.statusLabel, toText(current.status))
+        itemUtil.setValue(self.parentLabel, current.parent or "")
+        itemUtil.setValue(self.descLabel, current.description)
+        self.show("KanbanGUI.py - " + current.key)
+
+    def confirm(self) -> None:
+        """
+        Hides the dialog and updates the item in the database with the modified values.
+        The card shows the change right away and is rolled back if the write fails;
+        nothing is written if nothing was modified.
+        """
+        current = self.current
+        var = item(
+            current.key,
+            self.typeLabel.get(),
+            current.creation,
+            current.estimate,
+            self.spentLabel.get(),
+            self.statusLabel.get(),
+            self.descLabel.get("1.0", "end-1c"),
+            self.parentLabel.get(),
+            current.history,
+        ).track(current.revision, current)
+        self.hide()
+        if not var.changedDict():
+            return
+        board = boardGUI.getBoard(self.root)
+        previous = board.place([var.asCard()])
+
+        def updated(success: bool | None):
+            if success is None:
+                failed(f"{current.key} was changed by someone else, reopen it to see the changes")
+            elif not success:
+                failed(f"{current.key} no longer exists")
+
+        def failed(error):
+            board.restore(previous)
+            itemGUI.notify("Item not updated", f"{error}")
+
+        dispatcher.getDispatcher(self.root).submit(
+            lambda: history.updateItem(db.getWrapper(), current, var),
+            onSuccess=updated,
+            onError=failed,
+        )
+
+
+class CreateDialog(Dialog):
+    def __init__(self, root) -> None:
+        """
+        Builds the widgets asking for the details of a new item.
+
+        :param root: Any widget of the main application window.
+        """
+        super().__init__(root, "350x400")
+        self.keyLabel = itemUtil.entryPair(self.window, 0, "Key")
+        self.typeLabel = itemUtil.comboPair(self.window, 1, "Type", itemUtil.tasktypes())
+        self.estimateLabel = itemUtil.entryPair(self.window, 3, "Estimate")
+        self.parentLabel = itemUtil.entryPair(self.window, 2, "Parent")
+        self.descLabel = itemUtil.entryText(self.window, 4, "Description")
+
+        tb.Button(
+            self.window, text="Cancel", command=self.hide, style="warning-outline"
+        ).grid(row=5, column=0)
+        tb.Button(
+            self.window, text="Insert", command=self.insert, style="success-outline"
+        ).grid(row=5, column=1)
+
+    def open(self) -> None:
+        """
+        Clears the widgets and shows the dialog.
+        """
+        for widget in (self.keyLabel, self.estimateLabel, self.parentLabel, self.descLabel):
+            itemUtil.setValue(widget, "")
+        itemUtil.setValue(self.typeLabel, enums.Tasktype.task.value)
+        self.show("KanbanGUI.py - Add new Item")
+
+    def insert(self) -> None:
+        """
+        Inserts the new item into the database and reports the outcome.
+        The card shows on the board right away and is removed again if the insertion fails.
+        """
+        var = item(
+            self.keyLabel.get(),
+            self.typeLabel.get(),
+            datetime.datetime.now().replace(second=0, microsecond=0),
+            self.estimateLabel.get(),
+            0,
+            enums.Taskstatus.draft.value,
+            self.descLabel.get("1.0", "end-1c"),
+            self.parentLabel.get(),
+            [],
+        )
+        board = boardGUI.getBoard(self.root)
+        previous = board.add([var.asCard()])
+
+        def inserted(success: bool):
+            if not success:
+                board.restore(previous)
+            self.inserted(success)
+
+        def failed(error):
+            board.restore(previous)
+            itemGUI.showError(error)
+
+        dispatcher.getDispatcher(self.root).submit(
+            lambda: history.insertItem(db.getWrapper(), var),
+            onSuccess=inserted,
+            onError=failed,
+        )
+
+    def inserted(self, success: bool) -> None:
+        """
+        Reports the outcome of the insertion.
+        """
+        if success:
+            Messagebox.ok("Item inserted", "Success")
+        else:
+            Messagebox.ok("Item not inserted", "Unsuccessful")
+
+
+_shared = {}
+_sharedLock = threading.Lock()
+
+
+def getDialog(root, kind: type[Dialog]) -> Dialog:
+    """
+    Returns the shared dialog of the given kind, building it on first use
+    or if its window was destroyed.
+
+    :param root: Any widget of the main application window.
+    :param kind: EditDialog or CreateDialog.
+
+    :return: The shared dialog.
+    """
+    with _sharedLock:
+        dialog = _shared.get(kind)
+        if dialog is None or not dialog.exists():
+            dialog = _shared[kind] = kind(root)
+        return dialog
+
+
+def closeDialogs() -> None:
+    """
+    Destroys the shared dialogs and forgets them.
+    """
+    with _sharedLock:
+        for dialog in _shared.values():
+            dialog.close()
+        _shared.clear()
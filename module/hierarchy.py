@@ -0,0 +1,264 @@
+"""
+This file indexes the epic/task/subtask tree spanned by the `parent` field of the items.
+
+The index is built from a single projected query (`Repository.readNodes`) and then kept up to date incrementally:
+it listens to the invalidations of the engine's `ItemCache`, which every write and every applied remote change
+triggers, and re-reads only the nodes of the changed keys on the next lookup.
+
+- `Hierarchy`: A class answering children, descendants, ancestors, items by type and roll-up totals,
+               and detecting cycles and dangling parents.
+- `getHierarchy`: Returns the shared index over the shared database wrapper, creating it on first use.
+- `closeHierarchy`: Detaches the shared index from its engine.
+"""
+
+import threading
+
+from . import db, enums, metrics
+from .persistence import node
+
+
+class Hierarchy:
+    def __init__(self, repository) -> None:
+        """
+        Initializes an index over the given engine; it is built on the first lookup.
+
+        :param repository: The `repository.Repository` whose items are indexed.
+        """
+        self.repository = repository
+        self.lock = threading.RLock()
+        self.nodes = {}
+        self.childKeys = {}
+        self.stale = set()
+        self.reload = True
+        self.rollups = {}
+        self.problems = None
+        repository.cache.addInvalidationListener(self.invalidate)
+
+    def invalidate(self, key: str | None) -> None:
+        """
+        Marks a key as changed; its node is re-read on the next lookup.
+
+        :param key: The changed key, or None if anything may have changed.
+        """
+        with self.lock:
+            if key is None:
+                self.reload = True
+            else:
+                self.stale.add(key)
+
+    def refresh(self) -> None:
+        """
+        Brings the index up to date: everything is read on the first call or after a full invalidation,
+        afterwards only the nodes of changed keys.
+        """
+        with self.lock:
+            if self.reload:
+                self.reload = False
+                self.stale.clear()
+                self.nodes.clear()
+                self.childKeys.clear()
+                for current in self.repository.readNodes():
+                    self.add(current)
+                self.changed()
+            elif self.stale:
+                keys, self.stale = self.stale, set()
+                found = {current.key: current for current in self.repository.readNodes(keys)}
+                for key in keys:
+                    self.remove(key)
+                    if key in found:
+                        self.add(found[key])
+                self.changed()
+
+    def add(self, current: node) -> None:
+        self.nodes[current.key] = current
+        self.childKeys.setdefault(current.parent, {})[current.key] = None
+
+    def remove(self, key: str) -> None:
+        current = self.nodes.pop(key, None)
+        if current is not None:
+            siblings = self.childKeys[current.parent]
+            del siblings[key]
+            if not siblings:
+                del self.childKeys[current.parent]
+
+    def changed(self) -> None:
+        self.rollups.clear()
+        self.problems = None
+
+    def get(self, key: str) -> node | None:
+        """
+        :param key: The key of the item.
+
+        :return: The node of the item, or None if the key does not exist.
+        """
+        with self.lock:
+            self.refresh()
+            return self.nodes.get(key)
+
+    def ofType(self, type: enums.Tasktype) -> list[str]:
+        """
+        :param type: The task type, e.g. Tasktype.epic.
+
+        :return: The keys of all items of the given type.
+        """
+        with self.lock:
+            self.refresh()
+            return [key for key, current in self.nodes.items() if current.type is type]
+
+    def roots(self) -> list[str]:
+        """
+        :return: The keys of all items without parent or whose parent does not exist.
+        """
+        with self.lock:
+            self.refresh()
+            return list(self.childKeys.get(None, ())) + sorted(self.dangling())
+
+    def children(self, key: str) -> list[str]:
+        """
+        :param key: The key of the parent.
+
+        :return: The keys of the items whose parent is the given key.
+        """
+        with self.lock:
+            self.refresh()
+            return list(self.childKeys.get(key, ()))
+
+    def descendants(self, key: str) -> list[str]:
+        """
+        :param key: The key of the ancestor.
+
+        :return: The keys of all items below the given key, breadth first, each key once even inside a cycle.
+        """
+        with self.lock:
+            self.refresh()
+            return self.below(key)[1:]
+
+    def ancestors(self, key: str) -> list[str]:
+        """
+        :param key: The key of the item.
+
+        :return: The keys of all existing items above the given key, nearest first; stops at a cycle.
+        """
+        with self.lock:
+            self.refresh()
+            result = []
+            seen = {key}
+            current = self.nodes.get(key)
+            while current is not None and current.parent in self.nodes and current.parent not in seen:
+                result.append(current.parent)
+                seen.add(current.parent)
+                current = self.nodes[current.parent]
+            return result
+
+    def rollup(self, key: str) -> dict:
+        """
+        Sums the item and everything below it; results are kept until the next change.
+
+        :param key: The key of the item.
+
+        :return: The totals {"count", "estimate", "spent"}, see `metrics.summarize`.
+        """
+        with self.lock:
+            self.refresh()
+            if key not in self.rollups:
+                totals = {}
+                for current in self.below(key):
+                    found = self.nodes[current]
+                    metrics.add(
+                        totals, key, 1, metrics.number(found.estimate), metrics.number(found.time_spent)
+                    )
+                self.rollups[key] = totals.get(key, {"count": 0, "estimate": 0, "spent": 0})
+            return self.rollups[key]
+
+    def dangling(self) -> dict[str, str]:
+        """
+        :return: A mapping of the key of every item whose parent does not exist to that parent.
+        """
+        with self.lock:
+            self.refresh()
+            return {
+                child: parent
+                for parent, children in self.childKeys.items()
+                if parent is not None and parent not in self.nodes
+                for child in children
+            }
+
+    def cycles(self) -> list[list[str]]:
+        """
+        Finds items that are their own ancestors, following every parent link at most once.
+
+        :return: Every cycle as the list of its keys, each starting with its smallest key.
+        """
+        with self.lock:
+            self.refresh()
+            if self.problems is None:
+                self.problems = findCycles(self.nodes)
+            return self.problems
+
+    def below(self, key: str) -> list[str]:
+        if key not in self.nodes:
+            return []
+        result = [key]
+        seen = {key}
+        for current in result:
+            for child in self.childKeys.get(current, ()):
+                if child not in seen:
+                    seen.add(child)
+                    result.append(child)
+        return result
+
+    def close(self) -> None:
+        """
+        Stops following the writes of the engine.
+        """
+        self.repository.cache.removeInvalidationListener(self.invalidate)
+
+
+def findCycles(nodes: dict[str, node]) -> list[list[str]]:
+    """
+    :param nodes: All nodes by key.
+
+    :return: Every cycle of parent links as the list of its keys, each starting with its smallest key.
+    """
+    cycles = []
+    done = set()
+    for start in nodes:
+        path = {}
+        current = start
+        while current in nodes and current not in done and current not in path:
+            path[current] = len(path)
+            current = nodes[current].parent
+        if current in path:
+            keys = list(path)[path[current]:]
+            first = keys.index(min(keys))
+            cycles.append(keys[first:] + keys[:first])
+        done.update(path)
+    return sorted(cycles)
+
+
+_shared = None
+_sharedLock = threading.Lock()
+
+
+def getHierarchy() -> Hierarchy:
+    """
+    Returns the index over the shared database wrapper, creating it on first use.
+
+    :return: The shared Hierarchy.
+    """
+    global _shared
+    with _sharedLock:
+        if _shared is None:
+            _shared = Hierarchy(db.getWrapper())
+        return _shared
+
+
+def closeHierarchy() -> None:
+    """
+    Detaches the shared index from its engine and forgets it.
+    """
+    global _shared
+    with _sharedLock:
+        if _shared is not None:
+            _shared.close()
+            _shared = None
@@ -0,0 +1,286 @@
+"""
+This file defines the change history of the items as an append-only log of events.
+
+Instead of rewriting an embedded `history` list on every update, every change appends one event per changed field
+(`Repository.appendHistory`), so an update costs O(change) regardless of how long the history already is.
+Inserting an item appends a snapshot of all its fields, deleting it a deletion event. Compaction folds old events
+into one snapshot per item, and replaying the events up to a point in time restores the item as it was then.
+Entries of the embedded `history` list written by older versions are read as events as well.
+The write functions store a change and its events in one `Repository.transaction`, so the local replica never holds
+one without the other; in MongoDB the events are appended right after the change.
+
+An event is a dictionary with the fields `id` (unique, so pushing an event twice stores it once), `key`, `date`
+(a UTC datetime), `field` and `value`. The field is the name of an item attribute, `SNAPSHOT` with a dictionary
+of all attributes as value, or `DELETED`.
+
+- `created`: A function returning the snapshot event of an inserted item.
+- `changes`: A function returning one event per field that differs between two versions of an item.
+- `moved`: A function returning the status events of a bulk status change.
+- `deleted`: A function returning the deletion events of deleted items.
+- `fromLegacy`: A function converting embedded history entries into events.
+- `ordered`: A function sorting events in replay order.
+- `replay`: A function computing the attributes of an item at a point in time from its events.
+- `compact`: A function folding old events of items into snapshots.
+- `toUTC`: A function converting a stored date into a UTC datetime.
+- `insertItem`, `updateItem`, `updateStatus`, `deleteItems`: Functions writing to a repository and logging the change.
+"""
+
+import datetime
+import uuid
+
+from .persistence import item, toDatetime
+
+TRACKED = ("type", "creation", "estimate", "time_spent", "status", "description", "parent")
+"""
+Item attributes recorded in the history.
+"""
+
+SNAPSHOT = "snapshot"
+"""
+Field of events holding all attributes of an item.
+"""
+
+DELETED = "deleted"
+"""
+Field of events recording the deletion of an item.
+"""
+
+
+def event(key: str, field: str, value, date: datetime.datetime) -> dict:
+    """
+    :param key: The key of the item.
+    :param field: The changed attribute, `SNAPSHOT` or `DELETED`.
+    :param value: The new value of the attribute.
+    :param date: The time of the change.
+
+    :return: A new event with a unique id.
+    """
+    return {"id": uuid.uuid4().hex, "key": key, "date": date, "field": field, "value": value}
+
+
+def created(current: item, date: datetime.datetime) -> dict:
+    """
+    :param current: The inserted item.
+    :param date: The time of the insertion.
+
+    :return: The snapshot event of the item.
+    """
+    return event(current.key, SNAPSHOT, snapshot(current), date)
+
+
+def changes(before: item, after: item, date: datetime.datetime) -> list[dict]:
+    """
+    :param before: The item as it was read.
+    :param after: The item as it was written.
+    :param date: The time of the update.
+
+    :return: One event for every tracked attribute that differs, empty if nothing changed.
+    """
+    return [
+        event(after.key, field, stored(getattr(after, field)), date)
+        for field in TRACKED
+        if getattr(before, field) != getattr(after, field)
+    ]
+
+
+def moved(keys: list[str], status, date: datetime.datetime) -> list[dict]:
+    """
+    :param keys: The keys of the moved items.
+    :param status: The new task status.
+    :param date: The time of the move.
+
+    :return: One status event per item.
+    """
+    return [event(key, "status", stored(status), date) for key in keys]
+
+
+def deleted(keys: list[str], date: datetime.datetime) -> list[dict]:
+    """
+    :param keys: The keys of the deleted items.
+    :param date: The time of the deletion.
+
+    :return: One deletion event per item.
+    """
+    return [event(key, DELETED, True, date) for key in keys]
+
+
+def fromLegacy(key: str, entries: list) -> list[dict]:
+    """
+    Converts the entries of an embedded `history` list into events; entries without a readable date are skipped.
+
+    :param key: The key of the item.
+    :param entries: The embedded entries, each with a date, field and value.
+
+    :return: The events, without id.
+    """
+    result = []
+    for entry in entries or []:
+        date = toUTC(entry.get("date")) if isinstance(entry, dict) else None
+        if isinstance(date, datetime.datetime):
+            field, value = entry.get("field"), entry.get("value")
+            result.append({"id": None, "key": key, "date": date, "field": field, "value": value})
+    return result
+
+
+def ordered(events: list[dict]) -> list[dict]:
+    """
+    :param events: Events of one item.
+
+    :return: The events by date; a snapshot comes after the events it folded, which share its date.
+    """
+    return sorted(events, key=lambda current: (current["date"], current["field"] == SNAPSHOT))
+
+
+def replay(events: list[dict], at: datetime.datetime = None) -> dict | None:
+    """
+    Computes the attributes of an item from its events.
+
+    :param events: All events of the item.
+    :param at: The point in time, or None for the latest state.
+
+    :return: The attributes known at that time, or None if the item did not exist (yet or anymore).
+    """
+    state = None
+    for current in ordered(events):
+        if at is not None and current["date"] > toUTC(at):
+            break
+        if current["field"] == SNAPSHOT:
+            state = dict(current["value"])
+        elif current["field"] == DELETED:
+            state = None
+        else:
+            state = {**(state or {}), current["field"]: current["value"]}
+    return state
+
+
+def compact(events: list[dict], before: datetime.datetime) -> tuple[list[dict], list[str]]:
+    """
+    Folds the events older than the given time into one snapshot (or deletion) per item.
+    Items with fewer than two old events are left as they are.
+
+    :param events: Stored events of any number of items, with their ids.
+    :param before: Events older than this time are folded.
+
+    :return: The new snapshot events and the ids of the folded events.
+    """
+    byKey = {}
+    for current in events:
+        if current["date"] < toUTC(before):
+            byKey.setdefault(current["key"], []).append(current)
+    snapshots, folded = [], []
+    for key, old in byKey.items():
+        if len(old) < 2:
+            continue
+        old = ordered(old)
+        state = replay(old)
+        date = old[-1]["date"]
+        snapshots.append(
+            event(key, DELETED, True, date) if state is None else event(key, SNAPSHOT, state, date)
+        )
+        folded += [current["id"] for current in old]
+    return snapshots, folded
+
+
+def snapshot(current: item) -> dict:
+    """
+    :param current: An item.
+
+    :return: The tracked attributes of the item as stored values.
+    """
+    return {field: stored(getattr(current, field)) for field in TRACKED}
+
+
+def stored(value):
+    """
+    :param value: An attribute value, e.g. an enum member.
+
+    :return: The value as stored in events, e.g. the value of the enum member.
+    """
+    return getattr(value, "_value_", value)
+
+
+def toUTC(value):
+    """
+    :param value: A datetime, with or without time zone, or a stored date string.
+
+    :return: The time as a UTC datetime; dates without time zone are taken as UTC. Other values are returned as is.
+    """
+    value = toDatetime(value)
+    if isinstance(value, datetime.datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value
+
+
+def insertItem(repository, current: item) -> bool:
+    """
+    Inserts an item and logs its snapshot.
+
+    :param repository: The `repository.Repository` to write to.
+    :param current: The item to insert.
+
+    :return: True if the item was inserted, False otherwise.
+    """
+    with repository.transaction():
+        if not repository.insertItem(current):
+            return False
+        repository.appendHistory([created(current, now())])
+    return True
+
+
+def updateItem(repository, before: item, after: item) -> bool | None:
+    """
+    Updates an item and logs the changed fields; nothing is written if no field changed.
+
+    :param repository: The `repository.Repository` to write to.
+    :param before: The item as it was read.
+    :param after: The item to write.
+
+    :return: True if the item was updated or nothing changed, False if it does not exist,
+             None if someone else wrote it since it was read, see `Repository.updateItem`.
+    """
+    events = changes(before, after, now())
+    if not events:
+        return True
+    with repository.transaction():
+        result = repository.updateItem(after)
+        if result:
+            repository.appendHistory(events)
+    return result
+
+
+def updateStatus(repository, keys: list[str], status) -> dict[str, bool]:
+    """
+    Moves many items to another status and logs the moves.
+
+    :param repository: The `repository.Repository` to write to.
+    :param keys: The keys of the items to move.
+    :param status: The new task status.
+
+    :return: A mapping of every key to True if its item was moved, False if it does not exist.
+    """
+    with repository.transaction():
+        results = repository.updateStatus(keys, status)
+        repository.appendHistory(moved([key for key, done in results.items() if done], status, now()))
+    return results
+
+
+def deleteItems(repository, keys: list[str]) -> dict[str, bool]:
+    """
+    Deletes many items and logs the deletions.
+
+    :param repository: The `repository.Repository` to write to.
+    :param keys: The keys of the items to delete.
+
+    :return: A mapping of every key to True if its item was deleted, False if it does not exist.
+    """
+    with repository.transaction():
+        results = repository.deleteItems(keys)
+        repository.appendHistory(deleted([key for key, done in results.items() if done], now()))
+    return results
+
+
+def now() -> datetime.datetime:
+    """
+    :return: The current UTC time, the date of logged events.
+    """
+    return datetime.datetime.now(datetime.timezone.utc)
@@ -1,167 +1,174 @@
 """
 This file provides functionalities for managing Kanban board items
 within the KanbanGUI.py application. It interacts with the database
-using the `db.Wrapper` class and utilizes helper functions from `itemUtil`.
-
-- `editItem`: Opens a window to edit the details of an existing Kanban item.
-- `createItem`: Opens a window to create a new Kanban item.
-- `listItems`: Opens a window to display a list of all Kanban items.
+using the `db.Wrapper` class; the item dialogs are provided by `editor`.
+Database calls run in the background through `dispatcher`, so the window stays responsive.
+
+- `editItem`: Loads an existing Kanban item and opens a window to edit its details.
+- `editWindow`: Opens the reused editor dialog with the details of a loaded Kanban item.
+- `createItem`: Opens the reused dialog to create a new Kanban item.
+- `moveItems`: Moves many Kanban items to another status at once, showing the move before it is written.
+- `saveMoves`: Writes moves already shown on the board, rolling back the cards whose move failed.
+- `deleteItems`: Deletes many Kanban items at once, after asking for confirmation.
+- `listItems`: Opens a window to display a paged, searchable list of all Kanban items.
+- `treeItems`: Opens a window to display the epic/task/subtask tree with the time summed over every branch.
 - `icon`: Returns the filepath of the application icon.
-- `populateColumn`: Populates a column on the Kanban board with buttons for each item.
-- `refresh`: Refreshes the Kanban board display by reading items with different statuses from the database.
+- `refresh`: Refreshes the Kanban board display by reading the items of all columns from the database at once.
+- `renderBoard`: Updates the cards on the Kanban board to match the given columns.
+- `showError`: Reports a failed database call to the user.
+- `notify`: Shows a short, non-modal notice to the user.
 - `bootstyleFromType`: Returns the appropriate ttkbootstrap style based on the task type.
 """
 
-import datetime
 import tkinter as tk
 from os import path
 
 from ttkbootstrap.dialogs import Messagebox
 
+try:
+    from ttkbootstrap.toast import ToastNotification
+except ImportError:  # ttkbootstrap >= 2 exports it at the top level
+    from ttkbootstrap import ToastNotification
+
 import ttkbootstrap as tb
 
-from . import db, enums, itemUtil
-from .persistence import item
+from . import boardGUI, db, dispatcher, editor, enums, hierarchy, history
+from .persistence import card, item, toEnum, toText
 
 
-def editItem(root, current: item, button) -> None:
+def editItem(root, selected: card, button) -> None:
     """
     Opens a window to edit the details of an existing item.
+    The full item is only loaded from the database when the window opens.
 
     :param root: The main application window.
-    :param current: The item to be edited.
-    :param button: The button object that triggered the edit action.
+    :param selected: The card (or item) to be edited.
+    :param button: The button object that triggered the edit action, or None.
     """
-    childWindow = tb.Toplevel(root)
-    childWindow.title("KanbanGUI.py - " + current.key)
-    childWindow.iconbitmap(icon())
-    childWindow.geometry("350x500")
-    childWindow.position_center()
-
-    keyLabel = itemUtil.labelPair(childWindow, 0, labelText="Key", fillText=current.key)
-    typeLabel = itemUtil.comboPair(
-        childWindow,
-        1,
-        labelText="Type",
-        options=itemUtil.tasktypes(),
-        preset_value=current.type,
-    )
-    creationLabel = itemUtil.labelPair(
-        childWindow, 2, labelText="Creation", fillText=current.creation
-    )
-    estimateLabel = itemUtil.labelPair(
-        childWindow, 3, labelText="Estimate", fillText=current.estimate
-    )
-    spentLabel = itemUtil.entryPair(
-        childWindow, 4, labelText="Time Spent", fillText=current.time_spent
-    )
-    statusLabel = itemUtil.comboPair(
-        childWindow,
-        5,
-        labelText="Status",
-        options=itemUtil.taskstates(),
-        preset_value=current.status,
-    )
-    parentLabel = itemUtil.entryPair(
-        childWindow, 6, labelText="Parent", fillText=current.parent
-    )
-    descLabel = itemUtil.entryText(
-        childWindow, 7, labelText="Description", fillText=current.description
+    dispatcher.getDispatcher(root).submit(
+        lambda: db.getWrapper().readItem(selected.key),
+        onSuccess=lambda current: editWindow(root, current, button),
+        onError=showError,
+        tag="edit",
     )
 
-    def update():
-        """
-        Updates the current item in the database with the modified values.
-        """
-        var = item(
-            current.key,
-            typeLabel.get(),
-            current.creation,
-            current.estimate,
-            spentLabel.get(),
-            statusLabel.get(),
-            descLabel.get("1.0", "end"),
-            parentLabel.get(),
-            [],
-        )
-        connection = db.Wrapper()
-        if connection.updateItem(var):
-            Messagebox.ok("Item inserted", "Success")
-        else:
-            Messagebox.ok("Item not inserted", "Unsuccessful")
-        childWindow.destroy()
-        button.destroy()
-        refresh(root)
-
-    tb.Button(
-        childWindow,
-        text="Cancel",
-        command=lambda: childWindow.destroy(),
-        style="warning-outline",
-    ).grid(row=8, column=0)
-    tb.Button(
-        childWindow, text="Confirm", command=lambda: update(), style="success-outline"
-    ).grid(row=8, column=1)
+
+def editWindow(root, current: item, button) -> None:
+    """
+    Opens the editor dialog with the details of a loaded item.
+    The dialog is built once and reused for every item.
+
+    :param root: The main application window.
+    :param current: The item to be edited, or None if it no longer exists.
+    :param button: The button object that triggered the edit action, or None.
+            The button is owned by the board and updated on refresh.
+    """
+    if current is None:
+        Messagebox.ok("Item not found", "Unsuccessful")
+        return
+    editor.getDialog(root, editor.EditDialog).open(current)
 
 
 def createItem(root):
     """
-    Opens a window to create a new item.
+    Opens the dialog to create a new item.
+    The dialog is built once and cleared every time it is opened.
 
     :param root: The main application window.
     """
-    childWindow = tb.Toplevel(root)
-    childWindow.title("KanbanGUI.py - Add new Item")
-    childWindow.iconbitmap(icon())
-    childWindow.geometry("350x400")
-    childWindow.position_center()
+    editor.getDialog(root, editor.CreateDialog).open()
+
+
+def moveItems(root, keys: list[str], status: enums.Taskstatus) -> None:
+    """
+    Moves the given items to another status in one batch. The cards move right away;
+    cards whose move could not be written are rolled back and reported.
+
+    :param root: The parent widget.
+    :param keys: The keys of the items to move.
+    :param status: The new task status.
+    """
+    board = boardGUI.getBoard(root)
+    previous = board.move(keys, status)
+    board.select(set())
+    saveMoves(root, keys, status, previous)
+
+
+def saveMoves(root, keys: list[str], status: enums.Taskstatus, previous: dict) -> None:
+    """
+    Writes moves already shown on the board in one batch; cards whose move could not be written
+    are rolled back and reported.
 
-    keyLabel = itemUtil.entryPair(childWindow, 0, "Key")
-    typeLabel = itemUtil.comboPair(
-        childWindow,
-        1,
-        "Type",
-        itemUtil.tasktypes(),
-        preset_value=enums.Tasktype.task.value,
+    :param root: The parent widget.
+    :param keys: The keys of the moved items.
+    :param status: The new task status.
+    :param previous: Where the cards were before they moved, see `boardGUI.Board.move`.
+    """
+    board = boardGUI.getBoard(root)
+
+    def moved(results: dict[str, bool]):
+        failed = [key for key, success in results.items() if not success]
+        if failed:
+            board.restore(previous, failed)
+            notify(
+                "Unsuccessful",
+                f"{len(failed)} of {len(results)} items not moved to {status.value}: {', '.join(failed)}",
+            )
+
+    def failed(error: Exception):
+        board.restore(previous, keys)
+        notify("Items not moved", f"{error}")
+
+    dispatcher.getDispatcher(root).submit(
+        lambda: history.updateStatus(db.getWrapper(), keys, status),
+        onSuccess=moved,
+        onError=failed,
     )
-    estimateLabel = itemUtil.entryPair(childWindow, 3, "Estimate")
-    parentLabel = itemUtil.entryPair(childWindow, 2, "Parent")
-    descLabel = itemUtil.entryText(childWindow, 4, "Description")
 
-    def insert():
-        """
-        Inserts the new item into the database.
-        """
-        var = item(
-            keyLabel.get(),
-            typeLabel.get(),
-            datetime.datetime.now().strftime("%Y-%m-%d-%H-%M"),
-            estimateLabel.get(),
-            0,
-            enums.Taskstatus.draft.value,
-            descLabel.get("1.0", "end"),
-            parentLabel.get(),
-            [],
-        )
-        connection = db.Wrapper()
-        connection.insertItem(var)
 
-    tb.Button(
-        childWindow,
-        text="Cancel",
-        command=lambda: childWindow.destroy(),
-        style="warning-outline",
-    ).grid(row=5, column=0)
-    tb.Button(
-        childWindow, text="Insert", command=lambda: insert(), style="success-outline"
-    ).grid(row=5, column=1)
+def deleteItems(root, keys: list[str]) -> None:
+    """
+    Deletes the given items in one batch after asking for confirmation and reports the outcome.
+
+    :param root: The parent widget.
+    :param keys: The keys of the items to delete.
+    """
+    if Messagebox.yesno(f"Delete {len(keys)} items?", "Delete") != "Yes":
+        return
+    dispatcher.getDispatcher(root).submit(
+        lambda: history.deleteItems(db.getWrapper(), keys),
+        onSuccess=lambda results: bulkDone(root, results, "deleted"),
+        onError=showError,
+    )
+
 
+def bulkDone(root, results: dict[str, bool], done: str) -> None:
+    """
+    Reports the outcome of a bulk operation, clears the selection and refreshes the board.
 
-def listItems(root):
+    :param root: The parent widget.
+    :param results: A mapping of every key to True if the operation succeeded for it.
+    :param done: Describes what happened to the items, e.g. "deleted".
     """
-    Opens a window to display a list of all items.
+    failed = [key for key, success in results.items() if not success]
+    if failed:
+        notify(
+            "Unsuccessful",
+            f"{len(failed)} of {len(results)} items not {done}: {', '.join(failed)}",
+        )
+    else:
+        notify("Success", f"{len(results)} items {done}")
+    boardGUI.getBoard(root).select(set())
+    refresh(root)
+
+
+def listItems(root, pageSize: int = 50):
+    """
+    Opens a window to display a paged, searchable list of all items.
+    Further pages are fetched while scrolling, so opening the window costs one page regardless of collection size.
 
     :param root: The main application window.
+    :param pageSize: The number of items fetched per page.
     """
     childWindow = tb.Toplevel(root)
     childWindow.title("KanbanGUI.py - All Items")
@@ -169,28 +176,161 @@ def listItems(root):
     childWindow.iconbitmap(icon())
     childWindow.position_center()
 
-    # Create a list of items
-    items = db.Wrapper().readAll()
+    # The list of cards is filled page by page in the background, the full items are loaded when opened
+    items = []
+    state = {"prefix": "", "done": False, "loading": False}
+    tag = f"list-{childWindow}"
+
+    # Create the search entry, filtering keys by prefix on the server
+    search = tb.Entry(childWindow)
+    search.pack(fill=tk.X)
 
     # Create the listbox widget
     listbox = tk.Listbox(
         childWindow, selectmode=tk.SINGLE, width=220
     )  # Enable single selection
-    listbox.pack()
+    listbox.pack(fill=tk.BOTH, expand=True)
 
-    # Add items to the listbox from the list
-    for item in items:
-        listbox.insert(tk.END, item.key)
+    def fetch():
+        """
+        Fetches the page following the last listed key.
+        """
+        after = items[-1].key if items else None
+        prefix = state["prefix"]
+        state["loading"] = True
+        dispatcher.getDispatcher(root).submit(
+            lambda: db.getWrapper().readPage(after, pageSize, prefix),
+            onSuccess=fill,
+            onError=failed,
+            tag=tag,
+        )
+
+    # Add items to the listbox from the page, unless the window was closed while it loaded
+    def fill(cards):
+        if not listbox.winfo_exists():
+            return
+        state["loading"] = False
+        state["done"] = len(cards) < pageSize
+        items.extend(cards)
+        for item in cards:
+            listbox.insert(tk.END, item.key)
+
+    def failed(error):
+        state["loading"] = False
+        showError(error)
+
+    # Fetch the next page when the end of the list scrolls into view
+    def scrolled(first, last):
+        if float(last) >= 0.9 and not state["done"] and not state["loading"]:
+            fetch()
+
+    # Restart from the first page whenever the search text changes
+    def searched(event):
+        if search.get() == state["prefix"]:
+            return
+        state["prefix"] = search.get()
+        state["done"] = False
+        items.clear()
+        listbox.delete(0, tk.END)
+        fetch()
+
+    listbox.configure(yscrollcommand=scrolled)
+    search.bind("<KeyRelease>", searched)
+    fetch()
 
     # Function to print the selected item based on row (index)
     def openItem(event):
+        if not listbox.curselection():
+            return
         selected_index = listbox.curselection()[0]  # Get the index of the selected item
         selected_fruit = items[selected_index]  # Get the item at the selected index
-        editItem(root, selected_fruit, [])
+        editItem(root, selected_fruit, None)
 
     listbox.bind("<<ListboxSelect>>", openItem)
 
 
+def treeItems(root):
+    """
+    Opens a window to display the epic/task/subtask tree, with the estimated and spent time
+    summed over every branch. Branches are loaded when they are opened; parent cycles and
+    items whose parent does not exist are listed at the top.
+
+    :param root: The main application window.
+    """
+    childWindow = tb.Toplevel(root)
+    childWindow.title("KanbanGUI.py - Hierarchy")
+    childWindow.geometry("600x500")
+    childWindow.iconbitmap(icon())
+    childWindow.position_center()
+
+    tree = tb.Treeview(childWindow, columns=("type", "count", "estimate", "spent"))
+    tree.heading("#0", text="Key")
+    for column, text in zip(tree["columns"], ("Type", "Items", "Estimate", "Spent")):
+        tree.heading(column, text=text)
+        tree.column(column, width=80, anchor="e")
+    tree.pack(fill=tk.BOTH, expand=True)
+    index = hierarchy.getHierarchy()
+    tag = f"tree-{childWindow}"
+
+    # Rows are identified by the tree, the nodes and rows of the listed items are kept alongside
+    nodes = {}
+    rows = {}
+
+    def load(parent):
+        """
+        Reads the rows below the given key, or the top level rows for None, from the index.
+        """
+        keys = index.roots() if parent is None else index.children(parent)
+        dangling = index.dangling()
+        found = [
+            (index.get(key), index.rollup(key), bool(index.children(key)), dangling.get(key))
+            for key in keys
+        ]
+        return parent, found, index.cycles() if parent is None else []
+
+    def fill(result):
+        if not tree.winfo_exists():
+            return  # the window was closed while the branch loaded
+        parent, found, cycles = result
+        row = rows.get(parent, "")
+        tree.delete(*tree.get_children(row))
+        for keys in cycles:
+            tree.insert("", tk.END, text=f"Cycle: {' > '.join(keys)}")
+        for current, totals, branch, missing in found:
+            text = current.key if missing is None else f"{current.key} (parent {missing} missing)"
+            values = (
+                toText(current.type),
+                totals["count"],
+                f"{totals['estimate']:g}",
+                f"{totals['spent']:g}",
+            )
+            rows[current.key] = tree.insert(row, tk.END, text=text, values=values)
+            nodes[rows[current.key]] = current
+            if branch:
+                tree.insert(rows[current.key], tk.END, text="Loading...")
+
+    def fetch(parent):
+        dispatcher.getDispatcher(root).submit(
+            lambda: load(parent), onSuccess=fill, onError=showError, tag=f"{tag}-{parent}"
+        )
+
+    # Load a branch the first time it is opened
+    def opened(event):
+        row = tree.focus()
+        children = tree.get_children(row)
+        if row in nodes and len(children) == 1 and children[0] not in nodes:
+            fetch(nodes[row].key)
+
+    # Open the editor for the double-clicked item
+    def openItem(event):
+        if tree.focus() in nodes:
+            editItem(root, nodes[tree.focus()], None)
+
+    tree.bind("<<TreeviewOpen>>", opened)
+    tree.bind("<Double-1>", openItem)
+    fetch(None)
+
+
 def icon() -> str:
     """
     :return: filepath of icon.ico for this application
@@ -198,58 +338,63 @@ def icon() -> str:
     return path.join(path.dirname(__file__), "../resources/icon.ico")
 
 
-def populateColumn(root: tb.Frame, items: list[item], r: int, c: int) -> None:
+def refresh(root: tk.Frame) -> None:
     """
-    Populates a column with buttons for each item.
+    Refreshes the task list by reading the tasks of all statuses from the database in one query.
+    The query runs in the background; a newer refresh supersedes one that is still pending.
 
-    :param root: The tkinter root window.
-    :param items: The list of items to create buttons for.
-    :param r: The row number for the first button.
-    :param c: The column number for the buttons.
+    :param root: The parent widget.
     """
-    for item in items:
-        Button = tb.Button(root, text=item.key, style=bootstyleFromType(item.type))
-        Button.configure(command=lambda i=item, b=Button: editItem(root, i, b))
-        Button.grid(row=r, column=c, ipady=15, ipadx=15, pady=2, padx=5)
-        r += 1
+    dispatcher.getDispatcher(root).submit(
+        lambda: db.getWrapper().readBoard(),
+        onSuccess=lambda board: renderBoard(root, board),
+        onError=showError,
+        tag="refresh",
+    )
 
 
-def refresh(root: tk.Frame) -> None:
+def renderBoard(root: tk.Frame, board: dict[enums.Taskstatus, list[card]]) -> None:
     """
-    Refreshes the task list by reading tasks from the database with different statuses.
+    Updates the cards on the board to match the given columns.
+    Only cards that were added, moved, restyled or removed are touched.
 
     :param root: The parent widget.
+    :param board: A mapping of every task status to its cards.
+    """
+    boardGUI.getBoard(root).render(board)
+
+
+def showError(error: Exception) -> None:
     """
-    connection = db.Wrapper()
+    Reports a failed database call to the user.
 
-    draftItems = connection.readStatus(enums.Taskstatus.draft)
-    openItems = connection.readStatus(enums.Taskstatus.open)
-    progressItems = connection.readStatus(enums.Taskstatus.active)
-    completeItems = connection.readStatus(enums.Taskstatus.complete)
-    discardedItems = connection.readStatus(enums.Taskstatus.discarded)
+    :param error: The exception raised by the call.
+    """
+    Messagebox.ok(f"{error}", "Database error")
 
-    for widget in root.grid_slaves():
-        if widget.grid_info()["row"] > 2:
-            widget.destroy()
 
-    populateColumn(root, draftItems, 3, 0)
-    populateColumn(root, openItems, 3, 1)
-    populateColumn(root, progressItems, 3, 2)
-    populateColumn(root, completeItems, 3, 3)
-    populateColumn(root, discardedItems, 3, 4)
+def notify(title: str, message: str) -> None:
+    """
+    Shows a short notice in the corner of the screen without blocking the window.
+
+    :param title: The title of the notice.
+    :param message: The text of the notice.
+    """
+    ToastNotification(title=title, message=message, duration=5000).show_toast()
 
 
 def bootstyleFromType(currentType: enums.Tasktype) -> str:
     """
     Returns the appropriate Bootstyle for a task based on its type.
 
-    :param currentType: The task type.
+    :param currentType: The task type, or its value.
     :return: The Bootstyle.
     """
+    currentType = toEnum(enums.Tasktype, currentType)
     return (
         "success"
-        if currentType == enums.Tasktype.epic.value
+        if currentType == enums.Tasktype.epic
         else "info"
-        if currentType == enums.Tasktype.task.value
+        if currentType == enums.Tasktype.task
         else "light"
     )
@@ -10,6 +10,7 @@ and status options for use in comboboxes and other selections.
 - 'entryText': Creates a label-text area pair for multi-line text input.
 - 'comboPair': Creates a label-combobox pair for selecting from options.
 - 'datePair': Creates a label-date entry pair for selecting a date.
+- 'setValue': Replaces the value shown by a widget created by one of the functions above.
 """
 
 import ttkbootstrap as tb
@@ -161,3 +162,22 @@ def datePair(root, r, labelText) -> tb.DateEntry:
     label.grid(row=r, column=0, padx=(10, 0), pady=(10, 0))
     date.grid(row=r, column=1, padx=(10, 0), pady=(10, 0))
     return date
+
+
+def setValue(widget, value) -> None:
+    """
+    Replaces the value shown by a label, entry, combobox or text area, so widgets can be reused.
+
+    :param widget: A widget returned by `labelPair`, `entryPair`, `comboPair` or `entryText`.
+    :param value: The new value; it is shown as text.
+    """
+    if isinstance(widget, tb.Combobox):
+        widget.set(f"{value}")
+    elif isinstance(widget, tb.Entry):
+        widget.delete(0, "end")
+        widget.insert(0, f"{value}")
+    elif isinstance(widget, tb.Text):
+        widget.delete("1.0", "end")
+        widget.insert("1.0", f"{value}")
+    else:
+        widget.configure(text=f"{value}")
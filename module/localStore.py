@@ -0,0 +1,688 @@
+"""
+This file provides a local SQLite replica of the MongoDB collection, so the GUI reads and writes at
+local-disk latency and starts instantly from the last known board state, even while the cluster is unreachable.
+
+Local writes are marked dirty and pushed to MongoDB by `sync.SyncEngine`; remote changes are applied
+with their revision number, which detects conflicting edits of the same key.
+
+- `LocalStore`: The SQLite engine of `repository.Repository`, with the bookkeeping needed for synchronisation.
+- `fields`: Returns the indexed columns and the JSON of a serialized item.
+- `encode`: Serializes the datetimes of a document to JSON.
+- `eventDate`: Returns the sortable text of the date of a history event.
+- `loadEvent`: Reads a history event stored as JSON.
+- `defaultPath`: Returns the path of the local replica for the configured collection.
+"""
+
+import contextlib
+import datetime
+import json
+import os.path
+import sqlite3
+import threading
+
+from . import db, enums, history, metrics
+from .cache import ItemCache
+from .persistence import card, item, node, deserialize, toParent
+from .repository import Repository
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    key TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    doc TEXT NOT NULL,
+    revision INTEGER NOT NULL DEFAULT 0,
+    dirty INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS items_status ON items (status);
+CREATE INDEX IF NOT EXISTS items_dirty ON items (dirty);
+CREATE TABLE IF NOT EXISTS deletions (
+    key TEXT PRIMARY KEY,
+    revision INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS history (
+    id TEXT PRIMARY KEY,
+    key TEXT NOT NULL,
+    date TEXT NOT NULL,
+    event TEXT NOT NULL,
+    pushed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS history_key ON history (key);
+CREATE INDEX IF NOT EXISTS history_pushed ON history (pushed);
+"""
+"""
+Tables of the local replica. `revision` is the last revision known from MongoDB (0 if never pushed),
+`dirty` marks local changes that still need to be pushed, `deletions` holds local deletions that still need to be pushed.
+`history` holds the events logged locally, `pushed` marks those already appended to the log in MongoDB.
+"""
+
+METRIC_COLUMNS = {
+    "status": "status",
+    "type": "type",
+    "parent": "json_extract(doc, '$.parent')",
+}
+"""
+SQL expressions of the groups computed by `LocalStore.readMetrics`, by group name.
+"""
+
+
+class LocalStore(Repository):
+    def __init__(self, path: str = None, cache: ItemCache = None) -> None:
+        """
+        Opens (and if necessary creates) the local replica.
+
+        :param path: The SQLite database file; ":memory:" for a throwaway store. Default is `defaultPath()`.
+        :param cache: The cache for items read by key. Default is a new ItemCache.
+        """
+        self.path = defaultPath() if path is None else path
+        self.cache = ItemCache() if cache is None else cache
+        self.lock = threading.RLock()
+        self.depth = 0
+        self.committed = []
+        self.listeners = []
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.executescript(SCHEMA)
+        self.connection.create_function("number", 1, metrics.number, deterministic=True)
+
+    def readAll(self) -> list[item]:
+        """
+        :return: All locally known items.
+        """
+        return [deserialize(json.loads(doc)) for (doc,) in self.query("SELECT doc FROM items")]
+
+    def readStatus(self, type: enums.Taskstatus) -> list[item]:
+        """
+        :param type: The task status.
+
+        :return: All locally known items with the given status.
+        """
+        rows = self.query("SELECT doc FROM items WHERE status = ?", (type.value,))
+        return [deserialize(json.loads(doc)) for (doc,) in rows]
+
+    def readItem(self, key: str) -> item | None:
+        """
+        Reads a single item by its key, answering from the cache if it was read recently.
+        The item is a copy of the cached one, so callers may edit it and pass it to `updateItem`.
+
+        :param key: The key of the item.
+
+        :return: The item, or None if the key does not exist.
+        """
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached.copy()
+        generation = self.cache.generation
+        rows = self.query("SELECT doc, revision FROM items WHERE key = ?", (key,))
+        if not rows:
+            return None
+        current = deserialize(json.loads(rows[0][0]))
+        current.revision = rows[0][1]
+        self.cache.put(current, generation)
+        return current.copy()
+
+    def readCards(self, type: enums.Taskstatus = None) -> list[card]:
+        """
+        :param type: The task status, or None to read all cards.
+
+        :return: The cards of all items, optionally limited to the given status.
+        """
+        if type is None:
+            rows = self.query("SELECT key, type, status FROM items")
+        else:
+            rows = self.query(
+                "SELECT key, type, status FROM items WHERE status = ?", (type.value,)
+            )
+        return [card(*row) for row in rows]
+
+    def readBoard(self) -> dict[enums.Taskstatus, list[card]]:
+        """
+        :return: A mapping of every task status to its cards.
+        """
+        return db.bucketByStatus(self.readCards())
+
+    def readPage(self, after: str = None, limit: int = 50, prefix: str = "") -> list[card]:
+        """
+        Reads one page of cards ordered by key, continuing after the given key.
+
+        :param after: The last key of the previous page, or None for the first page.
+        :param limit: The maximum number of cards on the page.
+        :param prefix: Only read keys starting with this text; empty to read all keys.
+
+        :return: A list of cards, shorter than limit on the last page.
+        """
+        clauses, parameters = [], []
+        if after is not None:
+            clauses.append("key > ?")
+            parameters.append(after)
+        if prefix:
+            clauses.append("key >= ? AND key < ?")
+            parameters += [prefix, prefix + "\U0010ffff"]
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.query(
+            f"SELECT key, type, status FROM items{where} ORDER BY key LIMIT ?",
+            (*parameters, limit),
+        )
+        return [card(*row) for row in rows]
+
+    def readKeys(self) -> set[str]:
+        """
+        :return: A set of all locally known keys.
+        """
+        return {key for (key,) in self.query("SELECT key FROM items")}
+
+    def keyExists(self, key: str) -> bool:
+        """
+        :param key: The key to check.
+
+        :return: True if the key exists locally, False otherwise.
+        """
+        return bool(self.query("SELECT 1 FROM items WHERE key = ?", (key,)))
+
+    def readMetrics(self) -> dict[str, dict]:
+        """
+        Computes the metrics with one grouping query per group, without deserializing any item.
+
+        :return: The metrics, see `metrics.summarize`.
+        """
+        totals = (
+            "COUNT(*), SUM(number(json_extract(doc, '$.estimate'))),"
+            " SUM(number(json_extract(doc, '$.time_spent')))"
+        )
+        result = {}
+        for name, column in METRIC_COLUMNS.items():
+            groups = result[name] = {}
+            rows = self.query(f"SELECT {column}, {totals} FROM items GROUP BY {column}")
+            for value, *sums in rows:
+                metrics.add(groups, toParent(value) if name == "parent" else value, *sums)
+        return result
+
+    def readNodes(self, keys: set[str] = None) -> list[node]:
+        """
+        Reads the tree view of items, extracting only the needed fields from the JSON documents.
+
+        :param keys: The keys to read, or None to read all items. Missing keys are skipped.
+
+        :return: The nodes of the items.
+        """
+        sql = (
+            "SELECT key, type, json_extract(doc, '$.parent'), json_extract(doc, '$.estimate'),"
+            " json_extract(doc, '$.time_spent') FROM items"
+        )
+        if keys is None:
+            rows = self.query(sql)
+        else:
+            rows = self.query(
+                f"{sql} WHERE key IN (SELECT value FROM json_each(?))", (json.dumps(list(keys)),)
+            )
+        return [node(*row) for row in rows]
+
+    def readTexts(self, keys: set[str] = None) -> list[tuple[card, str]]:
+        """
+        Reads the searchable text of items, extracting only the description from the JSON documents.
+
+        :param keys: The keys to read, or None to read all items. Missing keys are skipped.
+
+        :return: The card and the description of every item.
+        """
+        sql = "SELECT key, type, status, json_extract(doc, '$.description') FROM items"
+        if keys is None:
+            rows = self.query(sql)
+        else:
+            rows = self.query(
+                f"{sql} WHERE key IN (SELECT value FROM json_each(?))", (json.dumps(list(keys)),)
+            )
+        return [(card(key, type, status), description) for key, type, status, description in rows]
+
+    def insertItems(self, items: list[item]) -> dict[str, bool]:
+        """
+        Inserts many items locally in one transaction and marks them for pushing; existing keys are skipped.
+        An item replacing a deletion that was not pushed yet is pushed as an update of the deleted item.
+
+        :param items: The items to insert.
+        :return: A mapping of every key to True if its item was inserted, False otherwise.
+        """
+        results = {}
+        with self.transaction():
+            for current in items:
+                deleted = self.query(
+                    "SELECT revision FROM deletions WHERE key = ?", (current.key,)
+                )
+                results[current.key] = (
+                    self.connection.execute(
+                        "INSERT INTO items (key, type, status, doc, revision, dirty)"
+                        " VALUES (?, ?, ?, ?, ?, 1) ON CONFLICT (key) DO NOTHING",
+                        (
+                            current.key,
+                            *fields(current.insertDict()),
+                            deleted[0][0] if deleted else 0,
+                        ),
+                    ).rowcount
+                    > 0
+                )
+                if results[current.key]:
+                    self.connection.execute(
+                        "DELETE FROM deletions WHERE key = ?", (current.key,)
+                    )
+            self.afterCommit(lambda: self.invalidate(results))
+            if any(results.values()):
+                self.afterCommit(self.written)
+        return results
+
+    def updateItem(self, current: item) -> bool | None:
+        """
+        Updates the changed attributes of the given item locally and marks it for pushing, if its key exists.
+        Nothing is written (or pushed) if no attribute changed. An item read at an older revision than the
+        replica now holds, because a remote change was applied in the meantime, is not written.
+
+        :param current: The item to update.
+        :return: True if the item was updated or nothing changed, False if the key does not exist,
+                 None if the item was changed remotely since it was read.
+        """
+        changes = current.changedDict()
+        if not changes:
+            return True
+        with self.transaction():
+            rows = self.query("SELECT doc, revision FROM items WHERE key = ?", (current.key,))
+            if not rows:
+                return False
+            if current.revision not in (None, rows[0][1]):
+                return None
+            doc = {**json.loads(rows[0][0]), **changes}
+            self.connection.execute(
+                "UPDATE items SET type = ?, status = ?, doc = ?, dirty = 1 WHERE key = ?",
+                (*fields(doc), current.key),
+            )
+            self.afterCommit(lambda: self.cache.invalidate(current.key))
+            self.afterCommit(self.written)
+        return True
+
+    def updateStatus(self, keys: list[str], status: enums.Taskstatus) -> dict[str, bool]:
+        """
+        Moves many items to the given status locally in one transaction and marks them for pushing.
+
+        :param keys: The keys of the items to move.
+        :param status: The new task status.
+        :return: A mapping of every key to True if its item was moved, False if it does not exist.
+        """
+        results = {}
+        with self.transaction():
+            for key in keys:
+                rows = self.query("SELECT doc FROM items WHERE key = ?", (key,))
+                results[key] = bool(rows)
+                if not rows:
+                    continue
+                doc = {**json.loads(rows[0][0]), "status": status.value}
+                self.connection.execute(
+                    "UPDATE items SET type = ?, status = ?, doc = ?, dirty = 1 WHERE key = ?",
+                    (*fields(doc), key),
+                )
+            self.afterCommit(lambda: self.invalidate(results))
+            if any(results.values()):
+                self.afterCommit(self.written)
+        return results
+
+    def deleteItems(self, keys: list[str]) -> dict[str, bool]:
+        """
+        Deletes many items locally in one transaction. Deletions of items known to MongoDB are kept for pushing.
+
+        :param keys: The keys of the items to delete.
+        :return: A mapping of every key to True if its item was deleted, False if it does not exist.
+        """
+        results = {}
+        with self.transaction():
+            for key in keys:
+                rows = self.query("SELECT revision FROM items WHERE key = ?", (key,))
+                results[key] = bool(rows)
+                if not rows:
+                    continue
+                self.connection.execute("DELETE FROM items WHERE key = ?", (key,))
+                if rows[0][0] > 0:
+                    self.connection.execute(
+                        "INSERT OR REPLACE INTO deletions (key, revision) VALUES (?, ?)",
+                        (key, rows[0][0]),
+                    )
+            self.afterCommit(lambda: self.invalidate(results))
+            if any(results.values()):
+                self.afterCommit(self.written)
+        return results
+
+    def dirtyItems(self) -> list[tuple[item, int, str]]:
+        """
+        :return: Every item with local changes, the revision the changes are based on,
+                 and the stored document to pass to `markClean`.
+        """
+        rows = self.query("SELECT doc, revision FROM items WHERE dirty = 1")
+        return [(deserialize(json.loads(doc)), revision, doc) for doc, revision in rows]
+
+    def markClean(self, key: str, revision: int, doc: str) -> None:
+        """
+        Records a successful push. The item stays dirty if it was changed again while being pushed.
+
+        :param key: The key of the pushed item.
+        :param revision: The revision MongoDB now holds.
+        :param doc: The stored document that was pushed, as returned by `dirtyItems`.
+        """
+        with self.transaction():
+            self.connection.execute(
+                "UPDATE items SET revision = ?, dirty = CASE WHEN doc = ? THEN 0 ELSE 1 END"
+                " WHERE key = ?",
+                (revision, doc, key),
+            )
+            # cached copies still carry the revision the push replaced
+            self.afterCommit(lambda: self.cache.invalidate(key))
+
+    def pendingDeletions(self) -> list[tuple[str, int]]:
+        """
+        :return: The key and last known revision of every local deletion that still needs to be pushed.
+        """
+        return self.query("SELECT key, revision FROM deletions")
+
+    def markDeleted(self, key: str) -> None:
+        """
+        Records a successful push of a deletion.
+
+        :param key: The key of the deleted item.
+        """
+        with self.transaction():
+            self.connection.execute("DELETE FROM deletions WHERE key = ?", (key,))
+            self.afterCommit(lambda: self.cache.invalidate(key))
+
+    def appendHistory(self, events: list[dict]) -> None:
+        """
+        Appends events to the local history log and marks them for pushing.
+        Events whose id is already stored are skipped.
+
+        :param events: The events, see `history`.
+        """
+        with self.transaction():
+            self.insertEvents(events, pushed=0)
+            self.afterCommit(self.written)
+
+    def readEvents(self, key: str) -> list[dict]:
+        """
+        The replica holds the events logged locally and those pulled with remote changes, see `applyRemoteEvents`.
+
+        :param key: The key of the item.
+
+        :return: The known events of the item, by date.
+        """
+        rows = self.query("SELECT event FROM history WHERE key = ? ORDER BY date", (key,))
+        return [loadEvent(event) for (event,) in rows]
+
+    def compactHistory(self, before: datetime.datetime) -> int:
+        """
+        Folds the pushed events older than the given time into one snapshot per item.
+        Events that were not pushed yet are kept until they are.
+
+        :param before: Events older than this time are folded.
+
+        :return: The number of folded events.
+        """
+        with self.transaction():
+            rows = self.query(
+                "SELECT event FROM history WHERE pushed = 1 AND date < ?", (eventDate(before),)
+            )
+            snapshots, folded = history.compact([loadEvent(event) for (event,) in rows], before)
+            self.connection.executemany("DELETE FROM history WHERE id = ?", [(id,) for id in folded])
+            self.insertEvents(snapshots, pushed=1)
+        return len(folded)
+
+    def pendingHistory(self, limit: int = 500) -> list[dict]:
+        """
+        :param limit: The maximum number of events.
+
+        :return: The oldest events that still need to be pushed.
+        """
+        rows = self.query(
+            "SELECT event FROM history WHERE pushed = 0 ORDER BY date LIMIT ?", (limit,)
+        )
+        return [loadEvent(event) for (event,) in rows]
+
+    def markHistoryPushed(self, ids: list[str]) -> None:
+        """
+        Records a successful push of events.
+
+        :param ids: The ids of the pushed events.
+        """
+        with self.transaction():
+            self.connection.executemany(
+                "UPDATE history SET pushed = 1 WHERE id = ?", [(id,) for id in ids]
+            )
+
+    def insertEvents(self, events: list[dict], pushed: int) -> None:
+        with self.transaction():
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO history (id, key, date, event, pushed) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        current["id"],
+                        current["key"],
+                        eventDate(current["date"]),
+                        json.dumps(current, default=encode),
+                        pushed,
+                    )
+                    for current in events
+                ],
+            )
+
+    def applyRemoteEvents(self, events: list[dict]) -> None:
+        """
+        Stores events read from the log in MongoDB as already pushed; events whose id is already stored are skipped.
+
+        :param events: The events, see `history`.
+        """
+        self.insertEvents(events, pushed=1)
+
+    def applyRemote(self, current: item, revision: int) -> str | None:
+        """
+        Applies an item read from MongoDB.
+
+        A clean local copy is replaced if the remote revision is newer. A dirty local copy is kept while
+        the remote revision still matches the one its changes are based on; otherwise someone else changed
+        the item in the meantime and the remote version wins.
+
+        :param current: The remote item.
+        :param revision: The remote revision.
+
+        :return: "insert", "update" or "conflict" if the local replica changed, None otherwise.
+                 A local deletion overtaken by a newer remote revision is a conflict, too.
+        """
+        type, status, doc = fields(current.insertDict())
+        with self.transaction():
+            rows = self.query(
+                "SELECT doc, revision, dirty FROM items WHERE key = ?", (current.key,)
+            )
+            deleted = self.query(
+                "SELECT revision FROM deletions WHERE key = ?", (current.key,)
+            )
+            if deleted:
+                if revision <= deleted[0][0]:
+                    return None  # the local deletion is pending on top of this revision
+                self.connection.execute(
+                    "DELETE FROM deletions WHERE key = ?", (current.key,)
+                )
+                outcome = "conflict"
+            elif not rows:
+                outcome = "insert"
+            else:
+                localDoc, localRevision, dirty = rows[0]
+                if dirty and revision == localRevision:
+                    return None  # local changes are pending on top of this revision
+                if not dirty and (revision < localRevision or localDoc == doc):
+                    return None  # stale or unchanged
+                outcome = "conflict" if dirty else "update"
+            self.connection.execute(
+                "INSERT OR REPLACE INTO items (key, type, status, doc, revision, dirty)"
+                " VALUES (?, ?, ?, ?, ?, 0)",
+                (current.key, type, status, doc, revision),
+            )
+            self.afterCommit(lambda: self.cache.invalidate(current.key))
+        return outcome
+
+    def applyRemoteDelete(self, key: str) -> str | None:
+        """
+        Applies the deletion of an item in MongoDB. Items that were never pushed are kept.
+
+        :param key: The key of the deleted item.
+
+        :return: "delete" or "conflict" (if there were local changes) if the local replica changed, None otherwise.
+        """
+        with self.transaction():
+            rows = self.query("SELECT revision, dirty FROM items WHERE key = ?", (key,))
+            if not rows or rows[0][0] == 0:
+                return None
+            self.connection.execute("DELETE FROM items WHERE key = ?", (key,))
+            self.afterCommit(lambda: self.cache.invalidate(key))
+        return "conflict" if rows[0][1] else "delete"
+
+    def syncedKeys(self) -> set[str]:
+        """
+        :return: The keys of all items that exist in MongoDB as far as the replica knows.
+        """
+        return {key for (key,) in self.query("SELECT key FROM items WHERE revision > 0")}
+
+    def getMeta(self, name: str) -> str | None:
+        """
+        :param name: The name of the setting.
+
+        :return: The stored value, or None.
+        """
+        rows = self.query("SELECT value FROM meta WHERE name = ?", (name,))
+        return rows[0][0] if rows else None
+
+    def setMeta(self, name: str, value: str) -> None:
+        """
+        :param name: The name of the setting.
+        :param value: The value to store.
+        """
+        with self.transaction():
+            self.connection.execute(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, value)
+            )
+
+    def addWriteListener(self, listener) -> None:
+        """
+        Registers a callable that is called after every local write, e.g. to push it right away.
+
+        :param listener: A callable without arguments.
+        """
+        self.listeners.append(listener)
+
+    def query(self, sql: str, parameters: tuple = ()) -> list[tuple]:
+        """
+        Runs a read query while holding the store lock.
+
+        :param sql: The SQL statement.
+        :param parameters: The statement parameters.
+
+        :return: All result rows.
+        """
+        with self.lock:
+            return self.connection.execute(sql, parameters).fetchall()
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        Runs the writes made in a `with` block in one SQLite transaction, committed when the outermost block ends
+        and rolled back if it raises. Blocks may be nested.
+        Cache invalidations and write listeners registered with `afterCommit` run after the commit,
+        outside the store lock.
+        """
+        with self.lock:
+            self.depth += 1
+            try:
+                yield
+            except BaseException:
+                if self.depth == 1:
+                    self.connection.rollback()
+                    self.committed.clear()
+                raise
+            finally:
+                self.depth -= 1
+            if self.depth > 0:
+                return
+            self.connection.commit()
+            committed, self.committed = self.committed, []
+        for callback in committed:
+            callback()
+
+    def afterCommit(self, callback) -> None:
+        # called within `transaction`: invalidation listeners such as the search index take their own lock
+        # and then read from the store, so notifying them under the store lock could deadlock
+        self.committed.append(callback)
+
+    def written(self) -> None:
+        for listener in self.listeners:
+            listener()
+
+    def invalidate(self, results: dict[str, bool]) -> None:
+        for key, done in results.items():
+            if done:
+                self.cache.invalidate(key)
+
+    def close(self) -> None:
+        """
+        Closes the SQLite connection.
+        """
+        with self.lock:
+            self.connection.close()
+
+
+def fields(doc: dict) -> tuple[str, str, str]:
+    """
+    :param doc: A serialized item.
+
+    :return: The indexed columns type and status, and the document as JSON.
+    """
+    return doc["type"], doc["status"], json.dumps(doc, default=encode)
+
+
+def encode(value) -> str:
+    """
+    Stores datetimes, which JSON has no type for, as ISO 8601 strings; `persistence.toDatetime` reads them back.
+
+    :param value: A value json cannot serialize.
+
+    :return: The ISO 8601 string of a datetime.
+
+    :raises TypeError: If the value is not a datetime.
+    """
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def eventDate(date: datetime.datetime) -> str:
+    """
+    :param date: The date of an event.
+
+    :return: The date as a UTC ISO 8601 string with microseconds, so dates sort as text.
+    """
+    return history.toUTC(date).astimezone(datetime.timezone.utc).isoformat(timespec="microseconds")
+
+
+def loadEvent(text: str) -> dict:
+    """
+    :param text: An event stored as JSON.
+
+    :return: The event with its date as a UTC datetime.
+    """
+    event = json.loads(text)
+    event["date"] = history.toUTC(event["date"])
+    return event
+
+
+def defaultPath() -> str:
+    """
+    :return: The path of the local replica, named after the database context and collection of the credentials file.
+    """
+    credentials = db.readCredentials("resources/credentials.txt")
+    return os.path.join(
+        os.path.dirname(__file__),
+        "../resources",
+        f"{credentials['dbcontext']}-{credentials['collection']}.sqlite3",
+    )
@@ -0,0 +1,357 @@
+"""
+This file provides an in-memory storage engine, so tests and benchmarks run offline at memory speed.
+
+Items are kept serialized like in MongoDB, so reads return fresh copies;
+`readItem` copies the cached item. Lookups by key use a dictionary,
+lookups by status a per-status index, and pages a sorted list of keys.
+
+- `MemoryStore`: The in-memory engine of `repository.Repository`, including the revision operations used by `sync`
+                 and the history log.
+"""
+
+import bisect
+import datetime
+import threading
+
+from . import db, enums, history
+from .cache import ItemCache
+from .persistence import card, item, deserialize, deserializeCard
+from .repository import Repository
+
+
+class MemoryStore(Repository):
+    def __init__(self, items: list[item] = (), cache: ItemCache = None) -> None:
+        """
+        Initializes a store holding the given items.
+
+        :param items: The items to start with.
+        :param cache: The cache for items read by key. Default is a new ItemCache.
+        """
+        self.cache = ItemCache() if cache is None else cache
+        self.lock = threading.RLock()
+        self.documents = {}
+        self.byStatus = {}
+        self.sortedKeys = []
+        self.events = {}
+        self.insertItems(list(items))
+
+    def readAll(self) -> list[item]:
+        """
+        :return: All items.
+        """
+        with self.lock:
+            return [deserialize(doc) for doc in self.documents.values()]
+
+    def readStatus(self, type: enums.Taskstatus) -> list[item]:
+        """
+        :param type: The task status.
+
+        :return: All items with the given status.
+        """
+        with self.lock:
+            return [
+                deserialize(self.documents[key])
+                for key in self.byStatus.get(type.value, {})
+            ]
+
+    def readItem(self, key: str) -> item | None:
+        """
+        Reads a single item by its key, answering from the cache if it was read recently.
+        The item is a copy of the cached one, so callers may edit it and pass it to `updateItem`.
+
+        :param key: The key of the item.
+
+        :return: The item, or None if the key does not exist.
+        """
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached.copy()
+        generation = self.cache.generation
+        with self.lock:
+            doc = self.documents.get(key)
+            current = None if doc is None else deserialize(doc)
+        if current is None:
+            return None
+        self.cache.put(current, generation)
+        return current.copy()
+
+    def readCards(self, type: enums.Taskstatus = None) -> list[card]:
+        """
+        :param type: The task status, or None to read all cards.
+
+        :return: The cards of all items, optionally limited to the given status.
+        """
+        with self.lock:
+            keys = self.documents if type is None else self.byStatus.get(type.value, {})
+            return [deserializeCard(self.documents[key]) for key in keys]
+
+    def readBoard(self) -> dict[enums.Taskstatus, list[card]]:
+        """
+        :return: A mapping of every task status to its cards.
+        """
+        return {status: self.readCards(status) for status in enums.Taskstatus}
+
+    def readPage(self, after: str = None, limit: int = 50, prefix: str = "") -> list[card]:
+        """
+        Reads one page of cards ordered by key, continuing after the given key.
+
+        :param after: The last key of the previous page, or None for the first page.
+        :param limit: The maximum number of cards on the page.
+        :param prefix: Only read keys starting with this text; empty to read all keys.
+
+        :return: A list of cards, shorter than limit on the last page.
+        """
+        with self.lock:
+            start = bisect.bisect_left(self.sortedKeys, prefix)
+            if after is not None:
+                start = max(start, bisect.bisect_right(self.sortedKeys, after))
+            page = []
+            for key in self.sortedKeys[start:]:
+                if len(page) == limit or not key.startswith(prefix):
+                    break
+                page.append(deserializeCard(self.documents[key]))
+            return page
+
+    def readKeys(self) -> set[str]:
+        """
+        :return: A set of all keys.
+        """
+        with self.lock:
+            return set(self.documents)
+
+    def keyExists(self, key: str) -> bool:
+        """
+        :param key: The key to check.
+
+        :return: True if the key exists, False otherwise.
+        """
+        with self.lock:
+            return key in self.documents
+
+    def readTexts(self, keys: set[str] = None) -> list[tuple[card, str]]:
+        """
+        :param keys: The keys to read, or None to read all items. Missing keys are skipped.
+
+        :return: The card and the description of every item.
+        """
+        with self.lock:
+            found = self.documents.values() if keys is None else map(self.documents.get, keys)
+            return [(deserializeCard(doc), doc["description"]) for doc in found if doc is not None]
+
+    def readChangedSince(self, since: datetime.datetime) -> list[card]:
+        """
+        :param since: The time of the last read.
+
+        :return: The cards of all items written after the given time.
+        """
+        with self.lock:
+            return [
+                deserializeCard(doc)
+                for doc in self.documents.values()
+                if doc["updatedAt"] > since
+            ]
+
+    def readRevision(self, key: str) -> tuple[item, int] | None:
+        """
+        :param key: The key of the item.
+
+        :return: The item and its revision, or None if the key does not exist.
+        """
+        with self.lock:
+            doc = self.documents.get(key)
+            return None if doc is None else (deserialize(doc), doc["revision"])
+
+    def readChangedItems(self, since: datetime.datetime = None) -> list[tuple[item, int]]:
+        """
+        :param since: The time of the last read, or None to read all items.
+
+        :return: All items written after the given time and their revisions.
+        """
+        with self.lock:
+            return [
+                (deserialize(doc), doc["revision"])
+                for doc in self.documents.values()
+                if since is None or doc["updatedAt"] > since
+            ]
+
+    def insertItems(self, items: list[item]) -> dict[str, bool]:
+        """
+        Inserts many items at once; items whose key already exists are skipped.
+
+        :param items: The items to insert.
+        :return: A mapping of every key to True if its item was inserted, False otherwise.
+        """
+        now = db.timestamp()
+        results = {}
+        with self.lock:
+            for current in items:
+                results[current.key] = current.key not in self.documents
+                if results[current.key]:
+                    doc = {**current.insertDict(), "updatedAt": now, "revision": 1}
+                    self.documents[current.key] = doc
+                    self.byStatus.setdefault(doc["status"], {})[current.key] = None
+                    bisect.insort(self.sortedKeys, current.key)
+        self.invalidate(results)
+        return results
+
+    def updateItem(self, current: item) -> bool | None:
+        """
+        Updates the changed attributes of the given item if its key exists,
+        only while its revision matches the one the item was read at.
+
+        :param current: The item to update.
+        :return: True if the item was updated or nothing changed, False if the key does not exist,
+                 None if the item was written since it was read.
+        """
+        changes = current.changedDict()
+        if not changes:
+            return True
+        with self.lock:
+            doc = self.documents.get(current.key)
+            if doc is None:
+                return False
+            if current.revision not in (None, doc["revision"]):
+                return None
+            self.write(doc, changes)
+        self.cache.invalidate(current.key)
+        return True
+
+    def updateRevision(self, current: item, revision: int | None) -> int | None:
+        """
+        Updates the given item only if its stored revision still matches (compare-and-set).
+
+        :param current: The item to update.
+        :param revision: The revision the changes are based on, or None to update any revision.
+
+        :return: The new revision, or None if the item was changed or deleted in the meantime.
+        """
+        with self.lock:
+            doc = self.documents.get(current.key)
+            if doc is None or revision not in (None, doc["revision"]):
+                return None
+            self.write(doc, current.updateDict())
+            revision = doc["revision"]
+        self.cache.invalidate(current.key)
+        return revision
+
+    def updateStatus(self, keys: list[str], status: enums.Taskstatus) -> dict[str, bool]:
+        """
+        Moves many items to the given status at once.
+
+        :param keys: The keys of the items to move.
+        :param status: The new task status.
+        :return: A mapping of every key to True if its item was moved, False if it does not exist.
+        """
+        results = {}
+        with self.lock:
+            for key in keys:
+                results[key] = key in self.documents
+                if results[key]:
+                    self.write(self.documents[key], {"status": status.value})
+        self.invalidate(results)
+        return results
+
+    def deleteItems(self, keys: list[str]) -> dict[str, bool]:
+        """
+        Deletes many items at once.
+
+        :param keys: The keys of the items to delete.
+        :return: A mapping of every key to True if its item was deleted, False if it does not exist.
+        """
+        with self.lock:
+            results = {key: self.remove(key, None) for key in keys}
+        self.invalidate(results)
+        return results
+
+    def deleteRevision(self, key: str, revision: int | None) -> bool | None:
+        """
+        Deletes an item only if its stored revision still matches (compare-and-set).
+
+        :param key: The key of the item.
+        :param revision: The revision the deletion is based on, or None to delete any revision.
+
+        :return: True if the item was deleted, False if it does not exist,
+                 None if it was changed in the meantime.
+        """
+        with self.lock:
+            result = self.remove(key, revision)
+        self.invalidate({key: result})
+        return result
+
+    def remove(self, key: str, revision: int | None) -> bool | None:
+        with self.lock:
+            doc = self.documents.get(key)
+            if doc is None:
+                return False
+            if revision not in (None, doc["revision"]):
+                return None
+            del self.documents[key]
+            del self.byStatus[doc["status"]][key]
+            del self.sortedKeys[bisect.bisect_left(self.sortedKeys, key)]
+            return True
+
+    def appendHistory(self, events: list[dict]) -> None:
+        """
+        Appends events to the history log; events whose id is already stored are skipped.
+
+        :param events: The events, see `history`.
+        """
+        with self.lock:
+            for current in events:
+                self.events.setdefault(current["key"], {}).setdefault(current["id"], dict(current))
+
+    def readEvents(self, key: str) -> list[dict]:
+        """
+        :param key: The key of the item.
+
+        :return: The logged events of the item, in the order they were appended.
+        """
+        with self.lock:
+            return [dict(current) for current in self.events.get(key, {}).values()]
+
+    def compactHistory(self, before: datetime.datetime) -> int:
+        """
+        Folds the logged events older than the given time into one snapshot per item.
+
+        :param before: Events older than this time are folded.
+
+        :return: The number of folded events.
+        """
+        with self.lock:
+            logged = [current for events in self.events.values() for current in events.values()]
+            snapshots, folded = history.compact(logged, before)
+            folded = set(folded)
+            for events in self.events.values():
+                for id in folded.intersection(events):
+                    del events[id]
+            self.appendHistory(snapshots)
+            return len(folded)
+
+    def invalidate(self, results: dict) -> None:
+        # after the write and outside the store lock, see `LocalStore.invalidate`
+        for key, done in results.items():
+            if done:
+                self.cache.invalidate(key)
+
+    def write(self, doc: dict, changes: dict) -> None:
+        """
+        Applies changes to a stored document, keeping the status index, timestamp and revision up to date.
+
+        :param doc: The stored document.
+        :param changes: The changed fields.
+        """
+        if changes.get("status", doc["status"]) != doc["status"]:
+            del self.byStatus[doc["status"]][doc["key"]]
+            self.byStatus.setdefault(changes["status"], {})[doc["key"]] = None
+        doc.update(changes, updatedAt=db.timestamp(), revision=doc["revision"] + 1)
+
+    def close(self) -> None:
+        """
+        Forgets all items.
+        """
+        with self.lock:
+            self.documents.clear()
+            self.byStatus.clear()
+            self.sortedKeys.clear()
+            self.events.clear()
+        self.cache.clear()
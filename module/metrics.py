@@ -0,0 +1,130 @@
+"""
+This file computes board metrics: the number of items and their estimated and spent time,
+grouped by status, by type and by parent.
+
+MongoDB computes them server-side with a single aggregation (`PIPELINE`), the local replica with SQL, and other
+engines fall back to `summarize` in Python. All of them return the same mapping, see `summarize`.
+Estimates and times that are not numbers count as 0.
+
+- `PIPELINE`: The aggregation pipeline grouping a collection by status, type and parent in one round trip.
+- `summarize`: A function computing the metrics of a list of items in Python.
+- `fromFacets`: A function converting the result of `PIPELINE` into metrics.
+- `number`: A function converting a stored estimate or time into a number for summing.
+- `describe`: A function formatting the totals of one group for display.
+"""
+
+from .persistence import item, toNumber, toParent
+
+GROUPS = {"status": "$status", "type": "$type", "parent": "$parent"}
+"""
+Fields the metrics are grouped by, by group name.
+"""
+
+
+def numeric(field: str) -> dict:
+    """
+    :param field: The field path, e.g. "$estimate".
+
+    :return: An expression converting the field into a number, 0 if it is not one (e.g. "3 Hours").
+    """
+    return {"$convert": {"input": field, "to": "double", "onError": 0, "onNull": 0}}
+
+
+PIPELINE = [
+    {
+        "$facet": {
+            name: [
+                {
+                    "$group": {
+                        "_id": field,
+                        "count": {"$sum": 1},
+                        "estimate": {"$sum": numeric("$estimate")},
+                        "spent": {"$sum": numeric("$time_spent")},
+                    }
+                }
+            ]
+            for name, field in GROUPS.items()
+        }
+    }
+]
+"""
+Aggregation pipeline computing the totals of all groups server-side in a single round trip.
+"""
+
+
+def summarize(items: list[item]) -> dict[str, dict]:
+    """
+    Computes the metrics of the given items in Python.
+
+    :param items: The items.
+
+    :return: A mapping of every group name ("status", "type", "parent") to a mapping of every group value
+             to its totals {"count", "estimate", "spent"}. Values are stored values, e.g. "Open";
+             items without parent are grouped under None.
+    """
+    result = {name: {} for name in GROUPS}
+    for current in items:
+        estimate, spent = number(current.estimate), number(current.time_spent)
+        for name, value in (
+            ("status", current.status),
+            ("type", current.type),
+            ("parent", current.parent),
+        ):
+            add(result[name], getattr(value, "value", value), 1, estimate, spent)
+    return result
+
+
+def fromFacets(document: dict) -> dict[str, dict]:
+    """
+    Converts the result of `PIPELINE` into metrics.
+
+    :param document: The single document returned by the aggregation.
+
+    :return: The metrics, see `summarize`.
+    """
+    result = {name: {} for name in GROUPS}
+    for name in GROUPS:
+        for group in document.get(name, []):
+            value = toParent(group["_id"]) if name == "parent" else group["_id"]
+            add(result[name], value, group["count"], group["estimate"], group["spent"])
+    return result
+
+
+def add(groups: dict, value, count: int, estimate: float, spent: float) -> None:
+    """
+    Adds totals to a group, creating it if necessary.
+
+    :param groups: The mapping of group values to totals.
+    :param value: The group value.
+    :param count: The number of items to add.
+    :param estimate: The estimated time to add.
+    :param spent: The spent time to add.
+    """
+    totals = groups.setdefault(value, {"count": 0, "estimate": 0, "spent": 0})
+    totals["count"] += count
+    totals["estimate"] += estimate
+    totals["spent"] += spent
+
+
+def number(value) -> float:
+    """
+    :param value: A stored estimate or time, e.g. 3, "3" or "3 Hours".
+
+    :return: The value as a number, 0 if it is not one.
+    """
+    value = toNumber(value)
+    return value if type(value) is int or type(value) is float else 0
+
+
+def describe(totals: dict | None, separator: str = "\n") -> str:
+    """
+    :param totals: The totals of a group, or None for an empty group.
+    :param separator: The text between the number of items and the times.
+
+    :return: A short text showing the number of items and their estimated and spent time.
+    """
+    totals = totals or {"count": 0, "estimate": 0, "spent": 0}
+    return (
+        f"{totals['count']} items{separator}"
+        f"{totals['estimate']:g} estimated / {totals['spent']:g} spent"
+    )
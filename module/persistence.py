@@ -3,12 +3,49 @@ This file defines the `item` class to represent tasks within the Kanban applicat
 
 - `item`: A class representing a task with attributes like key, type, creation date,
          estimated time, time spent, status, description, parent task, and history of changes.
+         Items remember the values they were read with, so only changed attributes are written.
+- `card`: A lightweight class holding only the attributes needed to draw a task on the board.
+- `node`: A lightweight class holding only the attributes needed to place a task in the epic/task/subtask tree.
 - `deserialize`: A function that deserializes a dictionary representation of a Task object
                  back into a Task object.
+- `deserializeCard`: A function that deserializes a (projected) dictionary into a card.
+- `deserializeNode`: A function that deserializes a (projected) dictionary into a node.
+- `toEnum`: A function converting a stored value into an enum member.
+- `toNumber`: A function converting a stored value into a number.
+- `toText`: A function converting an attribute into the string stored in documents.
+- `toDatetime`: A function converting a stored creation date into a datetime.
+- `toParent`: A function converting a stored parent key, mapping missing parents to None.
+- `upgrade`: A function rewriting a document of any schema version into the current version.
+
+All classes use `__slots__` and hold real enum members, numbers and datetimes, so large boards take little
+memory and comparisons need no string handling. Documents are written in schema version 2 with native numbers,
+datetimes and null parents; version 1 documents stored every field as a string and are still read.
+Values that cannot be converted (e.g. a status unknown to this version) are kept as they are,
+so existing documents always load.
 """
 
+import datetime
+import enum
+
 from .enums import Tasktype, Taskstatus
 
+SCHEMA_VERSION = 2
+"""
+Version of the documents written by `item.insertDict`, stored in their `schema` field.
+Version 1 documents have no `schema` field.
+"""
+
+MUTABLE = ("type", "time_spent", "status", "description", "parent")
+"""
+Attributes that can be modified after creation, the fields of `item.updateDict`.
+"""
+
+MEMBERS = {kind: {member.value: member for member in kind} for kind in (Tasktype, Taskstatus)}
+"""
+Lookup of the enum member for every stored value of the task enums,
+cheaper than calling the enum for every deserialized document.
+"""
+
 
 class item:
     """
@@ -17,8 +54,26 @@ class item:
     A task has various attributes including a unique identifier, type, creation date,
     estimated time, time spent, current status, description, optional parent task,
     and a history of changes.
+
+    An item read from storage also remembers the values of its modifiable attributes as read (`original`)
+    and the revision of the stored document (`revision`), so writes can be limited to the changed attributes
+    and rejected if someone else wrote the document in the meantime. Neither takes part in comparisons.
     """
 
+    __slots__ = (
+        "key",
+        "type",
+        "creation",
+        "estimate",
+        "time_spent",
+        "status",
+        "description",
+        "parent",
+        "history",
+        "original",
+        "revision",
+    )
+
     def __init__(
         self,
         key,
@@ -43,16 +98,21 @@ class item:
         :param description: A textual description of the task.
         :param parent: The optional identifier of the parent task (if applicable).
         :param history: A list containing historical changes to the task attributes.
+
+        Type and status are converted into enum members, estimate and time spent into numbers,
+        the creation date into a datetime and a missing parent into None.
         """
         self.key = key
-        self.type: Tasktype = type
-        self.creation = creation
-        self.estimate = estimate
-        self.time_spent = time_spent
-        self.status: Taskstatus = status
+        self.type: Tasktype = toEnum(Tasktype, type)
+        self.creation = toDatetime(creation)
+        self.estimate = toNumber(estimate)
+        self.time_spent = toNumber(time_spent)
+        self.status: Taskstatus = toEnum(Taskstatus, status)
         self.description = description
-        self.parent = parent
+        self.parent = toParent(parent)
         self.history = history
+        self.original = None
+        self.revision = None
 
     def __eq__(self, other) -> bool:
         """
@@ -77,23 +137,82 @@ class item:
             and self.history == other.history
         )
 
-    def insertDict(self) -> dict[str, str]:
+    def insertDict(self) -> dict:
         """
         This method creates a dictionary representation of the Task object
         suitable for insertion into a database or other storage mechanism.
 
-        :return: A dictionary containing all attributes of the Task object as strings.
+        :return: A dictionary containing all attributes of the Task object in the current schema version.
         """
         return {
             "key": f"{self.key}",
-            "type": f"{self.type}",
-            "creation": f"{self.creation}",
-            "estimate": f"{self.estimate}",
-            "time_spent": f"{self.time_spent}",
-            "status": f"{self.status}",
+            "type": toText(self.type),
+            "creation": self.creation,
+            "estimate": self.estimate,
+            "time_spent": self.time_spent,
+            "status": toText(self.status),
             "description": f"{self.description}",
-            "parent": f"{self.parent}",
+            "parent": self.parent,
             "history": self.history,
+            "schema": SCHEMA_VERSION,
+        }
+
+    def asCard(self) -> "card":
+        """
+        This method creates the board view of the Task object.
+
+        :return: A card with the key, type and status of the Task object.
+        """
+        return card(self.key, self.type, self.status)
+
+    def asNode(self) -> "node":
+        """
+        This method creates the tree view of the Task object.
+
+        :return: A node with the key, type, parent, estimate and time spent of the Task object.
+        """
+        return node(self.key, self.type, self.parent, self.estimate, self.time_spent)
+
+    def track(self, revision=None, base: "item" = None) -> "item":
+        """
+        This method remembers the original state of the Task object, the state changes are detected against.
+
+        :param revision: The revision of the stored document the state was read at, or None if unknown.
+        :param base: The Task object as read, if the changes were made to a copy; defaults to this object.
+
+        :return: This Task object.
+        """
+        base = self if base is None else base
+        self.original = tuple(getattr(base, field) for field in MUTABLE)
+        self.revision = revision
+        return self
+
+    def copy(self) -> "item":
+        """
+        This method creates a copy of the Task object that can be changed without affecting this one.
+
+        :return: A new Task object with its own history list, tracking the same original state and revision.
+        """
+        duplicate = item.__new__(item)
+        for field in item.__slots__:
+            setattr(duplicate, field, getattr(self, field))
+        duplicate.history = list(self.history)
+        return duplicate
+
+    def changedDict(self) -> dict:
+        """
+        This method creates a dictionary of the modifiable attributes that differ from the original state.
+
+        :return: The changed entries of `updateDict`, empty if nothing changed;
+                 all entries if the Task object does not track its original state.
+        """
+        current = self.updateDict()
+        if self.original is None:
+            return current
+        return {
+            field: current[field]
+            for field, value in zip(MUTABLE, self.original)
+            if getattr(self, field) != value
         }
 
     def updateDict(self) -> dict:
@@ -102,25 +221,106 @@ class item:
         suitable for updating existing data in a database or other storage mechanism.
 
         :return: A dictionary containing only attributes that can be modified after creation.
+                 The history is not rewritten; changes are appended to the log in `history` instead.
         """
         return {
-            "type": f"{self.type}",
-            "time_spent": f"{self.time_spent}",
-            "status": f"{self.status}",
+            "type": toText(self.type),
+            "time_spent": self.time_spent,
+            "status": toText(self.status),
             "description": f"{self.description}",
-            "parent": f"{self.parent}",
-            "history": self.history,
+            "parent": self.parent,
         }
 
 
+class card:
+    """
+    This class represents the board view of a task.
+
+    A card only carries the key, type and status of a task, which is all the board needs
+    to draw it. The full task is loaded on demand when it is opened.
+    """
+
+    __slots__ = ("key", "type", "status")
+
+    def __init__(self, key, type: Tasktype, status: Taskstatus) -> None:
+        """
+        This method initializes a new card object.
+
+        :param key: The unique identifier for the task.
+        :param type: The type of task (e.g., Epic, Task, Subtask).
+        :param status: The current status of the task.
+        """
+        self.key = key
+        self.type: Tasktype = toEnum(Tasktype, type)
+        self.status: Taskstatus = toEnum(Taskstatus, status)
+
+    def __eq__(self, other) -> bool:
+        """
+        This method defines equality comparison for the card class.
+
+        :param other: Another card object to compare with.
+
+        :return: True if key, type and status are equal, False otherwise.
+        """
+        if not isinstance(other, card):
+            return False
+
+        return (
+            self.key == other.key
+            and self.type == other.type
+            and self.status == other.status
+        )
+
+
+class node:
+    """
+    This class represents the tree view of a task.
+
+    A node only carries what is needed to place a task below its parent and to sum up
+    the estimated and spent time of everything below an epic.
+    """
+
+    __slots__ = ("key", "type", "parent", "estimate", "time_spent")
+
+    def __init__(self, key, type: Tasktype, parent, estimate, time_spent) -> None:
+        """
+        This method initializes a new node object.
+
+        :param key: The unique identifier for the task.
+        :param type: The type of task (e.g., Epic, Task, Subtask).
+        :param parent: The identifier of the parent task, if any.
+        :param estimate: The estimated time to complete the task.
+        :param time_spent: The time already spent on the task.
+        """
+        self.key = key
+        self.type: Tasktype = toEnum(Tasktype, type)
+        self.parent = toParent(parent)
+        self.estimate = toNumber(estimate)
+        self.time_spent = toNumber(time_spent)
+
+    def __eq__(self, other) -> bool:
+        """
+        This method defines equality comparison for the node class.
+
+        :param other: Another node object to compare with.
+
+        :return: True if all attributes are equal, False otherwise.
+        """
+        if not isinstance(other, node):
+            return False
+
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+
 def deserialize(doc: dict) -> item:
     """
     This function deserializes a dictionary representation of a Task object
     back into a Task object.
 
-    :param doc: A dictionary containing the serialized data of a Task object.
+    :param doc: A dictionary containing the serialized data of a Task object, in any schema version.
 
-    :return: A Task object created from the provided dictionary.
+    :return: A Task object created from the provided dictionary,
+             tracking its original state and the revision of the document, if stored.
     """
     return item(
         doc["key"],
@@ -132,4 +332,119 @@ def deserialize(doc: dict) -> item:
         doc["description"],
         doc["parent"],
         doc["history"],
-    )
+    ).track(doc.get("revision"))
+
+
+def deserializeCard(doc: dict) -> card:
+    """
+    This function deserializes a dictionary representation of a Task object,
+    which may be projected to key, type and status, into a card.
+
+    :param doc: A dictionary containing at least key, type and status.
+
+    :return: A card created from the provided dictionary.
+    """
+    return card(doc["key"], doc["type"], doc["status"])
+
+
+def deserializeNode(doc: dict) -> node:
+    """
+    This function deserializes a dictionary representation of a Task object,
+    which may be projected to key, type, parent, estimate and time spent, into a node.
+
+    :param doc: A dictionary containing at least key, type, parent, estimate and time_spent.
+
+    :return: A node created from the provided dictionary.
+    """
+    return node(doc["key"], doc["type"], doc["parent"], doc["estimate"], doc["time_spent"])
+
+
+def toEnum(kind: type[enum.Enum], value):
+    """
+    This function converts a stored value into a member of the given enum.
+
+    :param kind: Tasktype or Taskstatus.
+    :param value: A member of the enum or its value.
+
+    :return: The enum member, or the value itself if it is unknown to the enum.
+    """
+    if type(value) is kind:
+        return value
+    try:
+        return MEMBERS[kind].get(value, value)
+    except TypeError:  # unhashable values are never members
+        return value
+
+
+def toNumber(value):
+    """
+    This function converts a stored value into a number.
+
+    :param value: A number or its string representation.
+
+    :return: An int for whole numbers, a float otherwise, or the value itself if it is not a number.
+    """
+    if type(value) is int or type(value) is float:
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return value
+    return int(number) if number.is_integer() else number
+
+
+def toText(value) -> str:
+    """
+    This function converts an attribute into the string stored in documents.
+
+    :param value: A task enum member, a number or any other value.
+
+    :return: The value of a task enum member, the string representation of anything else.
+    """
+    # _value_ is a plain attribute of enum members, cheaper than the value property
+    return f"{getattr(value, '_value_', value)}"
+
+
+def toDatetime(value):
+    """
+    This function converts a stored creation date into a datetime.
+
+    :param value: A datetime, a version 1 date ("%Y-%m-%d-%H-%M") or an ISO 8601 string.
+
+    :return: The datetime, or the value itself if it is not a date.
+    """
+    if not isinstance(value, str):
+        return value
+    parts = value.split("-")
+    try:
+        if len(parts) == 5 and all(part.isdigit() for part in parts):
+            return datetime.datetime(*map(int, parts))  # cheaper than strptime("%Y-%m-%d-%H-%M")
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return value
+
+
+def toParent(value):
+    """
+    This function converts a stored parent key.
+
+    :param value: The parent key; version 1 documents store a missing parent as "None".
+
+    :return: The parent key, or None if the task has no parent.
+    """
+    return None if value in (None, "", "None") else value
+
+
+def upgrade(doc: dict) -> dict:
+    """
+    This function rewrites a document of any schema version into the current version.
+
+    :param doc: A serialized Task object.
+
+    :return: The fields of the document in the current schema version.
+    """
+    return deserialize(doc).insertDict()
@@ -0,0 +1,267 @@
+"""
+This file defines the storage interface the GUI reads and writes Kanban items through.
+
+Engines are interchangeable: `db.Wrapper` stores items in MongoDB, `localStore.LocalStore` in a local SQLite replica
+and `memoryStore.MemoryStore` in memory, e.g. for tests and benchmarks.
+
+- `Repository`: An abstract class declaring the read and write operations every storage engine offers.
+"""
+
+import abc
+import contextlib
+import datetime
+import threading
+
+from . import enums, history, metrics, search
+from .cache import ItemCache
+from .persistence import card, item, node
+
+_textIndexLock = threading.Lock()
+"""
+Guards the creation of `Repository.textIndex`, so overlapping first searches build one index.
+"""
+
+
+class Repository(abc.ABC):
+    """
+    This class declares the operations every storage engine offers.
+
+    Engines keep an `ItemCache` of items read by key in their `cache` attribute,
+    which is invalidated by their own writes and by the board for changes made elsewhere.
+    Engines without a search of their own build a `search.TextIndex` in their `textIndex` attribute on the first search.
+    """
+
+    cache: ItemCache
+    textIndex: search.TextIndex = None
+
+    @abc.abstractmethod
+    def readAll(self) -> list[item]:
+        """
+        :return: All items.
+        """
+
+    @abc.abstractmethod
+    def readStatus(self, type: enums.Taskstatus) -> list[item]:
+        """
+        :param type: The task status.
+
+        :return: All items with the given status.
+        """
+
+    @abc.abstractmethod
+    def readItem(self, key: str) -> item | None:
+        """
+        :param key: The key of the item.
+
+        :return: The item, or None if the key does not exist. Engines that cache items return a copy,
+                 so editing the item changes nothing until it is passed to `updateItem`.
+        """
+
+    @abc.abstractmethod
+    def readCards(self, type: enums.Taskstatus = None) -> list[card]:
+        """
+        :param type: The task status, or None to read all cards.
+
+        :return: The cards of all items, optionally limited to the given status.
+        """
+
+    @abc.abstractmethod
+    def readBoard(self) -> dict[enums.Taskstatus, list[card]]:
+        """
+        :return: A mapping of every task status to its cards.
+        """
+
+    @abc.abstractmethod
+    def readPage(self, after: str = None, limit: int = 50, prefix: str = "") -> list[card]:
+        """
+        Reads one page of cards ordered by key, continuing after the given key.
+
+        :param after: The last key of the previous page, or None for the first page.
+        :param limit: The maximum number of cards on the page.
+        :param prefix: Only read keys starting with this text; empty to read all keys.
+
+        :return: A list of cards, shorter than limit on the last page.
+        """
+
+    @abc.abstractmethod
+    def readKeys(self) -> set[str]:
+        """
+        :return: A set of all keys.
+        """
+
+    @abc.abstractmethod
+    def keyExists(self, key: str) -> bool:
+        """
+        :param key: The key to check.
+
+        :return: True if the key exists, False otherwise.
+        """
+
+    def readMetrics(self) -> dict[str, dict]:
+        """
+        Computes the number of items and their estimated and spent time by status, type and parent.
+        Engines that can group on the storage side override this; the default reads all items.
+
+        :return: The metrics, see `metrics.summarize`.
+        """
+        return metrics.summarize(self.readAll())
+
+    def readNodes(self, keys: set[str] = None) -> list[node]:
+        """
+        Reads the tree view of items, as needed by `hierarchy.Hierarchy`.
+        Engines that can project on the storage side override this; the default reads full items.
+
+        :param keys: The keys to read, or None to read all items. Missing keys are skipped.
+
+        :return: The nodes of the items.
+        """
+        if keys is None:
+            return [current.asNode() for current in self.readAll()]
+        found = (self.readItem(key) for key in keys)
+        return [current.asNode() for current in found if current is not None]
+
+    def readTexts(self, keys: set[str] = None) -> list[tuple[card, str]]:
+        """
+        Reads the searchable text of items, as needed by `search.TextIndex`.
+        Engines that can project on the storage side override this; the default reads full items.
+
+        :param keys: The keys to read, or None to read all items. Missing keys are skipped.
+
+        :return: The card and the description of every item.
+        """
+        if keys is None:
+            found = self.readAll()
+        else:
+            found = [current for current in map(self.readItem, keys) if current is not None]
+        return [(current.asCard(), current.description) for current in found]
+
+    def search(self, text: str, limit: int = 50) -> list[card]:
+        """
+        Finds the items whose key and description contain every word of the text, the last word as a prefix.
+        The default searches a `search.TextIndex` built on first use and kept in sync with the writes of the engine.
+
+        :param text: The search text.
+        :param limit: The maximum number of results.
+
+        :return: The cards of the best matching items, best first.
+        """
+        if self.textIndex is None:
+            with _textIndexLock:
+                if self.textIndex is None:
+                    self.textIndex = search.TextIndex(self)
+        return self.textIndex.search(text, limit)
+
+    def insertItem(self, current: item) -> bool:
+        """
+        Inserts the given item if its key does not exist.
+
+        :param current: The item to insert.
+        :return: True if the item was inserted, False otherwise.
+        """
+        return self.insertItems([current])[current.key]
+
+    @abc.abstractmethod
+    def insertItems(self, items: list[item]) -> dict[str, bool]:
+        """
+        Inserts many items at once; items whose key already exists are skipped.
+
+        :param items: The items to insert.
+        :return: A mapping of every key to True if its item was inserted, False otherwise.
+        """
+
+    @abc.abstractmethod
+    def updateItem(self, current: item) -> bool | None:
+        """
+        Updates the given item if its key exists, writing only the attributes changed since it was read
+        (`item.changedDict`) and nothing at all if none changed. If the item knows the revision it was read at,
+        the update only applies while the stored document still has that revision (compare-and-set).
+
+        :param current: The item to update.
+        :return: True if the item was updated or nothing changed, False if the key does not exist,
+                 None if someone else wrote the item since it was read.
+        """
+
+    @abc.abstractmethod
+    def updateStatus(self, keys: list[str], status: enums.Taskstatus) -> dict[str, bool]:
+        """
+        Moves many items to the given status at once.
+
+        :param keys: The keys of the items to move.
+        :param status: The new task status.
+        :return: A mapping of every key to True if its item was moved, False if it does not exist.
+        """
+
+    @abc.abstractmethod
+    def deleteItems(self, keys: list[str]) -> dict[str, bool]:
+        """
+        Deletes many items at once.
+
+        :param keys: The keys of the items to delete.
+        :return: A mapping of every key to True if its item was deleted, False if it does not exist.
+        """
+
+    @abc.abstractmethod
+    def appendHistory(self, events: list[dict]) -> None:
+        """
+        Appends events to the history log; events whose id is already stored are skipped.
+
+        :param events: The events, see `history`.
+        """
+
+    @abc.abstractmethod
+    def readEvents(self, key: str) -> list[dict]:
+        """
+        :param key: The key of the item.
+
+        :return: The logged events of the item, with UTC dates, in any order.
+        """
+
+    @abc.abstractmethod
+    def compactHistory(self, before: datetime.datetime) -> int:
+        """
+        Folds the logged events older than the given time into one snapshot per item, see `history.compact`.
+
+        :param before: Events older than this time are folded.
+
+        :return: The number of folded events.
+        """
+
+    def readHistory(self, key: str) -> list[dict]:
+        """
+        :param key: The key of the item.
+
+        :return: The logged events of the item and the entries of its embedded history, in replay order.
+        """
+        current = self.readItem(key)
+        legacy = [] if current is None else history.fromLegacy(key, current.history)
+        return history.ordered(legacy + self.readEvents(key))
+
+    def replayItem(self, key: str, at: datetime.datetime = None) -> item | None:
+        """
+        Restores an item as it was at the given time from its history.
+        Attributes that were not recorded by then are None.
+
+        :param key: The key of the item.
+        :param at: The point in time, or None for the latest recorded state.
+
+        :return: The item, or None if it did not exist at that time.
+        """
+        state = history.replay(self.readHistory(key), at)
+        if state is None:
+            return None
+        return item(key, *(state.get(field) for field in history.TRACKED), [])
+
+    def transaction(self):
+        """
+        Groups the writes made in a `with` block, so either all of them are stored or, if the block raises, none.
+        Engines without transactions, such as MongoDB on a standalone server, store each write on its own.
+
+        :return: A context manager.
+        """
+        return contextlib.nullcontext()
+
+    @abc.abstractmethod
+    def close(self) -> None:
+        """
+        Releases the resources of the engine.
+        """
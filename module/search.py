@@ -0,0 +1,217 @@
+"""
+This file provides full-text search over the keys and descriptions of the items.
+
+MongoDB answers searches with its text index (`db.Wrapper.search`). The other engines answer them with a `TextIndex`,
+an inverted index held in memory: it is built from a single projected query (`Repository.readTexts`) and kept in sync
+through the invalidations of the engine's `ItemCache`, re-reading only the changed keys on the next search.
+
+Results are ranked with BM25; words of the key weigh more than words of the description. Every word of the query
+must match, the last one as a prefix, so results narrow down while typing.
+
+- `TextIndex`: A class holding the inverted index of one engine and answering ranked searches.
+- `countWords`: A function counting the words of an item.
+- `tokenize`: A function splitting a text into lowercase words.
+"""
+
+import bisect
+import collections
+import heapq
+import math
+import operator
+import re
+import threading
+
+from .persistence import card
+
+WORD = re.compile(r"\w+")
+"""
+Pattern of a single word.
+"""
+
+KEY_WEIGHT = 10
+"""
+How much more a word of the key counts than a word of the description, like the weights of the MongoDB text index.
+"""
+
+PREFIX_LIMIT = 50
+"""
+The maximum number of indexed words a prefix is expanded to.
+"""
+
+PREFIX_DISCOUNT = 2
+"""
+How much less a word counts when it only starts with the last word of the query.
+"""
+
+K1 = 1.2
+"""
+BM25 term frequency saturation: how quickly repeating a word stops raising the score.
+"""
+
+B = 0.75
+"""
+BM25 length normalisation: how much long descriptions are penalised.
+"""
+
+
+class TextIndex:
+    def __init__(self, repository) -> None:
+        """
+        Initializes an index over the given engine; it is built on the first search.
+
+        :param repository: The `repository.Repository` whose items are indexed.
+        """
+        self.repository = repository
+        self.lock = threading.RLock()
+        self.postings = {}
+        self.terms = {}
+        self.cards = {}
+        self.words = []
+        self.average = 1
+        self.stale = set()
+        self.reload = True
+        repository.cache.addInvalidationListener(self.invalidate)
+
+    def invalidate(self, key: str | None) -> None:
+        """
+        Marks a key as changed; it is re-read on the next search.
+
+        :param key: The changed key, or None if anything may have changed.
+        """
+        with self.lock:
+            if key is None:
+                self.reload = True
+            else:
+                self.stale.add(key)
+
+    def refresh(self) -> None:
+        """
+        Brings the index up to date: everything is read on the first call or after a full invalidation,
+        afterwards only the changed keys. The average length used for length normalisation is only
+        recomputed on full reads.
+        """
+        with self.lock:
+            if self.reload:
+                self.reload = False
+                self.stale.clear()
+                for table in (self.postings, self.terms, self.cards):
+                    table.clear()
+                texts = [
+                    (current, countWords(current.key, description))
+                    for current, description in self.repository.readTexts()
+                ]
+                total = sum(sum(counts.values()) for _, counts in texts)
+                self.average = max(1, total / len(texts)) if texts else 1
+                for current, counts in texts:
+                    self.add(current, counts, sort=False)
+                self.words = sorted(self.postings)
+            elif self.stale:
+                keys, self.stale = self.stale, set()
+                for current, description in self.repository.readTexts(keys):
+                    keys.discard(current.key)
+                    self.remove(current.key)
+                    self.add(current, countWords(current.key, description))
+                for key in keys:
+                    self.remove(key)
+
+    def add(self, current: card, counts: dict[str, int], sort: bool = True) -> None:
+        # the BM25 term weight of every word is stored scaled to 0..255, small ints take no memory of their own
+        norm = K1 * (1 - B + B * sum(counts.values()) / self.average)
+        self.cards[current.key] = current
+        self.terms[current.key] = list(counts)
+        for word, count in counts.items():
+            if word not in self.postings:
+                self.postings[word] = {}
+                if sort:
+                    bisect.insort(self.words, word)
+            self.postings[word][current.key] = round(255 * count / (count + norm))
+
+    def remove(self, key: str) -> None:
+        words = self.terms.pop(key, None)
+        if words is None:
+            return
+        del self.cards[key]
+        for word in words:
+            documents = self.postings[word]
+            del documents[key]
+            if not documents:
+                del self.postings[word]
+                del self.words[bisect.bisect_left(self.words, word)]
+
+    def search(self, text: str, limit: int = 50) -> list[card]:
+        """
+        Finds the items containing every word of the text, the last word as a prefix.
+
+        :param text: The search text.
+        :param limit: The maximum number of results.
+
+        :return: The cards of the best matching items, best first.
+        """
+        words = tokenize(text)
+        if not words:
+            return []
+        with self.lock:
+            self.refresh()
+            matches = [self.postings.get(word, {}) for word in words[:-1]]
+            matches.append(self.expand(words[-1]))
+            if not all(matches):
+                return []
+            size = len(self.cards)
+            weights = [math.log(1 + (size - len(m) + 0.5) / (len(m) + 0.5)) for m in matches]
+            if len(matches) == 1:
+                best = heapq.nlargest(limit, matches[0].items(), key=operator.itemgetter(1))
+            else:
+                ranked = sorted(zip(weights, matches), key=lambda entry: len(entry[1]))
+                scores = {}
+                for key in ranked[0][1]:
+                    if all(key in m for _, m in ranked[1:]):
+                        scores[key] = sum(w * m[key] for w, m in ranked)
+                best = heapq.nlargest(limit, scores.items(), key=operator.itemgetter(1))
+            return [self.cards[key] for key, _ in best]
+
+    def expand(self, prefix: str) -> dict[str, int]:
+        """
+        :param prefix: The last word of the query.
+
+        :return: The term weights of the items containing a word starting with the prefix;
+                 words longer than the prefix count less than the word itself.
+        """
+        start = bisect.bisect_left(self.words, prefix)
+        merged = dict(self.postings.get(prefix, {}))
+        for word in self.words[start : start + PREFIX_LIMIT]:
+            if not word.startswith(prefix):
+                break
+            if word != prefix:
+                for key, weight in self.postings[word].items():
+                    weight //= PREFIX_DISCOUNT
+                    if merged.get(key, -1) < weight:
+                        merged[key] = weight
+        return merged
+
+    def close(self) -> None:
+        """
+        Stops following the writes of the engine.
+        """
+        self.repository.cache.removeInvalidationListener(self.invalidate)
+
+
+def countWords(key: str, description: str) -> dict[str, int]:
+    """
+    :param key: The key of an item.
+    :param description: The description of the item.
+
+    :return: The number of occurrences of every word, words of the key counting `KEY_WEIGHT` times.
+    """
+    counts = collections.Counter(tokenize(description))
+    for word in tokenize(key):
+        counts[word] += KEY_WEIGHT
+    return counts
+
+
+def tokenize(text) -> list[str]:
+    """
+    :param text: A key or description.
+
+    :return: The lowercase words of the text, in order.
+    """
+    return WORD.findall(f"{text}".lower())
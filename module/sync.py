@@ -0,0 +1,241 @@
+"""
+This file synchronises the local replica (`localStore.LocalStore`) with MongoDB in the background.
+
+- Pushing: local writes are sent to MongoDB on a background thread, inserts with revision 1, updates
+  and deletions as a compare-and-set on the revision the local change is based on. A failed compare-and-set means
+  someone else changed the item first; the remote version is then pulled and wins. History events are appended
+  to the log in MongoDB as they are, before the items, so they are there once other replicas see the change.
+- Pulling: a `watcher.ChangeWatcher` on MongoDB reports remote changes (via change streams or polling);
+  the full items are fetched and applied to the replica with their revision, together with their history events.
+  Whenever watching (re)starts, everything written since the last pull is reconciled.
+
+- `SyncEngine`: A class running the push and pull loops.
+"""
+
+import datetime
+import logging
+import threading
+
+from pymongo.errors import PyMongoError
+
+from . import db
+from .watcher import ChangeEvent, ChangeWatcher, backoff
+
+logger = logging.getLogger(__name__)
+
+
+class SyncEngine:
+    def __init__(
+        self,
+        local,
+        remote=db.Wrapper,
+        onEvent=None,
+        onConflict=None,
+        interval: float = 2.0,
+        onError=None,
+    ) -> None:
+        """
+        Initializes a SyncEngine; call `start` to begin synchronising.
+
+        :param local: The LocalStore to synchronise.
+        :param remote: A callable creating the MongoDB Wrapper, called lazily on a background thread.
+        :param onEvent: Called from a background thread with a watcher.ChangeEvent for every remote change applied locally.
+        :param onConflict: Called from a background thread with the key of every local change that lost against a remote one.
+        :param interval: The number of seconds between pushes and between connection attempts.
+        :param onError: Called from a background thread with the first unexpected exception of a series of failed
+            pushes or pulls; synchronising continues regardless.
+        """
+        self.local = local
+        self.remote = remote
+        self.onEvent = onEvent or (lambda event: None)
+        self.onConflict = onConflict or (lambda key: None)
+        self.onError = onError or (lambda error: None)
+        self.interval = interval
+        self.connection = None
+        self.connectLock = threading.Lock()
+        self.applyLock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.watcher = ChangeWatcher(
+            self.connect, self.pulled, self.reconcile, interval, self.onError
+        )
+        self.pusher = None
+        self.local.addWriteListener(self.wake.set)
+
+    def start(self) -> None:
+        """
+        Starts the push and pull loops on daemon threads.
+        """
+        self.pusher = threading.Thread(
+            target=self.run, name="KanbanGUI-sync", daemon=True
+        )
+        self.pusher.start()
+        self.watcher.start()
+
+    def stop(self) -> None:
+        """
+        Stops both loops and closes the MongoDB connection.
+        """
+        self.stopped.set()
+        self.wake.set()
+        self.watcher.stop()
+        if self.pusher is not None:
+            self.pusher.join(timeout=2)
+        with self.connectLock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+    def connect(self):
+        """
+        :return: The MongoDB Wrapper, created on first use.
+        """
+        with self.connectLock:
+            if self.connection is None:
+                self.connection = self.remote()
+            return self.connection
+
+    def run(self) -> None:
+        """
+        Pushes local changes whenever the replica is written to, and at least every interval.
+        Any other error than an unreachable database is logged, reported once and retried
+        with a growing delay; the changes stay dirty until a push succeeds.
+        """
+        failures = 0
+        while not self.stopped.is_set():
+            self.wake.wait(self.interval)
+            self.wake.clear()
+            try:
+                self.pushOnce(self.connect())
+                failures = 0
+            except PyMongoError:
+                pass  # unreachable; the changes stay dirty and are retried
+            except Exception as error:
+                failures += 1
+                logger.exception("Pushing local changes failed")
+                if failures == 1:
+                    self.onError(error)
+                self.stopped.wait(backoff(self.interval, failures))
+
+    def pushOnce(self, remote) -> None:
+        """
+        Pushes every logged history event, every dirty item and every local deletion of the replica.
+
+        :param remote: The MongoDB Wrapper.
+        """
+        # history events only ever get appended, so they cannot conflict
+        events = self.local.pendingHistory()
+        while events:
+            remote.appendHistory(events)
+            self.local.markHistoryPushed([current["id"] for current in events])
+            events = self.local.pendingHistory()
+
+        for current, revision, doc in self.local.dirtyItems():
+            with self.applyLock:
+                if revision == 0:
+                    newRevision = 1 if remote.insertItem(current) else None
+                else:
+                    newRevision = remote.updateRevision(current, revision)
+                if newRevision is not None:
+                    self.local.markClean(current.key, newRevision, doc)
+                    continue
+            # someone else wrote the item first, their version wins
+            self.pullKey(remote, current.key)
+
+        for key, revision in self.local.pendingDeletions():
+            with self.applyLock:
+                if remote.deleteRevision(key, revision) is not None:
+                    self.local.markDeleted(key)
+                    continue
+            self.pullKey(remote, key)
+
+    def pulled(self, event: ChangeEvent) -> None:
+        """
+        Applies a single remote change reported by the watcher.
+
+        :param event: The remote change; only its key and operation are used.
+        """
+        remote = self.connect()
+        if event.operation == "delete":
+            with self.applyLock:
+                changed = self.report(event.key, self.local.applyRemoteDelete(event.key))
+            if changed:
+                self.pullHistory(remote, [event.key])
+        else:
+            self.pullKey(remote, event.key)
+
+    def pullKey(self, remote, key: str) -> None:
+        """
+        Fetches a single item with its revision and applies it to the replica.
+
+        :param remote: The MongoDB Wrapper.
+        :param key: The key of the item.
+        """
+        result = remote.readRevision(key)
+        with self.applyLock:
+            if result is None:
+                changed = self.report(key, self.local.applyRemoteDelete(key))
+            else:
+                changed = self.report(key, self.local.applyRemote(*result))
+        if changed:
+            self.pullHistory(remote, [key])
+
+    def pullHistory(self, remote, keys: list[str]) -> None:
+        """
+        Fetches the history events of items changed remotely, so they can be replayed from the replica.
+
+        :param remote: The MongoDB Wrapper.
+        :param keys: The keys of the items.
+        """
+        if keys:
+            self.local.applyRemoteEvents(remote.readEventsOf(keys))
+
+    def reconcile(self, columns=None) -> None:
+        """
+        Applies everything written remotely since the last pull, including deletions.
+        Called by the watcher whenever watching (re)starts.
+
+        :param columns: The remote board reported by the watcher; unused, full items are fetched instead.
+        """
+        remote = self.connect()
+        now = db.timestamp()
+        last = self.local.getMeta("lastPull")
+        since = None if last is None else datetime.datetime.fromisoformat(last)
+        # tolerate writes that were in flight during the previous pull
+        if since is not None:
+            since -= datetime.timedelta(seconds=self.interval)
+
+        changed = remote.readChangedItems(since)
+        keys = remote.readKeys()
+        pulled = []
+        with self.applyLock:
+            for current, revision in changed:
+                if self.report(current.key, self.local.applyRemote(current, revision)):
+                    pulled.append(current.key)
+            for key in self.local.syncedKeys() - keys:
+                if self.report(key, self.local.applyRemoteDelete(key)):
+                    pulled.append(key)
+        self.pullHistory(remote, pulled)
+        self.local.setMeta("lastPull", now.isoformat())
+        self.wake.set()
+
+    def report(self, key: str, outcome: str | None) -> bool:
+        """
+        Forwards a change of the replica to the listeners.
+
+        :param key: The key of the changed item.
+        :param outcome: The result of LocalStore.applyRemote or applyRemoteDelete.
+
+        :return: True if the replica changed.
+        """
+        if outcome is None:
+            return False
+        if outcome == "conflict":
+            self.onConflict(key)
+        latest = self.local.readItem(key)
+        if latest is None:
+            self.onEvent(ChangeEvent("delete", key))
+        else:
+            operation = "insert" if outcome == "insert" else "update"
+            self.onEvent(ChangeEvent(operation, key, latest.asCard()))
+        return True
@@ -0,0 +1,206 @@
+"""
+This file provides live board updates by watching the database for changes.
+
+The watcher subscribes to a MongoDB change stream on the collection. Standalone servers do not support
+change streams, in which case it falls back to polling for documents with a newer `updatedAt` timestamp
+and comparing the set of keys to detect deletions.
+
+- `ChangeEvent`: A class describing a single inserted, updated or deleted card.
+- `ChangeWatcher`: A class that watches a data source on a background thread and reports changes.
+- `backoff`: Returns the delay before retrying after repeated unexpected errors.
+"""
+
+import datetime
+import logging
+import threading
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from . import db
+from .persistence import card, deserializeCard
+
+CHANGE_STREAMS_UNSUPPORTED = 40573
+"""
+Server error code raised when opening a change stream on a standalone server.
+"""
+
+MAX_BACKOFF = 60.0
+"""
+The longest wait in seconds before retrying after repeated unexpected errors.
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def backoff(interval: float, failures: int) -> float:
+    """
+    :param interval: The regular retry interval in seconds.
+    :param failures: The number of unexpected errors in a row.
+
+    :return: The seconds to wait before retrying, doubled per failure up to MAX_BACKOFF.
+    """
+    return min(interval * 2 ** (failures - 1), MAX_BACKOFF)
+
+
+class ChangeEvent:
+    """
+    This class describes a change of a single card.
+    """
+
+    def __init__(self, operation: str, key: str, current: card = None) -> None:
+        """
+        Initializes a new ChangeEvent.
+
+        :param operation: One of "insert", "update" or "delete".
+        :param key: The key of the changed item.
+        :param current: The new card, None for deletions.
+        """
+        self.operation = operation
+        self.key = key
+        self.card = current
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ChangeEvent):
+            return False
+        return (
+            self.operation == other.operation
+            and self.key == other.key
+            and self.card == other.card
+        )
+
+    def __repr__(self) -> str:
+        return f"ChangeEvent({self.operation!r}, {self.key!r})"
+
+
+class ChangeWatcher:
+    def __init__(self, source, onEvent, onReload, interval: float = 1.0, onError=None) -> None:
+        """
+        Initializes a ChangeWatcher; call `start` to begin watching.
+
+        :param source: A callable returning the data source (e.g. `db.getWrapper`), called on the watcher thread.
+        :param onEvent: Called from the watcher thread with every ChangeEvent.
+        :param onReload: Called from the watcher thread with the full board whenever watching (re)starts.
+        :param interval: The polling interval in seconds when change streams are not available.
+        :param onError: Called from the watcher thread with the first unexpected exception of a series of failures.
+        """
+        self.source = source
+        self.onEvent = onEvent
+        self.onReload = onReload
+        self.onError = onError or (lambda error: None)
+        self.interval = interval
+        self.keys = set()
+        self.ids = {}
+        self.since = None
+        self.polling = False
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self) -> None:
+        """
+        Starts watching on a daemon thread.
+        """
+        self.thread = threading.Thread(
+            target=self.run, name="KanbanGUI-watcher", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops watching and waits briefly for the watcher thread to finish.
+        """
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout=2)
+
+    def run(self) -> None:
+        """
+        Watches the change stream, or polls if change streams are not supported, until stopped.
+        Connection errors are retried after the polling interval; any other error is logged,
+        reported once and retried with a growing delay, so watching never ends before `stop`.
+        """
+        failures = 0
+        while not self.stopped.is_set():
+            try:
+                source = self.source()
+                if self.polling:
+                    self.pollOnce(source)
+                    failures = 0
+                    self.stopped.wait(self.interval)
+                else:
+                    self.stream(source)
+            except OperationFailure as error:
+                if error.code == CHANGE_STREAMS_UNSUPPORTED:
+                    self.polling = True
+                else:
+                    self.stopped.wait(self.interval)
+            except PyMongoError:
+                self.stopped.wait(self.interval)
+            except Exception as error:
+                failures += 1
+                logger.exception("Watching the database failed")
+                if failures == 1:
+                    self.onError(error)
+                self.stopped.wait(backoff(self.interval, failures))
+
+    def stream(self, source) -> None:
+        """
+        Opens a change stream, reloads the board and reports every change until stopped.
+        The stream is opened before the board is read, so no change can fall in between.
+
+        :param source: The data source.
+        """
+        with source.watchChanges() as changes:
+            self.ids = source.readKeyIds()
+            self.onReload(source.readBoard())
+            while not self.stopped.is_set() and changes.alive:
+                change = changes.try_next()
+                if change is not None:
+                    self.handleChange(change)
+
+    def handleChange(self, change: dict) -> None:
+        """
+        Translates a change stream document into a ChangeEvent and reports it.
+
+        :param change: The change stream document.
+        """
+        operation = change["operationType"]
+        documentId = change["documentKey"]["_id"]
+        if operation == "delete":
+            key = self.ids.pop(documentId, None)
+            if key is not None:
+                self.onEvent(ChangeEvent("delete", key))
+            return
+
+        document = change.get("fullDocument")
+        if document is None:
+            return  # deleted before the update could be looked up
+        current = deserializeCard(document)
+        known = documentId in self.ids
+        self.ids[documentId] = current.key
+        self.onEvent(ChangeEvent("update" if known else "insert", current.key, current))
+
+    def pollOnce(self, source) -> None:
+        """
+        Reports changes since the previous poll; the first poll reloads the whole board.
+
+        :param source: The data source.
+        """
+        now = db.timestamp()
+        if self.since is None:
+            self.keys = source.readKeys()
+            self.onReload(source.readBoard())
+            self.since = now
+            return
+
+        changed = source.readChangedSince(self.since)
+        keys = source.readKeys()
+        # tolerate writes that were in flight during the previous poll
+        self.since = now - datetime.timedelta(seconds=self.interval)
+
+        for current in changed:
+            operation = "update" if current.key in self.keys else "insert"
+            self.keys.add(current.key)
+            self.onEvent(ChangeEvent(operation, current.key, current))
+        for key in self.keys - keys:
+            self.onEvent(ChangeEvent("delete", key))
+        self.keys = keys
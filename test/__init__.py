@@ -2,20 +2,48 @@
 This package contains functionality for testing this projects functional scripts.
 
 Modules:
+- test.benchmark: Contains the benchmark suite measuring deserialization, storage engines and board rendering
+        on synthetic boards, with JSON results for comparison across commits.
+- test.boardGUI: Contains the 'Board'-class, which keeps the cards drawn on the board in sync with the database
+        by only updating the cards that changed.
 - test.boardUtil: Contains utility functions for creating UI elements with predefined functionality
+- test.cache: Contains the 'ItemCache'-class, a bounded least-recently-used cache of items
+        with a time-to-live per entry and hit/miss counters.
 - test.db: Contains the 'Wrapper'-class, which provides functionality to control data interchange
         between this application and a database
         also contains functions to deserialize multiple items (defined in module.persistence)
         and read credentials from the resources/credentials.txt file.
+- test.dispatcher: Contains the 'Dispatcher'-class, which runs database calls on background threads
+        and delivers their results on the Tk thread.
+- test.hierarchy: Contains the 'Hierarchy'-class, an incrementally maintained index of the epic/task/subtask
+        tree with roll-up totals and cycle and dangling-parent detection.
+- test.history: Contains the change history as an append-only log of events per field, with compaction
+        into snapshots and replay of an item at any point in time.
 - test.itemGUI: Contains functions for creating UI elements to interact with information stored in the database
 - test.itemUtil: Contains utility functions for creating UI elements with consistent styling
         within a ttkbootstrap grid layout.
+- test.localStore: Contains the 'LocalStore'-class, a local SQLite replica of the collection
+        the board is read from and written to.
+- test.memoryStore: Contains the 'MemoryStore'-class, an in-memory storage engine with indexed lookups
+        by key and status for tests and benchmarks.
+- test.metrics: Contains the board metrics: item counts and estimated and spent time by status, type and parent,
+        computed server-side by an aggregation pipeline or in Python.
 - test.persistence: Provides classes and functions for persisting Kanban tasks
         to and from a MongoDB database.
+- test.repository: Contains the 'Repository'-class, the storage interface implemented by the MongoDB,
+        SQLite and in-memory engines.
+- test.search: Contains the 'TextIndex'-class, a ranked inverted index over keys and descriptions kept in sync
+        with the cache, used where the MongoDB text index is not available.
+- test.sync: Contains the 'SyncEngine'-class, which pushes local changes to MongoDB
+        and applies remote changes to the local replica in the background.
+- test.watcher: Contains the 'ChangeWatcher'-class, which reports changes made by other users
+        through change streams, or by polling on standalone servers.
 
 no tests for:
 - module.__main__: Contains 'startup', combining tkinter and ttkbootstrap widgets with this projects functionality.
         All operations are imported from other packages.
+- module.editor: Contains the reusable item dialogs, which need a display; their widgets are filled
+        with itemUtil.setValue, which is tested.
 - module.enums: Script defines two enums, no testable functionality present.
 
 This package leverages the following external libraries:
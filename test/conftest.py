@@ -0,0 +1,10 @@
+from module.persistence import item
+
+
+def make_item(
+    key="A", status="Open", description="", type="Task", estimate="1", spent="0", parent="None"
+):
+    """
+    Builds a version 1 item for tests; only the attributes a test cares about need to be given.
+    """
+    return item(key, type, "2024-01-01-12-00", estimate, spent, status, description, parent, [])
@@ -0,0 +1,37 @@
+import pytest
+
+from module import benchmark, enums
+
+
+def test_generateItems_reproducible_and_varied():
+    items = benchmark.generateItems(200, descriptionSize=50, historySize=2)
+    assert items == benchmark.generateItems(200, descriptionSize=50, historySize=2)
+    assert len({i.key for i in items}) == 200
+    assert {i.status for i in items} == set(enums.Taskstatus)
+    assert max(len(i.description) for i in items) <= 100
+    assert len({word for i in items for word in i.description.split()}) > 10
+    assert len({len(i.history) for i in items}) > 1
+    keys = {i.key for i in items}
+    assert all(i.parent in keys for i in items if i.parent is not None)
+
+
+def test_measure():
+    result = benchmark.measure(lambda: None, repeat=3)
+    assert result["repeat"] == 3
+    assert result["min"] <= result["median"] <= max(result["mean"] * 3, result["median"])
+
+
+@pytest.mark.parametrize("engine", sorted(benchmark.ENGINES))
+def test_runBenchmarks(engine):
+    results = benchmark.runBenchmarks([20], engine, repeat=1, render=False)
+    names = [r["name"] for r in results]
+    assert "persistence.deserialize" in names
+    assert f"{engine}.readStatus" in names
+    assert f"{engine}.search" in names
+    assert all(r["size"] == 20 and r["median"] >= 0 for r in results)
+
+
+def test_compare():
+    baseline = [{"name": "a", "size": 1, "median": 2.0}, {"name": "b", "size": 1, "skipped": "no display"}]
+    current = [{"name": "a", "size": 1, "median": 3.0}, {"name": "c", "size": 1, "median": 1.0}]
+    assert benchmark.compare(baseline, current) == [{"name": "a", "size": 1, "ratio": 1.5}]
@@ -0,0 +1,167 @@
+from unittest.mock import Mock, patch
+
+import pytest
+
+from module import boardGUI, enums
+from module.persistence import card
+from module.watcher import ChangeEvent
+
+
+@pytest.mark.parametrize(
+    "top, height, total, expected",
+    [
+        (0, 640, 1000, (0, 13)),
+        (6400, 640, 1000, (97, 113)),
+        (63360, 640, 1000, (987, 1000)),
+        (0, 640, 4, (0, 4)),
+        (0, 0, 0, (0, 0)),
+    ],
+)
+def test_visibleRange(top, height, total, expected):
+    assert boardGUI.visibleRange(top, height, 64, total, 3) == expected
+
+
+def test_visibleRange_constant_for_any_column_size():
+    small = boardGUI.visibleRange(640, 640, 64, 100, 3)
+    large = boardGUI.visibleRange(640, 640, 64, 100000, 3)
+    assert small == large
+
+
+def test_diffSlots_unchanged():
+    drawn = {0: ("A", "info"), 1: ("B", "info")}
+    assert boardGUI.diffSlots(drawn, dict(drawn)) == ([], [], [])
+
+
+def test_diffSlots_scroll_and_change():
+    current = {0: ("A", "info"), 1: ("B", "info"), 2: ("C", "light")}
+    target = {1: ("B", "success"), 2: ("C", "light"), 3: ("D", "info")}
+    entering, changed, leaving = boardGUI.diffSlots(current, target)
+    assert entering == [3]
+    assert changed == [1]
+    assert leaving == [0]
+
+
+def test_applyEvent_update_in_place_and_move():
+    columns = {
+        enums.Taskstatus.open: [card("A", "Task", "Open"), card("B", "Task", "Open")],
+    }
+    restyled = boardGUI.applyEvent(columns, ChangeEvent("update", "A", card("A", "Epic", "Open")))
+    assert [c.key for c in restyled[enums.Taskstatus.open]] == ["A", "B"]
+    assert restyled[enums.Taskstatus.open][0].type == enums.Tasktype.epic
+
+    moved = boardGUI.applyEvent(columns, ChangeEvent("update", "A", card("A", "Task", "Active")))
+    assert [c.key for c in moved[enums.Taskstatus.open]] == ["B"]
+    assert [c.key for c in moved[enums.Taskstatus.active]] == ["A"]
+
+
+def test_applyEvent_insert_and_delete():
+    columns = {enums.Taskstatus.open: [card("A", "Task", "Open")]}
+    inserted = boardGUI.applyEvent(columns, ChangeEvent("insert", "B", card("B", "Task", "Open")))
+    assert [c.key for c in inserted[enums.Taskstatus.open]] == ["A", "B"]
+    deleted = boardGUI.applyEvent(inserted, ChangeEvent("delete", "A"))
+    assert [c.key for c in deleted[enums.Taskstatus.open]] == ["B"]
+
+
+def test_describe_marks_selected_cards():
+    current = card("A", "Task", "Open")
+    text, style = boardGUI.describe(current)
+    assert text == "A"
+    assert boardGUI.describe(current, selected=True) == ("✔ A", style)
+
+
+def test_pruneSelection():
+    columns = {enums.Taskstatus.open: [card("A", "Task", "Open")], enums.Taskstatus.active: []}
+    assert boardGUI.pruneSelection({"A", "B"}, columns) == {"A"}
+    assert boardGUI.pruneSelection(set(), columns) == set()
+
+
+def test_placeCards_and_restore():
+    columns = {
+        enums.Taskstatus.open: [card("A", "Task", "Open"), card("B", "Task", "Open")],
+        enums.Taskstatus.active: [card("C", "Task", "Active")],
+    }
+    placed, previous = boardGUI.placeCards(
+        columns, [card("A", "Task", "Active"), card("B", "Epic", "Open"), card("X", "Task", "Open")]
+    )
+    assert [c.key for c in placed[enums.Taskstatus.open]] == ["B"]
+    assert placed[enums.Taskstatus.open][0].type == enums.Tasktype.epic
+    assert [c.key for c in placed[enums.Taskstatus.active]] == ["C", "A"]
+    assert set(previous) == {"A", "B"}
+
+    restored = boardGUI.restoreCards(placed, previous)
+    assert {status: [(c.key, c.type) for c in cards] for status, cards in restored.items() if cards} == {
+        status: [(c.key, c.type) for c in cards] for status, cards in columns.items()
+    }
+
+
+def test_addCards_and_restore():
+    columns = {enums.Taskstatus.open: [card("A", "Task", "Open")]}
+    added, previous = boardGUI.addCards(
+        columns, [card("A", "Epic", "Open"), card("B", "Task", "Open")]
+    )
+    assert [(c.key, c.type) for c in added[enums.Taskstatus.open]] == [
+        ("A", enums.Tasktype.task),
+        ("B", enums.Tasktype.task),
+    ]
+    assert set(previous) == {"B"}
+
+    restored = boardGUI.restoreCards(added, previous)
+    assert [c.key for c in restored[enums.Taskstatus.open]] == ["A"]
+
+
+def test_restoreCards_keeps_newer_changes():
+    columns = {enums.Taskstatus.open: [card("A", "Task", "Open")]}
+    placed, previous = boardGUI.placeCards(columns, [card("A", "Task", "Active")])
+    newer = boardGUI.applyEvent(placed, ChangeEvent("update", "A", card("A", "Task", "Complete")))
+    restored = boardGUI.restoreCards(newer, previous)
+    assert [c.key for c in restored[enums.Taskstatus.complete]] == ["A"]
+    assert restored[enums.Taskstatus.open] == []
+
+
+def test_MoveQueue_coalesces_moves():
+    columns = {
+        enums.Taskstatus.open: [card("A", "Task", "Open"), card("B", "Task", "Open")],
+        enums.Taskstatus.active: [card("C", "Task", "Active")],
+    }
+    moves = boardGUI.MoveQueue()
+    columns, previous = boardGUI.placeCards(columns, [card("A", "Task", "Active"), card("B", "Task", "Active")])
+    moves.add(previous, enums.Taskstatus.active)
+    columns, previous = boardGUI.placeCards(columns, [card("A", "Task", "Complete")])
+    moves.add(previous, enums.Taskstatus.complete)
+    columns, previous = boardGUI.placeCards(columns, [card("C", "Task", "Open")])
+    moves.add(previous, enums.Taskstatus.open)
+    columns, previous = boardGUI.placeCards(columns, [card("C", "Task", "Active")])
+    moves.add(previous, enums.Taskstatus.active)
+    assert len(moves) == 2
+
+    groups, previous = moves.take()
+    assert groups == {enums.Taskstatus.complete: ["A"], enums.Taskstatus.active: ["B"]}
+    assert len(moves) == 0
+    restored = boardGUI.restoreCards(columns, previous)
+    assert [c.key for c in restored[enums.Taskstatus.open]] == ["A", "B"]
+    assert [c.key for c in restored[enums.Taskstatus.active]] == ["C"]
+
+
+@pytest.mark.parametrize("x, expected", [(0, enums.Taskstatus.draft), (150, enums.Taskstatus.open), (99, None)])
+def test_columnAt(x, expected):
+    bounds = {enums.Taskstatus.draft: (0, 99), enums.Taskstatus.open: (100, 199)}
+    assert boardGUI.columnAt(bounds, x) == expected
+
+
+def test_close_stops_sync_when_the_last_moves_fail():
+    board = boardGUI.Board.__new__(boardGUI.Board)
+    board.flushing = None
+    board.moves = boardGUI.MoveQueue()
+    _, previous = boardGUI.placeCards(
+        {enums.Taskstatus.open: [card("A", "Task", "Open")]}, [card("A", "Task", "Active")]
+    )
+    board.moves.add(previous, enums.Taskstatus.active)
+    board.engine = engine = Mock()
+    with patch("module.db.getWrapper"), patch(
+        "module.history.updateStatus", side_effect=OSError("disk full")
+    ) as updateStatus:
+        board.close()
+    updateStatus.assert_called_once()
+    engine.stop.assert_called_once_with()
+    assert board.engine is None
+    assert len(board.moves) == 0
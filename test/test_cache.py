@@ -0,0 +1,81 @@
+import pytest
+
+from module.cache import ItemCache
+
+from .conftest import make_item
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_get_hit_and_miss(clock):
+    cache = ItemCache(maxsize=2, ttl=10, clock=clock)
+    assert cache.get("A") is None
+    cache.put(make_item("A"))
+    assert cache.get("A").key == "A"
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "expirations": 0, "size": 1}
+
+
+def test_lru_eviction(clock):
+    cache = ItemCache(maxsize=2, ttl=10, clock=clock)
+    cache.put(make_item("A"))
+    cache.put(make_item("B"))
+    cache.get("A")
+    cache.put(make_item("C"))
+    assert cache.get("B") is None
+    assert cache.get("A") is not None
+    assert cache.get("C") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry(clock):
+    cache = ItemCache(maxsize=2, ttl=10, clock=clock)
+    cache.put(make_item("A"))
+    clock.now = 9.9
+    assert cache.get("A") is not None
+    clock.now = 10.0
+    assert cache.get("A") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["size"] == 0
+
+
+def test_invalidate_and_clear(clock):
+    cache = ItemCache(clock=clock)
+    cache.put(make_item("A"))
+    cache.put(make_item("B"))
+    cache.invalidate("A")
+    cache.invalidate("missing")
+    assert cache.get("A") is None
+    cache.clear()
+    assert cache.get("B") is None
+
+
+def test_invalidation_listeners(clock):
+    cache = ItemCache(clock=clock)
+    seen = []
+    cache.addInvalidationListener(seen.append)
+    cache.invalidate("A")
+    cache.clear()
+    cache.removeInvalidationListener(seen.append)
+    cache.invalidate("B")
+    assert seen == ["A", None]
+
+
+def test_put_skips_items_read_before_an_invalidation(clock):
+    cache = ItemCache(clock=clock)
+    generation = cache.generation
+    cache.invalidate("A")
+    cache.put(make_item("A"), generation)
+    assert cache.get("A") is None
+    cache.put(make_item("A"), cache.generation)
+    assert cache.get("A") is not None
@@ -1,124 +1,444 @@
-"""
-TODO figure out db mocking...
+import datetime
+from unittest.mock import Mock, patch
 
-# Import necessary libraries
-from unittest.mock import patch, Mock, call
 import pytest
-#from pymongo.errors import ConnectionError
-from pymongo import MongoClient
 
-from module import enums
-# Import functions and classes from your original file
-from module.db import Wrapper, deserializeMultiple  # Replace with actual filename
-from module.persistence import item
+from pymongo import DeleteOne, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+
+from module import db, enums, metrics, persistence
+from module.db import deserializeMultiple
+from module.persistence import card
+
+
+@pytest.fixture
+def reset_shared():
+    db.setWrapper(None)
+    yield
+    db.setWrapper(None)
+
+
+def test_getWrapper_creates_once(reset_shared):
+    with patch("module.db.Wrapper") as mock_wrapper:
+        first = db.getWrapper()
+        second = db.getWrapper()
+    assert first is second
+    mock_wrapper.assert_called_once_with()
+
+
+def test_setWrapper_injects_instance(reset_shared):
+    fake = Mock()
+    db.setWrapper(fake)
+    assert db.getWrapper() is fake
+
+
+def test_closeWrapper_closes_and_resets(reset_shared):
+    fake = Mock()
+    db.setWrapper(fake)
+    db.closeWrapper()
+    fake.close.assert_called_once_with()
+    with patch("module.db.Wrapper") as mock_wrapper:
+        assert db.getWrapper() is mock_wrapper.return_value
+
+
+def test_closeWrapper_without_instance(reset_shared):
+    db.closeWrapper()
 
 
-# Define a fixture to mock pymongo.MongoClient
 @pytest.fixture
-def mock_client():
-    return Mock(MongoClient)
+def wrapper():
+    with patch("module.db.MongoClient"):
+        yield db.Wrapper("mongodb://localhost:27017", "kanban", "test")
+
+
+def document(key, status, type="Task"):
+    return {
+        "key": key,
+        "type": type,
+        "creation": "2024-01-01-12-00",
+        "estimate": "1",
+        "time_spent": "0",
+        "status": status,
+        "description": "",
+        "parent": "None",
+        "history": [],
+    }
+
+
+def test_readBoard_single_query(wrapper):
+    wrapper.connection.find.return_value = [
+        document("A", "Draft"),
+        document("B", "Active"),
+        document("C", "Draft"),
+    ]
+    board = wrapper.readBoard()
+    wrapper.connection.find.assert_called_once()
+    assert [i.key for i in board[enums.Taskstatus.draft]] == ["A", "C"]
+    assert [i.key for i in board[enums.Taskstatus.active]] == ["B"]
+    assert board[enums.Taskstatus.discarded] == []
+
+
+def test_bucketByStatus_skips_unknown_status():
+    items = deserializeMultiple([document("A", "Open"), document("B", "Progress")])
+    buckets = db.bucketByStatus(items)
+    assert set(buckets) == set(enums.Taskstatus)
+    assert [i.key for i in buckets[enums.Taskstatus.open]] == ["A"]
+    assert sum(len(v) for v in buckets.values()) == 1
+
+
+def test_readCards_uses_projection(wrapper):
+    wrapper.connection.find.return_value = [{"key": "A", "type": "Epic", "status": "Open"}]
+    cards = wrapper.readCards(enums.Taskstatus.open)
+    wrapper.connection.find.assert_called_once_with({"status": "Open"}, db.CARD_PROJECTION)
+    assert cards == [card("A", "Epic", "Open")]
+
+
+def test_readItem(wrapper):
+    wrapper.connection.find_one.return_value = document("A", "Open")
+    assert wrapper.readItem("A").key == "A"
+    wrapper.connection.find_one.assert_called_once_with({"key": "A"})
+
+
+def test_readItem_missing(wrapper):
+    wrapper.connection.find_one.return_value = None
+    assert wrapper.readItem("A") is None
 
 
-# Define a fixture to mock the connection object
 @pytest.fixture
-def mock_connection(mock_client):
-    mock_client.return_value.get_database.return_value.get_collection.return_value = Mock()
-    return mock_client.return_value.get_database.return_value.get_collection.return_value
-
-
-def test_wrapper_init(mock_client):
-    # Test successful initialization
-    wrapper = Wrapper()
-    assert wrapper.uri == "mongodb://localhost:27017"
-    assert wrapper.dbContext == "kanban"
-    assert wrapper.collection == "showcase"
-    mock_client.assert_called_once_with(
-        "mongodb://localhost:27017",
-        connect=True,
-        maxPoolSize=5,
-        minPoolSize=0,
-        appname="KanbanGUI.py",
-        connectTimeoutMS=5000
+def fresh():
+    with patch("module.db.MongoClient") as mock_client:
+        database = mock_client.return_value.__getitem__.return_value
+        database.get_collection.return_value.find_one.return_value = None
+        yield db.Wrapper("mongodb://localhost:27017", "kanban", "test")
+
+
+def test_ensureIndexes_on_init(fresh):
+    wrapper = fresh
+    names = [c.kwargs["name"] for c in wrapper.connection.create_index.call_args_list]
+    assert names == ["key_unique", "status", "parent", "updatedAt", "text"]
+    assert wrapper.connection.create_index.call_args_list[0].kwargs["unique"]
+
+
+@pytest.mark.parametrize(
+    "plan, expected",
+    [
+        ({"stage": "COLLSCAN"}, "COLLSCAN"),
+        ({"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "status"}}, "status"),
+        ({"stage": "SUBPLAN", "inputStage": {"stage": "OR", "inputStages": [
+            {"stage": "IXSCAN", "indexName": "key_unique"}]}}, "key_unique"),
+        ({"queryPlan": {"stage": "IXSCAN", "indexName": "parent"}}, "parent"),
+    ],
+)
+def test_planIndex(plan, expected):
+    assert db.planIndex(plan) == expected
+
+
+@patch("module.db.timestamp", return_value="now")
+def test_updateItem_sends_changed_fields(mock_timestamp, wrapper):
+    wrapper.connection.update_one.return_value = Mock(matched_count=1)
+    current = deserializeMultiple([{**document("A", "Open"), "revision": 2}])[0]
+    current.status = enums.Taskstatus.active
+    assert wrapper.updateItem(current)
+    wrapper.connection.count_documents.assert_not_called()
+    wrapper.connection.update_one.assert_called_once_with(
+        {"key": "A", "revision": 2},
+        {"$set": {"status": "Active", "updatedAt": "now"}, "$inc": {"revision": 1}},
+    )
+
+
+def test_updateItem_unchanged_skips_database(wrapper):
+    current = deserializeMultiple([document("A", "Open")])[0]
+    assert wrapper.updateItem(current)
+    wrapper.connection.update_one.assert_not_called()
+
+
+@pytest.mark.parametrize("exists, expected", [(0, False), (1, None)])
+def test_updateItem_missing_or_changed(wrapper, exists, expected):
+    wrapper.connection.update_one.return_value = Mock(matched_count=0)
+    wrapper.connection.count_documents.return_value = exists
+    current = deserializeMultiple([{**document("A", "Open"), "revision": 2}])[0]
+    current.description = "changed"
+    assert wrapper.updateItem(current) is expected
+
+
+@patch("module.db.timestamp", return_value="now")
+def test_insertItem_single_round_trip(mock_timestamp, wrapper):
+    current = deserializeMultiple([document("A", "Open")])[0]
+    assert wrapper.insertItem(current)
+    wrapper.connection.count_documents.assert_not_called()
+    wrapper.connection.insert_one.assert_called_once_with(
+        {**current.insertDict(), "updatedAt": "now", "revision": 1}
+    )
+
+
+def test_insertItem_duplicate_key(wrapper):
+    wrapper.connection.insert_one.side_effect = DuplicateKeyError("duplicate")
+    current = deserializeMultiple([document("A", "Open")])[0]
+    assert not wrapper.insertItem(current)
+
+
+@pytest.mark.parametrize(
+    "after, prefix, criteria",
+    [
+        (None, "", {}),
+        ("B", "", {"key": {"$gt": "B"}}),
+        (None, "KG-1", {"key": {"$regex": "^KG\\-1"}}),
+        ("KG-10", "KG.", {"key": {"$gt": "KG-10", "$regex": "^KG\\."}}),
+    ],
+)
+def test_readPage_keyset(wrapper, after, prefix, criteria):
+    cursor = wrapper.connection.find.return_value
+    cursor.sort.return_value.limit.return_value = [{"key": "C", "type": "Task", "status": "Open"}]
+    page = wrapper.readPage(after, 25, prefix)
+    wrapper.connection.find.assert_called_once_with(criteria, db.CARD_PROJECTION)
+    cursor.sort.assert_called_once_with("key", 1)
+    cursor.sort.return_value.limit.assert_called_once_with(25)
+    assert page == [card("C", "Task", "Open")]
+
+
+def test_readItem_uses_cache(wrapper):
+    wrapper.connection.find_one.return_value = document("A", "Open")
+    first = wrapper.readItem("A")
+    assert wrapper.readItem("A") == first
+    wrapper.connection.find_one.assert_called_once()
+    assert wrapper.cache.stats()["hits"] == 1
+
+
+def test_writes_invalidate_cache(wrapper):
+    wrapper.connection.find_one.return_value = document("A", "Open")
+    wrapper.connection.update_one.return_value = Mock(matched_count=1)
+    current = wrapper.readItem("A")
+    current.description = "changed"
+    wrapper.updateItem(current)
+    wrapper.readItem("A")
+    assert wrapper.connection.find_one.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "revision, matched, criteria, expected",
+    [
+        (3, 1, {"key": "A", "revision": 3}, 4),
+        (3, 0, {"key": "A", "revision": 3}, None),
+        (0, 1, {"key": "A", "revision": {"$in": [0, None]}}, 1),
+    ],
+)
+def test_updateRevision_compare_and_set(wrapper, revision, matched, criteria, expected):
+    wrapper.connection.update_one.return_value = Mock(matched_count=matched)
+    current = deserializeMultiple([document("A", "Open")])[0]
+    assert wrapper.updateRevision(current, revision) == expected
+    assert wrapper.connection.update_one.call_args.args[0] == criteria
+
+
+def test_init_closes_client_when_unreachable():
+    with patch("module.db.MongoClient") as mock_client:
+        database = mock_client.return_value.__getitem__.return_value
+        database.get_collection.return_value.find_one.side_effect = ConnectionError("unreachable")
+        with pytest.raises(ConnectionError):
+            db.Wrapper("mongodb://localhost:27017", "kanban", "test")
+    mock_client.return_value.close.assert_called_once_with()
+
+
+def test_ensureRevisions_on_init(fresh):
+    fresh.connection.update_many.assert_called_once_with(
+        {"revision": {"$exists": False}}, {"$set": {"revision": 1}}
+    )
+    fresh.meta.update_one.assert_called_once_with(
+        {"_id": "setup"}, {"$max": {"version": db.SETUP_VERSION}}, upsert=True
+    )
+
+
+def test_duplicate_keys_skip_unique_index(fresh):
+    def create_index(keys, name, **options):
+        if name == "key_unique":
+            raise OperationFailure("duplicate key", db.DUPLICATE_KEY)
+
+    fresh.connection.create_index.reset_mock()
+    fresh.connection.create_index.side_effect = create_index
+    assert fresh.ensureIndexes() == ["key_unique"]
+    assert fresh.connection.create_index.call_count == len(db.INDEXES)
+
+    fresh.connection.create_index.side_effect = OperationFailure("not authorized", 13)
+    with pytest.raises(OperationFailure):
+        fresh.ensureIndexes()
+
+
+def test_readDuplicateKeys(wrapper):
+    wrapper.connection.aggregate.return_value = [{"_id": "A", "count": 2}]
+    assert wrapper.readDuplicateKeys() == {"A": 2}
+
+
+def test_setup_skipped_once_recorded(wrapper):
+    wrapper.meta.find_one.assert_called_once_with({"_id": "setup", "version": {"$gte": db.SETUP_VERSION}})
+    wrapper.connection.create_index.assert_not_called()
+    wrapper.connection.update_many.assert_not_called()
+
+    wrapper.ensureSetup(force=True)
+    wrapper.connection.update_many.assert_called_once()
+    assert wrapper.connection.create_index.call_count == len(db.INDEXES)
+
+
+@patch("module.db.timestamp", return_value="now")
+def test_insertItems_reports_duplicates(mock_timestamp, wrapper):
+    items = deserializeMultiple([document("A", "Open"), document("B", "Open"), document("C", "Open")])
+    wrapper.connection.bulk_write.side_effect = BulkWriteError(
+        {"writeErrors": [{"index": 1, "code": db.DUPLICATE_KEY, "errmsg": "duplicate"}]}
     )
+    assert wrapper.insertItems(items) == {"A": True, "B": False, "C": True}
+    requests = wrapper.connection.bulk_write.call_args.args[0]
+    assert requests[0] == InsertOne({**items[0].insertDict(), "updatedAt": "now", "revision": 1})
+    assert wrapper.connection.bulk_write.call_args.kwargs == {"ordered": False}
+
+
+@patch("module.db.timestamp", return_value="now")
+def test_updateStatus_one_batch_per_call(mock_timestamp, wrapper):
+    wrapper.connection.find.return_value = [{"key": "A"}, {"key": "C"}]
+    wrapper.connection.bulk_write.return_value = Mock(matched_count=2)
+    results = wrapper.updateStatus(["A", "B", "C"], enums.Taskstatus.complete)
+    assert results == {"A": True, "B": False, "C": True}
+    wrapper.connection.find.assert_called_once_with({"key": {"$in": ["A", "B", "C"]}}, {"_id": 0, "key": 1})
+    update = {"$set": {"status": "Complete", "updatedAt": "now"}, "$inc": {"revision": 1}}
+    wrapper.connection.bulk_write.assert_called_once_with(
+        [UpdateOne({"key": "A"}, update), UpdateOne({"key": "C"}, update)], ordered=False
+    )
+
+
+def test_deleteItems_skips_missing_keys(wrapper):
+    wrapper.connection.find.return_value = []
+    assert wrapper.deleteItems(["A"]) == {"A": False}
+    wrapper.connection.bulk_write.assert_not_called()
 
+    wrapper.connection.find.return_value = [{"key": "A"}]
+    wrapper.connection.bulk_write.return_value = Mock(deleted_count=1)
+    assert wrapper.deleteItems(["A"]) == {"A": True}
+    wrapper.connection.bulk_write.assert_called_once_with([DeleteOne({"key": "A"})], ordered=False)
 
-def test_wrapper_init_connection_error(mock_client):
-    # Test initialization with ConnectionError
-    mock_client.side_effect = ConnectionError("Failed to connect to MongoDB")
-    with pytest.raises(ConnectionError):
-        Wrapper()
 
+@patch("module.db.timestamp", return_value="now")
+def test_updateStatus_rechecks_keys_removed_in_between(mock_timestamp, wrapper):
+    wrapper.connection.find.side_effect = [[{"key": "A"}, {"key": "B"}], [{"key": "A"}]]
+    wrapper.connection.bulk_write.return_value = Mock(matched_count=1)
+    assert wrapper.updateStatus(["A", "B"], enums.Taskstatus.complete) == {"A": True, "B": False}
+    assert wrapper.connection.find.call_count == 2
 
-def test_read_all(mock_connection):
-    # Mock the find method to return a list
-    mock_connection.find.return_value = [{"key": "item1"}, {"key": "item2"}]
-    wrapper = Wrapper()
-    result = wrapper.readAll()
-    assert len(result) == 2
-    assert deserializeMultiple.called  # Assert deserializeMultiple is called
 
+def test_deleteItems_rechecks_keys_after_short_count(wrapper):
+    wrapper.connection.find.side_effect = [[{"key": "A"}, {"key": "B"}], [{"key": "B"}]]
+    wrapper.connection.bulk_write.return_value = Mock(deleted_count=1)
+    assert wrapper.deleteItems(["A", "B"]) == {"A": True, "B": False}
 
-def test_read_status(mock_connection):
-    # Mock the find method to return a list with specific status
-    mock_connection.find.return_value = [{"key": "item1", "status": "TODO"}]
-    wrapper = Wrapper()
-    result = wrapper.readStatus(enums.Taskstatus.TODO)
-    assert len(result) == 1
-    assert deserializeMultiple.called  # Assert deserializeMultiple is called
 
+@pytest.mark.parametrize(
+    "deleted, exists, expected",
+    [(1, 0, True), (0, 0, False), (0, 1, None)],
+)
+def test_deleteRevision_compare_and_set(wrapper, deleted, exists, expected):
+    wrapper.connection.delete_one.return_value = Mock(deleted_count=deleted)
+    wrapper.connection.count_documents.return_value = exists
+    assert wrapper.deleteRevision("A", 3) is expected
+    wrapper.connection.delete_one.assert_called_once_with({"key": "A", "revision": 3})
 
-def test_update_item_success(mock_connection):
-    # Mock methods to simulate successful update
-    mock_connection.count_documents.return_value = 1
-    mock_connection.update_one.return_value = Mock()
-    wrapper = Wrapper()
-    assert wrapper.updateItem(Mock(key="item1"))
 
+@patch("module.db.timestamp", return_value="now")
+def test_migrateSchema_in_batches(mock_timestamp, wrapper):
+    old = {**document("A", "Open"), "_id": 1, "revision": 4}
+    cursor = wrapper.connection.find.return_value.sort.return_value.limit
+    cursor.side_effect = [[old], []]
+    wrapper.connection.bulk_write.return_value = Mock(modified_count=1)
+    progress = []
+
+    assert wrapper.migrateSchema(batchSize=1, onBatch=progress.append) == 1
+    assert progress == [1]
+    assert wrapper.connection.find.call_args_list[1].args[0] == {"schema": {"$ne": 2}, "_id": {"$gt": 1}}
+    [request] = wrapper.connection.bulk_write.call_args.args[0]
+    assert request == UpdateOne(
+        {"_id": 1, "revision": 4}, {"$set": {**persistence.upgrade(old), "updatedAt": "now"}}
+    )
+    cursor.assert_called_with(1)
+
+
+def test_readMetrics_single_aggregation(wrapper):
+    wrapper.connection.aggregate.return_value = iter(
+        [{"status": [{"_id": "Open", "count": 1, "estimate": 2.0, "spent": 0.0}]}]
+    )
+    result = wrapper.readMetrics()
+    wrapper.connection.aggregate.assert_called_once_with(metrics.PIPELINE)
+    assert result == {
+        "status": {"Open": {"count": 1, "estimate": 2.0, "spent": 0.0}},
+        "type": {},
+        "parent": {},
+    }
 
-def test_update_item_failure_not_found(mock_connection):
-    # Mock count_documents to return 0 (not found)
-    mock_connection.count_documents.return_value = 0
-    wrapper = Wrapper()
-    assert not wrapper.updateItem(Mock(key="item1"))
 
+@pytest.mark.parametrize("keys, criteria", [(None, {}), ({"A"}, {"key": {"$in": ["A"]}})])
+def test_readNodes_uses_projection(wrapper, keys, criteria):
+    wrapper.connection.find.return_value = [
+        {"key": "A", "type": "Task", "parent": None, "estimate": 2, "time_spent": 1}
+    ]
+    assert wrapper.readNodes(keys) == [persistence.node("A", "Task", None, 2, 1)]
+    wrapper.connection.find.assert_called_once_with(criteria, db.NODE_PROJECTION)
 
-def test_insert_item_success(mock_connection):
-    # Mock count_documents to return 0 (not found) and insert_one
-    mock_connection.count_documents.return_value = 0
-    mock_connection.insert_one.return_value = Mock()
-    wrapper = Wrapper()
-    item = Mock(key="item1")
-    assert wrapper.insertItem(item)
+
+def test_search_uses_text_index(wrapper):
+    cursor = wrapper.connection.find.return_value.sort.return_value.limit
+    cursor.return_value = [{"key": "A", "type": "Task", "status": "Open", "score": 1.5}]
+    assert wrapper.search("login page", 5) == [card("A", "Task", "Open")]
+    criteria, projection = wrapper.connection.find.call_args.args
+    assert criteria == {"$text": {"$search": "login page"}}
+    assert projection["score"] == {"$meta": "textScore"}
+    cursor.assert_called_once_with(5)
+    assert wrapper.search(" ") == []
+
+
+def test_appendHistory_ignores_duplicates(wrapper):
+    assert wrapper.events is not wrapper.connection
+    wrapper.appendHistory([])
+    wrapper.events.insert_many.assert_not_called()
+
+    wrapper.events.insert_many.side_effect = BulkWriteError(
+        {"writeErrors": [{"index": 0, "code": db.DUPLICATE_KEY}]}
+    )
+    event = {"id": "1", "key": "A", "date": None, "field": "status", "value": "Open"}
+    wrapper.appendHistory([event])
+    wrapper.events.insert_many.assert_called_once_with([event], ordered=False)
+    assert "_id" not in event
 
 
-def test_insert_item_failure_exists(mock_connection):
-    # Mock count_documents to return 1 (exists)
-    mock_connection.count_documents.return_value = 1
-    wrapper = Wrapper()
-    item = Mock(key="item1")
-    assert not wrapper.insertItem(item)
+def test_readEventsOf_batches_keys(wrapper, monkeypatch):
+    monkeypatch.setattr(db, "HISTORY_BATCH", 2)
+    event = {"id": "1", "key": "A", "date": datetime.datetime(2024, 1, 1), "field": "status", "value": "Open"}
+    wrapper.events.find.side_effect = [[event], []]
 
+    [read] = wrapper.readEventsOf(["A", "B", "C"])
+    assert read["date"].tzinfo == datetime.timezone.utc
+    assert [c.args[0] for c in wrapper.events.find.call_args_list] == [
+        {"key": {"$in": ["A", "B"]}},
+        {"key": {"$in": ["C"]}},
+    ]
 
-def test_key_exists_success(mock_connection):
-    # Mock count_documents to return 1 (exists)
-    mock_connection.count_documents.return_value = 1
-    wrapper = Wrapper()
-    assert wrapper.keyExists("key1")
 
+def test_compactHistory_streams_by_key(wrapper):
+    from module import history
 
-def test_key_exists_failure(mock_connection):
-    # Mock count_documents to return 0 (not found)
-    mock_connection.count_documents.return_value = 0
-    wrapper = Wrapper()
-    assert not wrapper.keyExists("key1")
+    UTC = datetime.timezone.utc
+    events = [
+        history.event("A", "status", "Open", datetime.datetime(2024, 1, 1, tzinfo=UTC)),
+        history.event("A", "status", "Active", datetime.datetime(2024, 1, 2)),
+        history.event("B", "status", "Open", datetime.datetime(2024, 1, 1)),
+    ]
+    wrapper.events.find.return_value.sort.return_value = iter(events)
+    wrapper.events.delete_many.return_value.deleted_count = 2
 
+    assert wrapper.compactHistory(datetime.datetime(2024, 1, 3, tzinfo=UTC)) == 2
+    [snapshot], = wrapper.events.insert_many.call_args.args
+    assert (snapshot["key"], snapshot["field"], snapshot["value"]) == ("A", "snapshot", {"status": "Active"})
+    wrapper.events.delete_many.assert_called_once_with({"id": {"$in": [events[0]["id"], events[1]["id"]]}})
 
-def test_deserialize_multiple(mock_deserialize):
-    # Mock deserialize function and assert it's called for each document
-    documents = [{"key": "item1"}, {"key": "item2"}]
-    mock_deserialize.side_effect = [Mock(item), Mock(item)]  # Mock item objects
-    result = deserializeMultiple(documents)
-    assert len(result) == 2
-    mock_deserialize.assert_has_calls([call(doc) for doc in documents])
 
-"""
\ No newline at end of file
+def test_invalidation_follows_the_write(wrapper):
+    wrapper.connection.update_one.return_value = Mock(matched_count=1)
+    written = []
+    wrapper.cache.addInvalidationListener(lambda key: written.append(wrapper.connection.update_one.called))
+    current = deserializeMultiple([document("A", "Open")])[0]
+    current.status = enums.Taskstatus.active
+    wrapper.updateItem(current)
+    assert written == [True]
@@ -0,0 +1,105 @@
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from module.dispatcher import Dispatcher
+
+
+@pytest.fixture
+def dispatcher():
+    instance = Dispatcher(Mock(), workers=2)
+    yield instance
+    instance.shutdown()
+
+
+def test_submit_delivers_on_poll(dispatcher):
+    received = []
+    dispatcher.submit(lambda: 42, onSuccess=received.append).result()
+    assert received == []
+    dispatcher.poll()
+    assert received == [42]
+    assert not dispatcher.busy()
+
+
+def test_submit_delivers_error(dispatcher):
+    errors = []
+    dispatcher.submit(lambda: 1 / 0, onError=errors.append).result()
+    dispatcher.poll()
+    assert isinstance(errors[0], ZeroDivisionError)
+
+
+def test_superseded_result_is_discarded(dispatcher):
+    release = threading.Event()
+    received = []
+    first = dispatcher.submit(
+        lambda: release.wait() and "old", onSuccess=received.append, tag="refresh"
+    )
+    second = dispatcher.submit(lambda: "new", onSuccess=received.append, tag="refresh")
+    release.set()
+    first.result()
+    second.result()
+    dispatcher.poll()
+    assert received == ["new"]
+    assert not dispatcher.busy()
+
+
+def test_busy_listener(dispatcher):
+    states = []
+    dispatcher.addBusyListener(states.append)
+    dispatcher.submit(lambda: None).result()
+    dispatcher.poll()
+    assert states == [True, False]
+
+
+def test_post_runs_on_poll(dispatcher):
+    calls = []
+    dispatcher.post(lambda: calls.append("posted"))
+    assert calls == []
+    dispatcher.poll()
+    assert calls == ["posted"]
+
+
+def test_poll_reschedules_until_shutdown(dispatcher):
+    dispatcher.poll()
+    dispatcher.widget.after.assert_called_with(dispatcher.interval, dispatcher.poll)
+    dispatcher.shutdown()
+    dispatcher.widget.after.reset_mock()
+    dispatcher.poll()
+    dispatcher.widget.after.assert_not_called()
+
+
+def test_raising_callback_does_not_stop_delivery(dispatcher):
+    received = []
+
+    def closed(value):
+        raise RuntimeError("window was closed")
+
+    dispatcher.submit(lambda: 1, onSuccess=closed).result()
+    dispatcher.submit(lambda: 2, onSuccess=received.append).result()
+    dispatcher.poll()
+    assert received == [2]
+    assert not dispatcher.busy()
+    dispatcher.widget.report_callback_exception.assert_called_once()
+    dispatcher.widget.after.assert_called_with(dispatcher.interval, dispatcher.poll)
+
+
+def test_quiet_call_is_not_busy(dispatcher):
+    states, received = [], []
+    dispatcher.addBusyListener(states.append)
+    dispatcher.submit(lambda: 1, onSuccess=received.append, tag="metrics", quiet=True).result()
+    assert not dispatcher.busy()
+    dispatcher.poll()
+    assert received == [1]
+    assert states == []
+
+
+def test_superseded_quiet_call_keeps_count(dispatcher):
+    release = threading.Event()
+    blocker = dispatcher.submit(release.wait)
+    dispatcher.submit(release.wait)
+    dispatcher.submit(lambda: "old", tag="metrics", quiet=True)
+    dispatcher.submit(lambda: "new", tag="metrics", quiet=True)
+    assert dispatcher.pending == 2
+    release.set()
+    blocker.result()
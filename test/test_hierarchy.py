@@ -0,0 +1,121 @@
+from unittest.mock import patch
+
+import pytest
+
+from module import enums, hierarchy
+from module.hierarchy import Hierarchy, findCycles
+from module.localStore import LocalStore
+from module.memoryStore import MemoryStore
+from module.persistence import node
+
+from .conftest import make_item
+
+
+BOARD = [
+    make_item("E", type="Epic", estimate="10", spent="0"),
+    make_item("T1", parent="E", estimate="2", spent="1"),
+    make_item("T2", parent="E", estimate="2", spent="1"),
+    make_item("S1", parent="T1", type="Subtask", estimate="1", spent="1"),
+    make_item("L"),
+]
+
+
+@pytest.fixture(params=[MemoryStore, lambda: LocalStore(":memory:")], ids=["memory", "sqlite"])
+def repository(request):
+    instance = request.param()
+    instance.insertItems(BOARD)
+    yield instance
+    instance.close()
+
+
+def test_navigation(repository):
+    index = Hierarchy(repository)
+    assert index.roots() == ["E", "L"]
+    assert index.children("E") == ["T1", "T2"]
+    assert index.children("L") == []
+    assert index.descendants("E") == ["T1", "T2", "S1"]
+    assert index.ancestors("S1") == ["T1", "E"]
+    assert index.get("S1") == node("S1", "Subtask", "T1", 1, 1)
+    assert index.get("missing") is None
+
+
+def test_rollup(repository):
+    index = Hierarchy(repository)
+    assert index.rollup("E") == {"count": 4, "estimate": 15, "spent": 3}
+    assert index.rollup("T1") == {"count": 2, "estimate": 3, "spent": 2}
+    assert index.rollup("missing") == {"count": 0, "estimate": 0, "spent": 0}
+
+
+def test_ofType(repository):
+    index = Hierarchy(repository)
+    assert index.ofType(enums.Tasktype.epic) == ["E"]
+    assert sorted(index.ofType(enums.Tasktype.subtask)) == ["S1"]
+
+
+def test_built_from_one_query_and_updated_per_key(repository):
+    index = Hierarchy(repository)
+    with patch.object(repository, "readNodes", wraps=repository.readNodes) as readNodes:
+        index.roots()
+        index.children("E")
+        readNodes.assert_called_once_with()
+
+        repository.updateItem(make_item("T2", parent="L"))
+        repository.deleteItems(["S1"])
+        assert index.children("L") == ["T2"]
+        assert index.rollup("E") == {"count": 2, "estimate": 12, "spent": 1}
+        assert readNodes.call_args.args == ({"T2", "S1"},)
+
+
+def test_full_invalidation_reloads(repository):
+    index = Hierarchy(repository)
+    index.roots()
+    repository.cache.clear()
+    assert index.reload
+    assert index.children("E") == ["T1", "T2"]
+
+
+def test_cycles_and_dangling(repository):
+    index = Hierarchy(repository)
+    repository.insertItems(
+        [make_item("A", parent="B"), make_item("B", parent="C"), make_item("C", parent="A")]
+    )
+    repository.insertItems([make_item("D", parent="A"), make_item("X", parent="gone")])
+    assert index.cycles() == [["A", "B", "C"]]
+    assert index.dangling() == {"X": "gone"}
+    assert index.roots() == ["E", "L", "X"]
+    assert index.ancestors("D") == ["A", "B", "C"]
+    assert index.descendants("A") == ["C", "D", "B"]
+    assert index.rollup("A")["count"] == 4
+
+
+def test_close_stops_following(repository):
+    index = Hierarchy(repository)
+    index.roots()
+    index.close()
+    repository.deleteItems(["L"])
+    assert index.stale == set()
+
+
+@pytest.mark.parametrize(
+    "parents, expected",
+    [
+        ({"A": None, "B": "A"}, []),
+        ({"A": "A"}, [["A"]]),
+        ({"B": "A", "A": "B", "C": "B"}, [["A", "B"]]),
+        ({"A": "B", "B": "A", "C": "D", "D": "C"}, [["A", "B"], ["C", "D"]]),
+    ],
+)
+def test_findCycles(parents, expected):
+    nodes = {key: node(key, "Task", parent, 0, 0) for key, parent in parents.items()}
+    assert findCycles(nodes) == expected
+
+
+def test_shared_hierarchy():
+    store = MemoryStore(BOARD)
+    with patch("module.db.getWrapper", return_value=store):
+        shared = hierarchy.getHierarchy()
+        assert hierarchy.getHierarchy() is shared
+        assert shared.repository is store
+        hierarchy.closeHierarchy()
+        assert hierarchy._shared is None
+        assert store.cache.listeners == []
@@ -0,0 +1,94 @@
+import datetime
+
+from module import enums, history
+from module.memoryStore import MemoryStore
+
+from .conftest import make_item
+
+UTC = datetime.timezone.utc
+
+
+def at(hour):
+    return datetime.datetime(2024, 1, 1, hour, tzinfo=UTC)
+
+
+def test_changes_only_differing_fields():
+    before = make_item()
+    after = make_item(status="Active", spent="3")
+    events = history.changes(before, after, at(1))
+    assert [(e["field"], e["value"]) for e in events] == [("time_spent", 3), ("status", "Active")]
+    assert all(e["key"] == "A" and e["date"] == at(1) and e["id"] for e in events)
+    assert history.changes(before, make_item(spent="0"), at(1)) == []
+
+
+def test_created_snapshot():
+    event = history.created(make_item(), at(1))
+    assert event["field"] == history.SNAPSHOT
+    assert event["value"]["status"] == "Open"
+    assert event["value"]["creation"] == datetime.datetime(2024, 1, 1, 12, 0)
+
+
+def test_replay_at_time():
+    events = [
+        history.created(make_item(), at(1)),
+        *history.changes(make_item(), make_item(status="Active"), at(2)),
+        *history.moved(["A"], enums.Taskstatus.complete, at(3)),
+        *history.deleted(["A"], at(4)),
+    ]
+    assert history.replay(events, at(0)) is None
+    assert history.replay(events, at(1))["status"] == "Open"
+    assert history.replay(events, at(2))["status"] == "Active"
+    assert history.replay(events, datetime.datetime(2024, 1, 1, 3))["status"] == "Complete"
+    assert history.replay(events) is None
+
+
+def test_fromLegacy():
+    entries = [{"date": "2024-01-01-12-00", "field": "status", "value": "Open"}, {"date": "soon"}, "junk"]
+    [event] = history.fromLegacy("A", entries)
+    assert event == {"id": None, "key": "A", "date": at(12), "field": "status", "value": "Open"}
+
+
+def test_compact_folds_old_events():
+    events = [
+        history.created(make_item(), at(1)),
+        *history.moved(["A"], enums.Taskstatus.active, at(2)),
+        *history.moved(["A"], enums.Taskstatus.complete, at(5)),
+        history.created(make_item("B"), at(1)),
+        history.created(make_item("C"), at(1)),
+        *history.deleted(["C"], at(2)),
+    ]
+    snapshots, folded = history.compact(events, at(3))
+    assert len(folded) == 4
+    assert [(s["key"], s["field"], s["date"]) for s in snapshots] == [
+        ("A", history.SNAPSHOT, at(2)),
+        ("C", history.DELETED, at(2)),
+    ]
+    kept = [e for e in events + snapshots if e["key"] == "A" and e["id"] not in folded]
+    assert history.replay(kept) == history.replay(events[:3])
+    assert history.replay(kept, at(2))["status"] == "Active"
+
+
+def test_ordered_puts_snapshot_after_folded_events():
+    change = history.moved(["A"], enums.Taskstatus.active, at(2))[0]
+    snapshot = history.event("A", history.SNAPSHOT, {"status": "Complete"}, at(2))
+    assert history.ordered([snapshot, change]) == [change, snapshot]
+
+
+def test_write_helpers_log_changes():
+    store = MemoryStore()
+    assert history.insertItem(store, make_item())
+    assert not history.insertItem(store, make_item())
+    assert history.updateItem(store, make_item(), make_item())
+    assert history.updateItem(store, make_item(), make_item(description="x"))
+    assert not history.updateItem(store, make_item("missing"), make_item("missing", description="x"))
+    assert history.updateStatus(store, ["A", "missing"], enums.Taskstatus.active) == {"A": True, "missing": False}
+    assert history.deleteItems(store, ["A"]) == {"A": True}
+    fields = [e["field"] for e in history.ordered(store.readEvents("A"))]
+    assert fields == [history.SNAPSHOT, "description", "status", history.DELETED]
+    assert store.readEvents("missing") == []
+
+
+def test_toUTC():
+    assert history.toUTC("2024-01-01-12-00") == at(12)
+    assert history.toUTC(at(1)) == at(1)
+    assert history.toUTC("never") == "never"
@@ -11,6 +11,7 @@ from module.itemUtil import (
     entryText,
     comboPair,
     datePair,
+    setValue,
 )
 from module.enums import Tasktype, Taskstatus
 
@@ -98,3 +99,23 @@ def test_datePair(mock_root):
     mock_root.grid.assert_any_call(row=4, column=1, padx=(10, 0), pady=(10, 0))
     
 """
+
+
+@pytest.mark.parametrize(
+    "kind, calls",
+    [
+        (tb.Combobox, [("set", ("Open",))]),
+        (tb.Entry, [("delete", (0, "end")), ("insert", (0, "Open"))]),
+        (tb.Text, [("delete", ("1.0", "end")), ("insert", ("1.0", "Open"))]),
+    ],
+)
+def test_setValue(kind, calls):
+    widget = Mock(spec=kind)
+    setValue(widget, "Open")
+    assert [(name, args) for name, args, _ in widget.method_calls] == calls
+
+
+def test_setValue_label():
+    widget = Mock(spec=tb.Label)
+    setValue(widget, 3)
+    widget.configure.assert_called_once_with(text="3")
@@ -0,0 +1,176 @@
+import json
+import sqlite3
+
+import pytest
+
+from module import enums, history
+from module.localStore import LocalStore
+from module.persistence import card, deserialize
+
+from .conftest import make_item
+
+
+@pytest.fixture
+def store():
+    instance = LocalStore(":memory:")
+    yield instance
+    instance.close()
+
+
+def test_insert_marks_dirty_and_notifies(store):
+    written = []
+    store.addWriteListener(lambda: written.append(True))
+    assert store.insertItem(make_item("A"))
+    assert not store.insertItem(make_item("A"))
+    assert written == [True]
+    [(current, revision, _)] = store.dirtyItems()
+    assert (current.key, revision) == ("A", 0)
+    assert store.readBoard()[enums.Taskstatus.open] == [card("A", "Task", "Open")]
+
+
+def test_update_missing_key(store):
+    assert not store.updateItem(make_item("A"))
+
+
+def test_update_keeps_creation_fields_and_invalidates_cache(store):
+    store.applyRemote(make_item("A"), 1)
+    assert store.readItem("A").status == enums.Taskstatus.open
+    changed = make_item("A", status="Active")
+    changed.estimate = "5"
+    assert store.updateItem(changed)
+    current = store.readItem("A")
+    assert (current.status, current.estimate) == (enums.Taskstatus.active, 1)
+    assert store.readStatus(enums.Taskstatus.active)[0].key == "A"
+
+
+def test_markClean_keeps_newer_changes_dirty(store):
+    store.insertItem(make_item("A"))
+    [(_, _, doc)] = store.dirtyItems()
+    store.updateItem(make_item("A", description="newer"))
+    store.markClean("A", 1, doc)
+    [(current, revision, _)] = store.dirtyItems()
+    assert (current.description, revision) == ("newer", 1)
+
+    [(_, _, doc)] = store.dirtyItems()
+    store.markClean("A", 2, doc)
+    assert store.dirtyItems() == []
+    assert store.syncedKeys() == {"A"}
+
+
+def test_applyRemote_outcomes(store):
+    assert store.applyRemote(make_item("A"), 1) == "insert"
+    assert store.applyRemote(make_item("A"), 1) is None  # unchanged
+    assert store.applyRemote(make_item("A", status="Active"), 2) == "update"
+    assert store.applyRemote(make_item("A", status="Open"), 1) is None  # stale
+
+    store.updateItem(make_item("A", status="Complete"))
+    assert store.applyRemote(make_item("A", status="Active"), 2) is None  # pending on top of it
+    assert store.applyRemote(make_item("A", status="Discarded"), 3) == "conflict"
+    assert store.readItem("A").status == enums.Taskstatus.discarded
+    assert store.dirtyItems() == []
+
+
+def test_applyRemoteDelete_keeps_unpushed_items(store):
+    store.insertItem(make_item("A"))
+    store.applyRemote(make_item("B"), 1)
+    store.applyRemote(make_item("C"), 1)
+    store.updateItem(make_item("C", description="local"))
+    assert store.applyRemoteDelete("A") is None
+    assert store.applyRemoteDelete("B") == "delete"
+    assert store.applyRemoteDelete("C") == "conflict"
+    assert store.readKeys() == {"A"}
+
+
+@pytest.mark.parametrize(
+    "after, prefix, expected",
+    [
+        (None, "", ["A-1", "A-2", "B-1"]),
+        ("A-1", "", ["A-2", "B-1", "B-2"]),
+        (None, "B", ["B-1", "B-2"]),
+        ("B-1", "B", ["B-2"]),
+    ],
+)
+def test_readPage(store, after, prefix, expected):
+    for key in ["B-2", "A-1", "B-1", "A-2"]:
+        store.insertItem(make_item(key))
+    assert [c.key for c in store.readPage(after, limit=3, prefix=prefix)] == expected
+
+
+def test_meta(store):
+    assert store.getMeta("lastPull") is None
+    store.setMeta("lastPull", "2024")
+    store.setMeta("lastPull", "2025")
+    assert store.getMeta("lastPull") == "2025"
+
+
+def test_stored_document_is_serialized_item(store):
+    store.insertItem(make_item("A"))
+    [(doc,)] = store.query("SELECT doc FROM items")
+    assert json.loads(doc)["creation"] == "2024-01-01T12:00:00"
+    assert deserialize(json.loads(doc)) == make_item("A")
+
+
+def test_bulk_insert_and_move(store):
+    store.applyRemote(make_item("A"), 1)
+    assert store.insertItems([make_item("A"), make_item("B")]) == {"A": False, "B": True}
+    results = store.updateStatus(["A", "B", "C"], enums.Taskstatus.complete)
+    assert results == {"A": True, "B": True, "C": False}
+    assert [c.key for c in store.readBoard()[enums.Taskstatus.complete]] == ["A", "B"]
+    assert store.readItem("A").status == enums.Taskstatus.complete
+    assert {current.key for current, _, _ in store.dirtyItems()} == {"A", "B"}
+
+
+def test_bulk_delete_records_pushed_items_only(store):
+    store.applyRemote(make_item("A"), 2)
+    store.insertItem(make_item("B"))
+    assert store.deleteItems(["A", "B", "C"]) == {"A": True, "B": True, "C": False}
+    assert store.readKeys() == set()
+    assert store.pendingDeletions() == [("A", 2)]
+
+    assert store.applyRemote(make_item("A"), 2) is None  # deletion pending on top of it
+    store.markDeleted("A")
+    assert store.pendingDeletions() == []
+
+
+def test_pending_deletion_overtaken_by_remote_change(store):
+    store.applyRemote(make_item("A"), 1)
+    store.deleteItems(["A"])
+    assert store.applyRemote(make_item("A", status="Active"), 2) == "conflict"
+    assert store.readItem("A").status == enums.Taskstatus.active
+    assert store.pendingDeletions() == []
+
+
+def test_insert_over_pending_deletion_becomes_update(store):
+    store.applyRemote(make_item("A"), 3)
+    store.deleteItems(["A"])
+    assert store.insertItem(make_item("A", status="Draft"))
+    assert store.pendingDeletions() == []
+    [(current, revision, _)] = store.dirtyItems()
+    assert (current.status, revision) == (enums.Taskstatus.draft, 3)
+
+
+def test_item_and_history_are_written_together(store, monkeypatch):
+    history.insertItem(store, make_item("A"))
+    store.markClean("A", 1, store.dirtyItems()[0][2])
+    store.markHistoryPushed([event["id"] for event in store.pendingHistory()])
+    before = store.readItem("A")
+    written = []
+    store.addWriteListener(lambda: written.append(True))
+
+    def full(events, pushed):
+        raise sqlite3.OperationalError("database or disk is full")
+
+    monkeypatch.setattr(store, "insertEvents", full)
+    with pytest.raises(sqlite3.OperationalError):
+        history.updateStatus(store, ["A"], enums.Taskstatus.active)
+    assert store.readItem("A") == before
+    assert store.readItem("A").status == enums.Taskstatus.open
+    assert store.dirtyItems() == []
+    assert store.pendingHistory() == []
+    assert written == []
+
+    monkeypatch.undo()
+    history.updateStatus(store, ["A"], enums.Taskstatus.active)
+    assert store.readItem("A").status == enums.Taskstatus.active
+    assert [event["field"] for event in store.pendingHistory()] == ["status"]
+    assert written == [True, True]
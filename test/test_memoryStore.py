@@ -0,0 +1,33 @@
+from module import enums
+from module.memoryStore import MemoryStore
+
+from .conftest import make_item
+
+
+def test_reads_return_copies():
+    store = MemoryStore([make_item("A")])
+    store.readAll()[0].status = "Active"
+    assert store.readAll()[0].status == enums.Taskstatus.open
+
+
+def test_revisions_compare_and_set():
+    store = MemoryStore([make_item("A")])
+    assert store.readRevision("A") == (make_item("A"), 1)
+    assert store.updateRevision(make_item("A", "Active"), 1) == 2
+    assert store.updateRevision(make_item("A", "Draft"), 1) is None
+    assert store.updateItem(make_item("A", "Complete"))
+    assert store.readRevision("A")[1] == 3
+    assert store.deleteRevision("A", 2) is None
+    assert store.deleteRevision("A", 3) is True
+    assert store.deleteRevision("A", 3) is False
+    assert store.readRevision("A") is None
+
+
+def test_readChangedItems():
+    store = MemoryStore([make_item("A")])
+    since = store.documents["A"]["updatedAt"]
+    store.insertItem(make_item("B"))
+    store.documents["B"]["updatedAt"] = since.replace(year=since.year + 1)
+    assert [i.key for i, _ in store.readChangedItems(since)] == ["B"]
+    assert [c.key for c in store.readChangedSince(since)] == ["B"]
+    assert len(store.readChangedItems()) == 2
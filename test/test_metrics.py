@@ -0,0 +1,63 @@
+import pytest
+
+from module import metrics
+
+from .conftest import make_item
+
+
+def test_summarize():
+    result = metrics.summarize(
+        [
+            make_item("E", type="Epic", estimate="10", spent="4"),
+            make_item("A", estimate="2", spent="1", parent="E"),
+            make_item("B", status="Active", estimate="3 Hours", spent="2.5", parent="E"),
+        ]
+    )
+    assert result["status"] == {
+        "Open": {"count": 2, "estimate": 12, "spent": 5},
+        "Active": {"count": 1, "estimate": 0, "spent": 2.5},
+    }
+    assert result["type"]["Task"] == {"count": 2, "estimate": 2, "spent": 3.5}
+    assert result["parent"] == {
+        None: {"count": 1, "estimate": 10, "spent": 4},
+        "E": {"count": 2, "estimate": 2, "spent": 3.5},
+    }
+
+
+def test_summarize_empty():
+    assert metrics.summarize([]) == {"status": {}, "type": {}, "parent": {}}
+
+
+def test_fromFacets_merges_empty_parents():
+    document = {
+        "status": [{"_id": "Open", "count": 2, "estimate": 3.0, "spent": 1.0}],
+        "type": [{"_id": "Task", "count": 2, "estimate": 3.0, "spent": 1.0}],
+        "parent": [
+            {"_id": None, "count": 1, "estimate": 1.0, "spent": 0.0},
+            {"_id": "None", "count": 1, "estimate": 2.0, "spent": 1.0},
+        ],
+    }
+    result = metrics.fromFacets(document)
+    assert result["status"] == {"Open": {"count": 2, "estimate": 3.0, "spent": 1.0}}
+    assert result["parent"] == {None: {"count": 2, "estimate": 3.0, "spent": 1.0}}
+
+
+def test_pipeline_groups_in_one_stage():
+    [stage] = metrics.PIPELINE
+    assert set(stage["$facet"]) == set(metrics.GROUPS)
+    group = stage["$facet"]["status"][0]["$group"]
+    assert group["_id"] == "$status"
+    assert group["estimate"] == {"$sum": metrics.numeric("$estimate")}
+
+
+@pytest.mark.parametrize(
+    "value, expected", [(3, 3), ("3", 3), ("2.5", 2.5), ("3 Hours", 0), ("", 0), (None, 0)]
+)
+def test_number(value, expected):
+    assert metrics.number(value) == expected
+
+
+def test_describe():
+    totals = {"count": 2, "estimate": 3.0, "spent": 1.5}
+    assert metrics.describe(totals) == "2 items\n3 estimated / 1.5 spent"
+    assert metrics.describe(None, ", ") == "0 items, 0 estimated / 0 spent"
@@ -1,3 +1,10 @@
+import datetime
+
+import pytest
+
+from module import enums, persistence
+
+
 ''' TODO unmute tests
 import pytest
 
@@ -205,4 +212,127 @@ TODO unmute tests
 )
 def test_update_dict(item, expected):
     assert item.updateDict() == expected
-'''
\ No newline at end of file
+'''
+
+
+def stored(**changes):
+    return {
+        "key": "KG-1",
+        "type": "Task",
+        "creation": "2024-01-01-12-00",
+        "estimate": "3",
+        "time_spent": "1.5",
+        "status": "Active",
+        "description": "",
+        "parent": "None",
+        "history": [],
+        **changes,
+    }
+
+
+def test_deserialize_converts_types():
+    current = persistence.deserialize(stored())
+    assert current.type is enums.Tasktype.task
+    assert current.status is enums.Taskstatus.active
+    assert (current.estimate, current.time_spent) == (3, 1.5)
+
+
+def test_deserialize_reads_version_1():
+    current = persistence.deserialize(stored(parent="None"))
+    assert current.creation == datetime.datetime(2024, 1, 1, 12, 0)
+    assert current.parent is None
+
+
+def test_insertDict_writes_version_2():
+    doc = persistence.deserialize(stored()).insertDict()
+    assert doc["schema"] == persistence.SCHEMA_VERSION
+    assert (doc["estimate"], doc["time_spent"], doc["parent"]) == (3, 1.5, None)
+    assert doc["creation"] == datetime.datetime(2024, 1, 1, 12, 0)
+    assert persistence.deserialize(doc).insertDict() == doc
+    assert persistence.upgrade(stored()) == doc
+
+
+def test_updateDict_native_types():
+    changes = persistence.deserialize(stored(parent="KG-0")).updateDict()
+    assert (changes["time_spent"], changes["status"], changes["parent"]) == (1.5, "Active", "KG-0")
+    assert "history" not in changes
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"status": "Progress"},
+        {"type": "Story"},
+        {"estimate": "3 Hours", "time_spent": ""},
+        {"creation": "1 January 2024"},
+    ],
+)
+def test_unknown_values_are_kept(changes):
+    doc = persistence.upgrade(stored(**changes))
+    assert {name: doc[name] for name in changes} == changes
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("2024-03-13-09-05", datetime.datetime(2024, 3, 13, 9, 5)),
+        ("2024-03-13T09:05:00", datetime.datetime(2024, 3, 13, 9, 5)),
+        (datetime.datetime(2024, 3, 13), datetime.datetime(2024, 3, 13)),
+        ("yesterday", "yesterday"),
+        ("2024-13-01-12-00", "2024-13-01-12-00"),
+    ],
+)
+def test_toDatetime(value, expected):
+    assert persistence.toDatetime(value) == expected
+
+
+def test_deserialize_keeps_invalid_version_1_date():
+    assert persistence.deserialize(stored(creation="2024-13-01-12-00")).creation == "2024-13-01-12-00"
+
+
+def test_slots():
+    current = persistence.deserialize(stored())
+    assert not hasattr(current, "__dict__")
+    assert not hasattr(current.asCard(), "__dict__")
+    assert not hasattr(current.asNode(), "__dict__")
+    with pytest.raises(AttributeError):
+        current.comments = []
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("4", 4), ("2.5", 2.5), ("4.0", 4), (7, 7), ("4 Hours", "4 Hours"), (None, None)],
+)
+def test_toNumber(value, expected):
+    assert persistence.toNumber(value) == expected
+    assert type(persistence.toNumber(value)) is type(expected)
+
+
+def test_card_equality_with_enum_and_value():
+    assert persistence.card("A", "Epic", "Open") == persistence.card(
+        "A", enums.Tasktype.epic, enums.Taskstatus.open
+    )
+
+
+def test_asNode_matches_deserializeNode():
+    current = persistence.deserialize(stored())
+    node = persistence.deserializeNode(stored())
+    assert current.asNode() == node
+    assert node.parent is None
+    assert node.type == enums.Tasktype.task
+
+
+def test_changedDict_tracks_original_state():
+    current = persistence.deserialize(stored(revision=4))
+    assert current.revision == 4
+    assert current.changedDict() == {}
+
+    edited = persistence.item(
+        "KG-1", "Task", "2024-01-01-12-00", "3", "1.5", "Complete", "", "", []
+    ).track(current.revision, current)
+    assert edited == persistence.deserialize(stored(status="Complete"))
+    assert (edited.revision, edited.changedDict()) == (4, {"status": "Complete"})
+
+    untracked = persistence.item("KG-1", "Task", "2024-01-01-12-00", "3", "1.5", "Active", "", None, [])
+    assert untracked.revision is None
+    assert untracked.changedDict() == untracked.updateDict()
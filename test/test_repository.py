@@ -0,0 +1,189 @@
+import datetime
+
+import pytest
+
+from module import enums
+from module.localStore import LocalStore
+from module.memoryStore import MemoryStore
+from module.persistence import card, item
+from module.repository import Repository
+
+from .conftest import make_item
+
+
+@pytest.fixture(params=[MemoryStore, lambda: LocalStore(":memory:")], ids=["memory", "sqlite"])
+def repository(request):
+    instance = request.param()
+    yield instance
+    instance.close()
+
+
+def test_is_repository(repository):
+    assert isinstance(repository, Repository)
+
+
+def test_read_all_and_status(repository):
+    repository.insertItems([make_item("A"), make_item("B", "Active"), make_item("C")])
+    assert sorted(i.key for i in repository.readAll()) == ["A", "B", "C"]
+    assert [i.key for i in repository.readStatus(enums.Taskstatus.open)] == ["A", "C"]
+    assert repository.readStatus(enums.Taskstatus.draft) == []
+
+
+def test_readBoard_and_cards(repository):
+    repository.insertItems([make_item("A"), make_item("B", "Active")])
+    board = repository.readBoard()
+    assert set(board) == set(enums.Taskstatus)
+    assert board[enums.Taskstatus.active] == [card("B", "Task", "Active")]
+    assert repository.readCards(enums.Taskstatus.open) == [card("A", "Task", "Open")]
+
+
+def test_insert_item_success_and_exists(repository):
+    assert repository.insertItem(make_item("A"))
+    assert not repository.insertItem(make_item("A", "Active"))
+    assert repository.readItem("A").status == enums.Taskstatus.open
+
+
+def test_update_item_success_and_not_found(repository):
+    repository.insertItem(make_item("A"))
+    repository.readItem("A")
+    assert repository.updateItem(make_item("A", "Complete"))
+    assert repository.readItem("A").status == enums.Taskstatus.complete
+    assert [i.key for i in repository.readStatus(enums.Taskstatus.complete)] == ["A"]
+    assert repository.readStatus(enums.Taskstatus.open) == []
+    assert not repository.updateItem(make_item("B"))
+
+
+def test_key_exists(repository):
+    repository.insertItem(make_item("A"))
+    assert repository.keyExists("A")
+    assert not repository.keyExists("B")
+    assert repository.readItem("B") is None
+
+
+@pytest.mark.parametrize(
+    "after, prefix, expected",
+    [
+        (None, "", ["A-1", "A-2", "B-1"]),
+        ("A-1", "", ["A-2", "B-1", "B-2"]),
+        (None, "B", ["B-1", "B-2"]),
+        ("B-1", "B", ["B-2"]),
+        ("Z", "", []),
+    ],
+)
+def test_readPage(repository, after, prefix, expected):
+    repository.insertItems([make_item(key) for key in ["B-2", "A-1", "B-1", "A-2"]])
+    assert [c.key for c in repository.readPage(after, limit=3, prefix=prefix)] == expected
+
+
+def test_bulk_status_and_delete(repository):
+    repository.insertItems([make_item("A"), make_item("B")])
+    assert repository.updateStatus(["A", "C"], enums.Taskstatus.discarded) == {"A": True, "C": False}
+    assert [c.key for c in repository.readCards(enums.Taskstatus.discarded)] == ["A"]
+    assert repository.deleteItems(["A", "C"]) == {"A": True, "C": False}
+    assert repository.readKeys() == {"B"}
+    assert repository.readPage() == [card("B", "Task", "Open")]
+
+
+def test_readMetrics(repository):
+    subtask = item("C", "Subtask", "2024-01-01-12-00", "x", "2", "Open", "", "A", [])
+    repository.insertItems([make_item("A"), make_item("B", "Active"), subtask])
+    result = repository.readMetrics()
+    assert result["status"] == {
+        "Open": {"count": 2, "estimate": 1, "spent": 2},
+        "Active": {"count": 1, "estimate": 1, "spent": 0},
+    }
+    assert result["type"]["Subtask"] == {"count": 1, "estimate": 0, "spent": 2}
+    assert result["parent"] == {
+        None: {"count": 2, "estimate": 2, "spent": 0},
+        "A": {"count": 1, "estimate": 0, "spent": 2},
+    }
+
+
+def test_history_log(repository):
+    from module import history
+
+    UTC = datetime.timezone.utc
+    repository.insertItem(make_item("A"))
+    created = history.created(make_item("A"), datetime.datetime(2024, 1, 2, tzinfo=UTC))
+    moved = history.moved(["A"], enums.Taskstatus.active, datetime.datetime(2024, 1, 3, tzinfo=UTC))
+    repository.appendHistory([created, *moved])
+    repository.appendHistory([created])
+    assert sorted(e["field"] for e in repository.readEvents("A")) == ["snapshot", "status"]
+    assert repository.readEvents("B") == []
+
+    assert repository.replayItem("A", datetime.datetime(2024, 1, 1, tzinfo=UTC)) is None
+    assert repository.replayItem("A", datetime.datetime(2024, 1, 2, 12, tzinfo=UTC)).status == enums.Taskstatus.open
+    assert repository.replayItem("A").status == enums.Taskstatus.active
+
+
+def test_readHistory_includes_embedded_entries(repository):
+    legacy = make_item("A")
+    legacy.history = [{"date": "2023-12-31-08-00", "field": "status", "value": "Draft"}]
+    repository.insertItem(legacy)
+    assert [e["field"] for e in repository.readHistory("A")] == ["status"]
+    assert repository.replayItem("A").status == enums.Taskstatus.draft
+    assert repository.replayItem("A").type is None
+
+
+def test_compactHistory(repository):
+    from module import history
+
+    UTC = datetime.timezone.utc
+    events = [
+        history.created(make_item("A"), datetime.datetime(2024, 1, 1, tzinfo=UTC)),
+        *history.moved(["A"], enums.Taskstatus.active, datetime.datetime(2024, 1, 2, tzinfo=UTC)),
+        *history.moved(["A"], enums.Taskstatus.complete, datetime.datetime(2024, 1, 5, tzinfo=UTC)),
+    ]
+    repository.appendHistory(events)
+    if isinstance(repository, LocalStore):
+        repository.markHistoryPushed([e["id"] for e in events])
+    assert repository.compactHistory(datetime.datetime(2024, 1, 3, tzinfo=UTC)) == 2
+    assert [e["field"] for e in history.ordered(repository.readEvents("A"))] == ["snapshot", "status"]
+    assert repository.replayItem("A", datetime.datetime(2024, 1, 2, tzinfo=UTC)).status == enums.Taskstatus.active
+    assert repository.replayItem("A").status == enums.Taskstatus.complete
+    assert repository.compactHistory(datetime.datetime(2024, 1, 3, tzinfo=UTC)) == 0
+
+
+def test_updateItem_writes_only_changed_fields(repository):
+    repository.insertItem(make_item("A"))
+    first = repository.readItem("A")
+    second = make_item("A").track(None, first)
+    first.status = enums.Taskstatus.active
+    second.description = "edited elsewhere"
+    assert repository.updateItem(first)
+    assert repository.updateItem(second)
+    stored = repository.readItem("A")
+    assert (stored.status, stored.description) == (enums.Taskstatus.active, "edited elsewhere")
+    assert repository.updateItem(stored)
+
+
+def test_readItem_returns_a_copy(repository):
+    repository.insertItem(make_item("A"))
+    current = repository.readItem("A")
+    current.status = enums.Taskstatus.active
+    current.history.append("edited")
+    assert repository.readItem("A") == make_item("A")
+
+
+def test_updateItem_changed_since_read(repository):
+    repository.insertItem(make_item("A"))
+    current = repository.readItem("A")
+    current.status = enums.Taskstatus.active
+    if isinstance(repository, LocalStore):
+        repository.applyRemote(make_item("A", "Complete"), 5)
+    else:
+        repository.updateStatus(["A"], enums.Taskstatus.complete)
+    assert repository.updateItem(current) is None
+    assert repository.readItem("A").status == enums.Taskstatus.complete
+
+
+def test_invalidation_listeners_see_the_write(repository):
+    repository.insertItem(make_item("A"))
+    seen = []
+    repository.cache.addInvalidationListener(lambda key: key and seen.append(repository.readItem(key).status))
+    repository.updateStatus(["A"], enums.Taskstatus.active)
+    current = repository.readItem("A")
+    current.status = enums.Taskstatus.complete
+    repository.updateItem(current)
+    assert seen == [enums.Taskstatus.active, enums.Taskstatus.complete]
+    assert repository.readItem("A").status == enums.Taskstatus.complete
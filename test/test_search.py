@@ -0,0 +1,108 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from module import enums, search
+from module.localStore import LocalStore
+from module.memoryStore import MemoryStore
+from module.search import TextIndex
+
+from .conftest import make_item
+
+
+BOARD = [
+    make_item("KG-1", description="Fix the login page"),
+    make_item("KG-2", description="Login fails on the settings page page page"),
+    make_item("KG-10", description="Update documentation"),
+    make_item("DOC-3", description="Rewrite the login documentation"),
+]
+
+
+@pytest.fixture(params=[MemoryStore, lambda: LocalStore(":memory:")], ids=["memory", "sqlite"])
+def repository(request):
+    instance = request.param()
+    instance.insertItems(BOARD)
+    yield instance
+    instance.close()
+
+
+def keys(cards):
+    return [c.key for c in cards]
+
+
+def test_tokenize():
+    assert search.tokenize("KG-12: Fix the Login_page!") == ["kg", "12", "fix", "the", "login_page"]
+    assert search.tokenize(None) == ["none"]
+
+
+def test_countWords_weights_key():
+    counts = search.countWords("KG-1", "kg rocks")
+    assert counts == {"kg": search.KEY_WEIGHT + 1, "1": search.KEY_WEIGHT, "rocks": 1}
+
+
+def test_search_requires_every_word(repository):
+    assert sorted(keys(repository.search("login page"))) == ["KG-1", "KG-2"]
+    assert keys(repository.search("login documentation")) == ["DOC-3"]
+    assert repository.search("login nothing") == []
+    assert repository.search("  ") == []
+
+
+def test_search_last_word_is_prefix(repository):
+    assert sorted(keys(repository.search("docu"))) == ["DOC-3", "KG-10"]
+    assert keys(repository.search("doc")) == ["DOC-3", "KG-10"]
+
+
+def test_search_ranks_keys_and_exact_words_first(repository):
+    assert keys(repository.search("KG-1")) == ["KG-1", "KG-10"]
+    assert keys(repository.search("page"))[0] == "KG-2"
+    assert len(repository.search("kg", limit=2)) == 2
+
+
+def test_search_follows_writes(repository):
+    repository.search("login")
+    repository.updateItem(make_item("KG-10", description="Login with single sign-on"))
+    repository.deleteItems(["KG-1"])
+    repository.insertItem(make_item("KG-20", description="login audit"))
+    assert sorted(keys(repository.search("login"))) == ["DOC-3", "KG-10", "KG-2", "KG-20"]
+    assert repository.search("documentation")[0].key == "DOC-3"
+    assert "fix" not in repository.textIndex.postings
+
+
+def test_search_returns_current_status(repository):
+    repository.search("login")
+    repository.updateStatus(["KG-1"], enums.Taskstatus.active)
+    assert repository.search("fix")[0].status == enums.Taskstatus.active
+
+
+def test_full_invalidation_rebuilds(repository):
+    index = TextIndex(repository)
+    index.search("login")
+    repository.cache.clear()
+    assert index.reload
+    assert keys(index.search("update")) == ["KG-10"]
+    index.close()
+    assert index.invalidate not in repository.cache.listeners
+
+
+def test_overlapping_first_searches_build_one_index(repository):
+    built = []
+    started = threading.Barrier(2)
+
+    def build(engine):
+        built.append(engine)
+        time.sleep(0.05)  # long enough for the other search to arrive
+        return TextIndex(engine)
+
+    def first():
+        started.wait()
+        repository.search("login")
+
+    with patch("module.search.TextIndex", side_effect=build):
+        threads = [threading.Thread(target=first) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert len(built) == 1
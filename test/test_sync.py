@@ -0,0 +1,239 @@
+import datetime
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from module import enums, history
+from module.localStore import LocalStore
+from module.persistence import card
+from module.sync import SyncEngine
+from module.watcher import ChangeEvent
+
+from .conftest import make_item
+
+
+class FakeRemote:
+    """
+    In-memory stand-in for db.Wrapper keeping a revision per key.
+    """
+
+    def __init__(self):
+        self.items = {}
+        self.since = []
+        self.events = {}
+
+    def insertItem(self, current):
+        if current.key in self.items:
+            return False
+        self.items[current.key] = (current, 1)
+        return True
+
+    def updateRevision(self, current, revision):
+        if self.items.get(current.key, (None, None))[1] != revision:
+            return None
+        self.items[current.key] = (current, revision + 1)
+        return revision + 1
+
+    def deleteRevision(self, key, revision):
+        if key not in self.items:
+            return False
+        if self.items[key][1] != revision:
+            return None
+        del self.items[key]
+        return True
+
+    def readRevision(self, key):
+        return self.items.get(key)
+
+    def readChangedItems(self, since=None):
+        self.since.append(since)
+        return list(self.items.values())
+
+    def readKeys(self):
+        return set(self.items)
+
+    def appendHistory(self, events):
+        for event in events:
+            self.events.setdefault(event["id"], event)
+
+    def readEventsOf(self, keys):
+        return [dict(event) for event in self.events.values() if event["key"] in keys]
+
+
+@pytest.fixture
+def setup():
+    local = LocalStore(":memory:")
+    remote = FakeRemote()
+    events, conflicts = [], []
+    engine = SyncEngine(local, lambda: remote, events.append, conflicts.append)
+    yield local, remote, engine, events, conflicts
+    local.close()
+
+
+def test_push_insert_and_update(setup):
+    local, remote, engine, events, _ = setup
+    local.insertItem(make_item("A"))
+    engine.pushOnce(remote)
+    assert remote.items["A"][1] == 1
+    assert local.dirtyItems() == []
+
+    local.updateItem(make_item("A", status="Active"))
+    engine.pushOnce(remote)
+    assert remote.items["A"][0].status == enums.Taskstatus.active
+    assert remote.items["A"][1] == 2
+    assert events == []
+
+
+def test_push_conflict_pulls_remote_version(setup):
+    local, remote, engine, events, conflicts = setup
+    remote.items["A"] = (make_item("A"), 1)
+    local.applyRemote(make_item("A"), 1)
+    local.updateItem(make_item("A", status="Active"))
+    remote.items["A"] = (make_item("A", status="Complete"), 2)
+
+    engine.pushOnce(remote)
+    assert conflicts == ["A"]
+    assert events == [ChangeEvent("update", "A", card("A", "Task", "Complete"))]
+    assert local.readItem("A").status == enums.Taskstatus.complete
+    assert local.dirtyItems() == []
+
+
+def test_reconcile_applies_changes_and_deletions(setup):
+    local, remote, engine, events, _ = setup
+    local.applyRemote(make_item("gone"), 1)
+    local.insertItem(make_item("unpushed"))
+    remote.items["A"] = (make_item("A"), 1)
+
+    engine.reconcile()
+    assert remote.since == [None]
+    assert events == [
+        ChangeEvent("insert", "A", card("A", "Task", "Open")),
+        ChangeEvent("delete", "gone"),
+    ]
+    assert local.readKeys() == {"A", "unpushed"}
+
+    engine.reconcile()
+    since = remote.since[1]
+    assert isinstance(since, datetime.datetime)
+    assert len(events) == 2
+
+
+def test_pulled_delete(setup):
+    local, _, engine, events, _ = setup
+    local.applyRemote(make_item("A"), 1)
+    engine.pulled(ChangeEvent("delete", "A"))
+    assert events == [ChangeEvent("delete", "A")]
+    assert local.readKeys() == set()
+
+
+def test_push_deletion(setup):
+    local, remote, engine, events, conflicts = setup
+    for key in ["A", "B"]:
+        remote.items[key] = (make_item(key), 1)
+        local.applyRemote(make_item(key), 1)
+    local.deleteItems(["A", "B"])
+    remote.items["B"] = (make_item("B", status="Active"), 2)
+
+    engine.pushOnce(remote)
+    assert set(remote.items) == {"B"}
+    assert local.pendingDeletions() == []
+    assert conflicts == ["B"]
+    assert local.readKeys() == {"B"}
+
+
+def test_push_history(setup):
+    local, remote, engine, _, _ = setup
+    history.insertItem(local, make_item("A"))
+    history.updateStatus(local, ["A"], enums.Taskstatus.active)
+    engine.pushOnce(remote)
+    assert sorted(e["field"] for e in remote.events.values()) == ["snapshot", "status"]
+    assert local.pendingHistory() == []
+
+    engine.pushOnce(remote)
+    assert len(remote.events) == 2
+
+
+def test_edit_after_push_is_no_conflict(setup):
+    local, remote, engine, _, conflicts = setup
+    local.insertItem(make_item("A"))
+    current = local.readItem("A")
+    current.status = enums.Taskstatus.active
+    assert local.updateItem(current)
+
+    reopened = local.readItem("A")
+    engine.pushOnce(remote)
+    assert local.readItem("A").revision != reopened.revision
+    edited = local.readItem("A")
+    assert edited.revision == remote.items["A"][1]
+    edited.status = enums.Taskstatus.complete
+    assert local.updateItem(edited)
+    assert conflicts == []
+
+
+class FlakyRemote(FakeRemote):
+    """
+    FakeRemote failing the first inserts with an error that is not a PyMongoError.
+    """
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    def insertItem(self, current):
+        if self.failures:
+            self.failures -= 1
+            raise sqlite3.OperationalError("database is locked")
+        return super().insertItem(current)
+
+
+def test_run_survives_unexpected_errors():
+    local = LocalStore(":memory:")
+    remote = FlakyRemote(failures=2)
+    errors = []
+    engine = SyncEngine(local, lambda: remote, interval=0.01, onError=errors.append)
+    local.insertItem(make_item("A"))
+    pusher = threading.Thread(target=engine.run, daemon=True)
+    pusher.start()
+    deadline = time.monotonic() + 5
+    while "A" not in remote.items and time.monotonic() < deadline:
+        time.sleep(0.01)
+    engine.stopped.set()
+    engine.wake.set()
+    pusher.join(timeout=2)
+    local.close()
+
+    assert "A" in remote.items
+    assert remote.failures == 0
+    assert len(errors) == 1
+    assert isinstance(errors[0], sqlite3.OperationalError)
+
+
+def test_replay_on_replica_seeded_from_remote(setup):
+    local, remote, engine, events, _ = setup
+    seeded = LocalStore(":memory:")
+    seeding = SyncEngine(seeded, lambda: remote)
+    history.insertItem(seeded, make_item("A"))
+    seeding.pushOnce(remote)
+    moved = datetime.datetime.now(datetime.timezone.utc)
+    history.updateStatus(seeded, ["A"], enums.Taskstatus.active)
+    seeding.pushOnce(remote)
+    seeded.close()
+
+    engine.reconcile()
+    assert local.replayItem("A", moved).status == enums.Taskstatus.open
+    assert local.replayItem("A").status == enums.Taskstatus.active
+    assert local.pendingHistory() == []
+
+
+def test_pulled_change_brings_its_history(setup):
+    local, remote, engine, _, _ = setup
+    history.insertItem(local, make_item("A"))
+    engine.pushOnce(remote)
+    remote.items["A"] = (make_item("A", status="Complete"), 2)
+    remote.appendHistory(history.moved(["A"], enums.Taskstatus.complete, history.now()))
+
+    engine.pulled(ChangeEvent("update", "A"))
+    assert local.readItem("A").status == enums.Taskstatus.complete
+    assert [e["field"] for e in history.ordered(local.readEvents("A"))] == ["snapshot", "status"]
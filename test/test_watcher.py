@@ -0,0 +1,110 @@
+import threading
+
+from pymongo.errors import OperationFailure
+
+from module import watcher
+from module.persistence import card
+from module.watcher import ChangeEvent, ChangeWatcher
+
+
+class FakeSource:
+    """
+    In-memory stand-in for db.Wrapper on a standalone server.
+    """
+
+    def __init__(self, cards):
+        self.cards = {c.key: c for c in cards}
+        self.changed = []
+
+    def watchChanges(self):
+        raise OperationFailure("not a replica set", watcher.CHANGE_STREAMS_UNSUPPORTED)
+
+    def readBoard(self):
+        return list(self.cards.values())
+
+    def readKeys(self):
+        return set(self.cards)
+
+    def readChangedSince(self, since):
+        return self.changed
+
+
+def make_watcher(source):
+    events, reloads = [], []
+    instance = ChangeWatcher(lambda: source, events.append, reloads.append, interval=0)
+    return instance, events, reloads
+
+
+def test_handleChange_insert_update_delete():
+    instance, events, _ = make_watcher(None)
+    document = {"key": "A", "type": "Task", "status": "Open"}
+    instance.handleChange({"operationType": "insert", "documentKey": {"_id": 1}, "fullDocument": document})
+    document = {"key": "A", "type": "Task", "status": "Active"}
+    instance.handleChange({"operationType": "update", "documentKey": {"_id": 1}, "fullDocument": document})
+    instance.handleChange({"operationType": "delete", "documentKey": {"_id": 1}})
+    assert events == [
+        ChangeEvent("insert", "A", card("A", "Task", "Open")),
+        ChangeEvent("update", "A", card("A", "Task", "Active")),
+        ChangeEvent("delete", "A"),
+    ]
+
+
+def test_handleChange_ignores_unknown_delete_and_missing_document():
+    instance, events, _ = make_watcher(None)
+    instance.handleChange({"operationType": "delete", "documentKey": {"_id": 7}})
+    instance.handleChange({"operationType": "update", "documentKey": {"_id": 7}, "fullDocument": None})
+    assert events == []
+
+
+def test_pollOnce_reload_then_deltas():
+    source = FakeSource([card("A", "Task", "Open"), card("B", "Task", "Open")])
+    instance, events, reloads = make_watcher(source)
+    instance.pollOnce(source)
+    assert len(reloads) == 1 and events == []
+
+    del source.cards["B"]
+    source.cards["C"] = card("C", "Epic", "Draft")
+    source.changed = [card("A", "Task", "Active"), source.cards["C"]]
+    instance.pollOnce(source)
+    assert events == [
+        ChangeEvent("update", "A", card("A", "Task", "Active")),
+        ChangeEvent("insert", "C", card("C", "Epic", "Draft")),
+        ChangeEvent("delete", "B"),
+    ]
+
+
+def test_run_falls_back_to_polling():
+    source = FakeSource([card("A", "Task", "Open")])
+    instance, events, reloads = make_watcher(source)
+    original = instance.pollOnce
+
+    def pollOnce(current):
+        original(current)
+        instance.stopped.set()
+
+    instance.pollOnce = pollOnce
+    instance.run()
+    assert instance.polling
+    assert len(reloads) == 1
+
+
+def test_run_survives_unexpected_errors():
+    source = FakeSource([card("A", "Task", "Open")])
+    errors = []
+    calls = []
+
+    def flaky():
+        calls.append(None)
+        if len(calls) <= 2:
+            raise KeyError("broken document")
+        return source
+
+    instance = ChangeWatcher(flaky, [].append, [].append, interval=0.01, onError=errors.append)
+    instance.polling = True
+    reloaded = threading.Event()
+    instance.onReload = lambda columns: reloaded.set()
+    instance.start()
+    assert reloaded.wait(5)
+    instance.stop()
+    assert len(errors) == 1
+    assert isinstance(errors[0], KeyError)